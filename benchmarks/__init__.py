@@ -0,0 +1 @@
+"""Benchmarks for ppt-nav; ``python -m benchmarks`` runs the full suite."""
@@ -0,0 +1,107 @@
+"""Run the benchmark suite: ``python -m benchmarks [options]`` from the repo root.
+
+Builds synthetic outlines from 10 to 2,000 slides, prints per-phase timings,
+peak memory and output size, and compares them with a stored baseline. Use
+``--save-baseline`` once on the machine that runs the nightly comparison;
+later runs exit with status 1 when a metric regresses past its tolerance.
+Everything runs locally against the bundled template.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Dict
+
+from benchmarks.suite import PHASES, compare, environment, run_size
+
+DEFAULT_SIZES = (10, 50, 200, 500, 1000, 2000)
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=list(DEFAULT_SIZES),
+        help="Slide counts to benchmark (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="Timing runs per size; the fastest counts."
+    )
+    parser.add_argument(
+        "--baseline",
+        type=Path,
+        default=DEFAULT_BASELINE,
+        help="Baseline JSON to compare against (default: benchmarks/baseline.json).",
+    )
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Write this run's results to --baseline instead of comparing.",
+    )
+    parser.add_argument(
+        "--json", type=Path, default=None, help="Also write this run's results to this file."
+    )
+    parser.add_argument(
+        "--time-tolerance",
+        type=float,
+        default=0.20,
+        help="Relative slowdown that counts as a regression (default: 0.20).",
+    )
+    parser.add_argument(
+        "--size-tolerance",
+        type=float,
+        default=0.05,
+        help="Relative growth in memory or output size that counts as a regression.",
+    )
+    args = parser.parse_args()
+
+    header = " ".join(f"{phase:>13}" for phase in PHASES)
+    print(f"{'slides':>6} {header} {'total':>8} {'rss MB':>7} {'py MB':>7} {'output KB':>10}")
+    results: Dict[str, Dict[str, float]] = {}
+    for size in args.sizes:
+        result = run_size(size, args.repeat)
+        results[str(size)] = result
+        phases = " ".join(f"{result[f'{phase}_s'] * 1e3:>10.1f} ms" for phase in PHASES)
+        rss = result.get("peak_rss_mb")
+        print(
+            f"{size:>6} {phases} {result['total_s']:>7.2f}s "
+            f"{rss if rss is not None else float('nan'):>7.1f} "
+            f"{result['peak_traced_mb']:>7.1f} {result['output_bytes'] / 1024:>10.0f}"
+        )
+
+    report = {"environment": environment(), "results": results}
+    if args.json is not None:
+        args.json.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        print(f"Baseline written to {args.baseline}")
+        return 0
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one.")
+        return 0
+
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    if baseline.get("environment") != report["environment"]:
+        print("Note: baseline was recorded in a different environment:")
+        print(f"  baseline: {baseline.get('environment')}")
+        print(f"  current:  {report['environment']}")
+    regressions = compare(
+        results, baseline.get("results", {}), args.time_tolerance, args.size_tolerance
+    )
+    if regressions:
+        print("Regressions against baseline:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    print("No regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+"""Benchmark the outline model on outlines with tens of thousands of entries.
+
+Reports the memory a parsed :class:`Outline` holds and the time to walk its
+slide plan, fetch slides by index and find the slides of a title. The
+slotted model is compared with the dict-backed frozen dataclasses it
+replaced and with the linear walks random access and title lookups needed
+before :class:`SlidePlan` existed. Both references are kept below.
+
+Run with ``PYTHONPATH=src python -m benchmarks.bench_outline_model [--sizes N ...]``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from benchmarks.outlines import synthetic_outline_text
+from ppt_nav.outline import Outline, OutlineItem, SlidePlanEntry
+
+SIZES = (10_000, 50_000)
+
+
+@dataclass(frozen=True)
+class LegacyItem:
+    title: str
+    children: Tuple["LegacyItem", ...] = field(default_factory=tuple)
+
+
+@dataclass(frozen=True)
+class LegacyEntry:
+    section: LegacyItem
+    child: Optional[LegacyItem]
+
+
+def legacy_outline(sections: Tuple[OutlineItem, ...]) -> Tuple[LegacyItem, ...]:
+    # Titles are copied so they are not shared with the interned originals.
+    return tuple(
+        LegacyItem(
+            "".join(section.title),
+            tuple(LegacyItem("".join(child.title)) for child in section.children),
+        )
+        for section in sections
+    )
+
+
+def legacy_plan(sections: Tuple[LegacyItem, ...]) -> Iterator[LegacyEntry]:
+    for section in sections:
+        if section.children:
+            for child in section.children:
+                yield LegacyEntry(section=section, child=child)
+        else:
+            yield LegacyEntry(section=section, child=None)
+
+
+def legacy_slide(sections: Tuple[LegacyItem, ...], index: int) -> LegacyEntry:
+    for position, entry in enumerate(legacy_plan(sections)):
+        if position == index:
+            return entry
+    raise IndexError(index)
+
+
+def legacy_slides_titled(sections: Tuple[LegacyItem, ...], title: str) -> Tuple[int, ...]:
+    return tuple(
+        index
+        for index, entry in enumerate(legacy_plan(sections))
+        if entry.section.title == title or (entry.child is not None and entry.child.title == title)
+    )
+
+
+def traced_mb(build: Callable[[], object]) -> Tuple[object, float]:
+    tracemalloc.start()
+    value = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return value, size / 2**20
+
+
+def best_ms(func: Callable[[], object], repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1e3
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES), help="Slides.")
+    args = parser.parse_args()
+
+    print(
+        f"{'slides':>8} {'model':<8} {'MB':>7} {'iterate ms':>11} "
+        f"{'100 lookups ms':>15} {'100 titles ms':>14}"
+    )
+    for size in args.sizes:
+        text = synthetic_outline_text(size)
+        outline, outline_mb = traced_mb(lambda: Outline.from_text(text))
+        legacy, legacy_mb = traced_mb(lambda: legacy_outline(outline.sections))
+        plan = outline.slide_plan
+
+        rng = random.Random(size)
+        indices = [rng.randrange(len(plan)) for _ in range(100)]
+        titles = [plan[index].section.title for index in indices]
+        for index, title in zip(indices[:10], titles[:10]):
+            entry: SlidePlanEntry = plan[index]
+            reference = legacy_slide(legacy, index)
+            if (entry.section.title, entry.child and entry.child.title) != (
+                reference.section.title,
+                reference.child and reference.child.title,
+            ):
+                raise AssertionError(f"slide {index} differs from the reference")
+            if plan.slides_titled(title) != legacy_slides_titled(legacy, title):
+                raise AssertionError(f"slides titled {title!r} differ from the reference")
+
+        rows: List[Tuple[str, float, float, float, float]] = [
+            (
+                "legacy",
+                legacy_mb,
+                best_ms(lambda: sum(1 for _ in legacy_plan(legacy))),
+                best_ms(lambda: [legacy_slide(legacy, index) for index in indices], repeat=1),
+                best_ms(lambda: [legacy_slides_titled(legacy, t) for t in titles], repeat=1),
+            ),
+            (
+                "slotted",
+                outline_mb,
+                best_ms(lambda: sum(1 for _ in outline.iter_slide_plan())),
+                best_ms(lambda: [plan[index] for index in indices]),
+                best_ms(lambda: [plan.slides_titled(title) for title in titles]),
+            ),
+        ]
+        for model, megabytes, iterate, lookups, title_lookups in rows:
+            print(
+                f"{len(plan):>8} {model:<8} {megabytes:>7.2f} {iterate:>11.2f} "
+                f"{lookups:>15.3f} {title_lookups:>14.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Benchmark slide allocation and full builds from 100 to 5,000 slides.
+
+Times python-pptx's per-slide ``prs.slides.add_slide`` loop against
+``PresentationBuilder._add_slides`` and then full ``build`` calls. Times are
+printed per slide so linear (flat) and quadratic (growing) costs are easy to
+tell apart. Build time is also printed per navigation shape, because the
+synthetic outlines gain sections, and so wider main rows, as they grow.
+
+Run with ``python benchmarks/bench_slide_allocation.py [--skip-legacy]``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from pptx import Presentation as PresentationFactory
+
+from ppt_nav.outline import Outline
+from ppt_nav.ppt_builder import PresentationBuilder
+
+TEMPLATE = Path(__file__).resolve().parents[1] / "template" / "template_16-9.pptx"
+SIZES = (100, 500, 1000, 2000, 5000)
+
+
+def synthetic_outline(slide_count: int, children_per_section: int = 50) -> Outline:
+    lines = []
+    for section in range((slide_count + children_per_section - 1) // children_per_section):
+        lines.append(f"- Section {section + 1}")
+        remaining = min(children_per_section, slide_count - section * children_per_section)
+        lines.extend(f"  - Topic {section + 1}.{child + 1}" for child in range(remaining))
+    return Outline.from_text("\n".join(lines))
+
+
+def time_legacy_allocation(count: int) -> float:
+    prs = PresentationFactory(str(TEMPLATE))
+    layout = prs.slide_layouts[6]
+    start = time.perf_counter()
+    for _ in range(count):
+        prs.slides.add_slide(layout)
+    return time.perf_counter() - start
+
+
+def time_bulk_allocation(count: int) -> float:
+    prs = PresentationFactory(str(TEMPLATE))
+    layout = prs.slide_layouts[6]
+    start = time.perf_counter()
+    PresentationBuilder()._add_slides(prs, layout, count)
+    return time.perf_counter() - start
+
+
+def navigation_shape_count(outline: Outline) -> int:
+    shapes = 0
+    for entry in outline.iter_slide_plan():
+        # Background, chip and one label per section; two lines and one label per sibling.
+        shapes += 2 + len(outline.sections)
+        if entry.section.children:
+            shapes += 2 + len(entry.section.children)
+    return shapes
+
+
+def time_build(outline: Outline) -> float:
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        PresentationBuilder().build(outline, Path(tmp) / "deck.pptx", template_path=TEMPLATE)
+        return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--skip-legacy",
+        action="store_true",
+        help="Skip the add_slide loop, which takes minutes at 5,000 slides.",
+    )
+    args = parser.parse_args()
+
+    print(
+        f"{'slides':>7} {'add_slide us/slide':>19} {'bulk us/slide':>14} "
+        f"{'build ms/slide':>15} {'build us/shape':>15}"
+    )
+    for count in SIZES:
+        legacy = "-" if args.skip_legacy else f"{time_legacy_allocation(count) / count * 1e6:.0f}"
+        bulk = time_bulk_allocation(count) / count * 1e6
+        outline = synthetic_outline(count)
+        build = time_build(outline)
+        print(
+            f"{count:>7} {legacy:>19} {bulk:>14.0f} {build / count * 1e3:>15.2f} "
+            f"{build / navigation_shape_count(outline) * 1e6:>15.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Benchmark ``ppt-nav`` start-up: import time and short commands end to end.
+
+Each case runs in a fresh interpreter, so the numbers include everything a
+pre-commit hook or editor integration would wait for. Importing
+``ppt_nav.ppt_builder`` (python-pptx and lxml) is listed as the cost every
+command used to pay before those imports were deferred to build time.
+
+Run with ``PYTHONPATH=src python benchmarks/bench_startup.py [--repeat N]``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Sequence, Tuple
+
+OUTLINE = "- Introduction\n- Methods\n  - Data\n  - Model\n- Results\n"
+
+
+def best_wall_time(command: Sequence[str], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command, check=True, stdout=subprocess.DEVNULL, env=_env())
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def import_time_us(module: str) -> int:
+    """Cumulative import time of ``module`` as reported by ``-X importtime``."""
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        check=True,
+        capture_output=True,
+        text=True,
+        env=_env(),
+    )
+    for line in reversed(result.stderr.splitlines()):
+        fields = [field.strip() for field in line.split("|")]
+        if len(fields) == 3 and fields[2] == module:
+            return int(fields[1])
+    raise RuntimeError(f"No import time reported for {module}")
+
+
+def _env() -> dict:
+    src = str(Path(__file__).resolve().parents[1] / "src")
+    path = os.environ.get("PYTHONPATH")
+    return {**os.environ, "PYTHONPATH": f"{src}{os.pathsep}{path}" if path else src}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per case; the fastest counts.")
+    args = parser.parse_args()
+
+    print(f"{'import':<28} {'ms':>8}")
+    for module in ("ppt_nav", "ppt_nav.cli", "ppt_nav.ppt_builder"):
+        best = min(import_time_us(module) for _ in range(args.repeat))
+        print(f"{module:<28} {best / 1e3:>8.1f}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        outline = Path(tmp) / "outline.md"
+        outline.write_text(OUTLINE, encoding="utf-8")
+        python = [sys.executable]
+        cases: List[Tuple[str, List[str]]] = [
+            ("python -c pass", python + ["-c", "pass"]),
+            ("ppt-nav --help", python + ["-m", "ppt_nav", "--help"]),
+            ("ppt-nav --check", python + ["-m", "ppt_nav", str(outline), "--check"]),
+            ("ppt-nav (build)", python + ["-m", "ppt_nav", str(outline), f"{tmp}/o.pptx"]),
+        ]
+        print(f"\n{'command':<28} {'ms':>8}")
+        for label, command in cases:
+            print(f"{label:<28} {best_wall_time(command, args.repeat) * 1e3:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
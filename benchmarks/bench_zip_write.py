@@ -0,0 +1,92 @@
+"""Benchmark writing a large deck's zip with each compression preset.
+
+Builds synthetic decks once and keeps the parts a build writes (slides,
+their relationships, the presentation part and content types). Then, for
+each preset in :data:`ppt_nav.compression.ZIP_PRESETS` and each thread
+count, it times writing those parts to a file on disk through
+:class:`PartWriter` and reports the time and the resulting size. Template
+parts are left out because builds copy them without recompressing.
+
+Deflating on several threads only pays off with more than one CPU core.
+
+Run with ``PYTHONPATH=src python -m benchmarks.bench_zip_write [--sizes N ...]``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import os
+import tempfile
+import time
+import zipfile
+from dataclasses import replace
+from pathlib import Path
+from typing import List, Sequence, Tuple
+
+from benchmarks.outlines import synthetic_outline_text
+from ppt_nav.compression import ZIP_PRESETS, ZipOptions
+from ppt_nav.generator import generate_presentation_bytes, resolve_template
+from ppt_nav.package_writer import PartWriter
+
+SIZES = (500, 2_000)
+THREADS = (1, 4)
+
+
+def written_parts(size: int) -> List[Tuple[str, bytes]]:
+    template = resolve_template(None)
+    with zipfile.ZipFile(template) as archive:
+        template_names = set(archive.namelist())
+    deck = generate_presentation_bytes(
+        synthetic_outline_text(size), template=template, zip_options=ZIP_PRESETS["store"]
+    )
+    with zipfile.ZipFile(io.BytesIO(deck)) as archive:
+        return [
+            (info.filename, archive.read(info))
+            for info in archive.infolist()
+            if info.filename not in template_names
+            or info.filename in ("[Content_Types].xml", "ppt/presentation.xml")
+        ]
+
+
+def write_once(parts: Sequence[Tuple[str, bytes]], options: ZipOptions, path: Path) -> float:
+    start = time.perf_counter()
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        with PartWriter(archive, options) as output:
+            for name, data in parts:
+                output.write(name, data)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES), help="Slides.")
+    parser.add_argument("--repeat", type=int, default=3, help="Best of this many writes.")
+    args = parser.parse_args()
+
+    print(f"CPU cores: {os.cpu_count()}")
+    print(
+        f"{'slides':>7} {'preset':<9} {'threads':>7} {'write ms':>9} {'MB':>7} {'vs default':>10}"
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "deck.pptx"
+        for size in args.sizes:
+            parts = written_parts(size)
+            baseline_ms = None
+            for preset, options in ZIP_PRESETS.items():
+                for threads in THREADS:
+                    seconds = min(
+                        write_once(parts, replace(options, threads=threads), path)
+                        for _ in range(args.repeat)
+                    )
+                    megabytes = path.stat().st_size / 2**20
+                    ms = seconds * 1e3
+                    baseline_ms = baseline_ms or ms
+                    print(
+                        f"{size:>7} {preset:<9} {threads:>7} {ms:>9.1f} {megabytes:>7.2f} "
+                        f"{ms / baseline_ms:>9.2f}x"
+                    )
+
+
+if __name__ == "__main__":
+    main()
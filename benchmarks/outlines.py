@@ -0,0 +1,72 @@
+"""Synthetic outlines for the benchmark suite.
+
+Titles mix Latin and CJK text with lengths drawn from a skewed distribution
+(mostly short, a long tail of wide ones), and a share of sections carry
+enough subsections to force the sub-navigation row to squeeze its labels.
+Generation is seeded, so a given size always yields the same outline.
+"""
+
+from __future__ import annotations
+
+import random
+
+LATIN_WORDS = (
+    "overview", "market", "roadmap", "design", "review", "pricing", "risk", "metrics",
+    "customer", "research", "platform", "growth", "hiring", "budget", "launch", "support",
+    "security", "quality", "strategy", "timeline", "partners", "analysis", "summary", "Q3",
+    "API", "mobile", "cloud", "sales", "retention", "onboarding", "infrastructure",
+    "operations", "feedback", "compliance", "integration", "experiments", "forecast",
+)
+
+# Common characters from business slide titles (traditional and simplified).
+CJK_CHARS = (
+    "市場分析產品規劃設計研究客戶營運成長預算風險品質策略時程合作夥伴總結"
+    "技術架構平台行動雲端銷售留存導入資安流程整合實驗預測目標執行成果檢討"
+    "年度季報告簡介背景問題方案效益資源組織人才招募訓練管理系統數據指標"
+)
+
+# (children, weight): most sections are modest, some are wide enough that
+# the sub row has to shrink labels, and a few have no subsections at all.
+CHILD_COUNTS = ((0, 1), (3, 3), (5, 4), (8, 3), (12, 2), (20, 1))
+
+
+def synthetic_outline_text(slide_count: int, seed: int = 0) -> str:
+    """Markdown outline that expands to exactly ``slide_count`` slides."""
+
+    if slide_count < 1:
+        raise ValueError("slide_count must be at least 1")
+
+    rng = random.Random(seed * 1_000_003 + slide_count)
+    counts, weights = zip(*CHILD_COUNTS)
+    lines = []
+    remaining = slide_count
+    while remaining:
+        children = min(rng.choices(counts, weights)[0], remaining)
+        lines.append(f"- {_title(rng)}")
+        lines.extend(f"  - {_title(rng)}" for _ in range(children))
+        remaining -= max(children, 1)
+    return "\n".join(lines) + "\n"
+
+
+def _title(rng: random.Random) -> str:
+    style = rng.random()
+    if style < 0.45:
+        return _latin(rng, _length(rng, 1, 6))
+    if style < 0.85:
+        return _cjk(rng, _length(rng, 2, 12))
+    # Mixed titles such as "API 整合規劃".
+    return f"{_latin(rng, _length(rng, 1, 2))} {_cjk(rng, _length(rng, 2, 6))}"
+
+
+def _length(rng: random.Random, low: int, high: int) -> int:
+    # Triangular with the mode near the short end gives a long right tail.
+    return int(round(rng.triangular(low, high, low + (high - low) * 0.2)))
+
+
+def _latin(rng: random.Random, words: int) -> str:
+    title = " ".join(rng.choice(LATIN_WORDS) for _ in range(words))
+    return title[0].upper() + title[1:]
+
+
+def _cjk(rng: random.Random, chars: int) -> str:
+    return "".join(rng.choice(CJK_CHARS) for _ in range(chars))
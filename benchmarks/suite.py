@@ -0,0 +1,180 @@
+"""Phase timings, memory and output size for one synthetic outline size.
+
+The build phases mirror :meth:`PresentationBuilder.build` step by step so
+each can be timed on its own; the save phase is the builder's own
+:func:`ppt_nav.package_writer.save_presentation`.
+"""
+
+from __future__ import annotations
+
+import platform
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pptx
+from pptx import Presentation as PresentationFactory
+
+from benchmarks.outlines import synthetic_outline_text
+from ppt_nav.outline import Outline
+from ppt_nav.package_writer import RawZipSource, save_presentation
+from ppt_nav.ppt_builder import PresentationBuilder
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None  # type: ignore[assignment]
+
+TEMPLATE = Path(__file__).resolve().parents[1] / "template" / "template_16-9.pptx"
+
+PHASES = ("parse", "plan", "load_template", "measure", "allocate", "render", "save")
+
+# Metrics that are compared against the baseline, and the relative increase
+# over baseline treated as a regression unless overridden on the command line.
+TIME_METRICS = tuple(f"{phase}_s" for phase in PHASES) + ("total_s",)
+SIZE_METRICS = ("peak_traced_mb", "peak_rss_mb", "output_bytes")
+
+
+def environment() -> Dict[str, str]:
+    return {
+        "python": platform.python_version(),
+        "python-pptx": pptx.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+    }
+
+
+def run_size(slide_count: int, repeat: int, template: Path = TEMPLATE) -> Dict[str, float]:
+    """Best-of-``repeat`` phase times plus memory and output size."""
+
+    text = synthetic_outline_text(slide_count)
+    best: Dict[str, float] = {}
+    output_bytes = 0
+    for _ in range(repeat):
+        timings, output_bytes = _timed_build(text, template)
+        for name, seconds in timings.items():
+            best[name] = min(seconds, best.get(name, seconds))
+
+    result: Dict[str, float] = {"slides": slide_count, "output_bytes": output_bytes}
+    result.update({f"{phase}_s": best[phase] for phase in PHASES})
+    result["total_s"] = sum(best[phase] for phase in PHASES)
+    # Memory is measured in a fresh process so earlier sizes and the timing
+    # runs above do not raise the high-water mark.
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+        traced, rss = executor.submit(_measure_memory, text, str(template)).result()
+    result["peak_traced_mb"] = traced
+    if rss is not None:
+        result["peak_rss_mb"] = rss
+    return result
+
+
+def _timed_build(text: str, template: Path) -> tuple[Dict[str, float], int]:
+    timings: Dict[str, float] = {}
+    clock = time.perf_counter
+
+    start = clock()
+    outline = Outline.from_text(text)
+    timings["parse"] = clock() - start
+
+    start = clock()
+    plan = outline.slide_plan
+    timings["plan"] = clock() - start
+
+    builder = PresentationBuilder()
+    with RawZipSource(template) as source:
+        start = clock()
+        prs = PresentationFactory(str(template))
+        timings["load_template"] = clock() - start
+
+        start = clock()
+        builder._begin_build(outline, int(prs.slide_width), int(prs.slide_height))
+        timings["measure"] = clock() - start
+
+        start = clock()
+        slides = builder._add_slides(prs, prs.slide_layouts[6], len(plan))
+        timings["allocate"] = clock() - start
+
+        start = clock()
+        for index, slide in enumerate(slides):
+            builder._fill_slide(slide, plan, index)
+        timings["render"] = clock() - start
+
+        with tempfile.TemporaryDirectory() as tmp:
+            output_path = Path(tmp) / "deck.pptx"
+            start = clock()
+            save_presentation(prs, output_path, source, {prs.part.partname})
+            timings["save"] = clock() - start
+            output_bytes = output_path.stat().st_size
+    return timings, output_bytes
+
+
+def _measure_memory(text: str, template: str) -> tuple[float, Optional[float]]:
+    # tracemalloc only sees Python allocations (not libxml2's), while the
+    # RSS high-water mark sees everything; build once for each.
+    rss_before = _max_rss_mb()
+    _build(text, Path(template))
+    rss_after = _max_rss_mb()
+    rss = rss_after - rss_before if rss_after is not None and rss_before is not None else None
+
+    tracemalloc.start()
+    _build(text, Path(template))
+    _, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return traced_peak / 2**20, rss
+
+
+def _build(text: str, template: Path) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        outline = Outline.from_text(text)
+        PresentationBuilder().build(outline, Path(tmp) / "deck.pptx", template)
+
+
+def _max_rss_mb() -> Optional[float]:
+    # On Linux ru_maxrss survives exec, so a spawned worker would start with
+    # the parent's high-water mark; VmHWM belongs to this process alone.
+    status = Path("/proc/self/status")
+    if status.exists():
+        for line in status.read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 2**10
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, other Unixes KiB.
+    return peak / 2**20 if platform.system() == "Darwin" else peak / 2**10
+
+
+def compare(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    time_tolerance: float,
+    size_tolerance: float,
+) -> List[str]:
+    """Describe every metric that grew past its tolerance over ``baseline``.
+
+    Both mappings are keyed by slide count (as a string, the way they are
+    stored in JSON). Time increases under 5 ms are ignored as noise.
+    """
+
+    regressions = []
+    for size, current in results.items():
+        previous = baseline.get(size)
+        if previous is None:
+            continue
+        for metric in TIME_METRICS + SIZE_METRICS:
+            if metric not in current or not previous.get(metric):
+                continue
+            tolerance = time_tolerance if metric in TIME_METRICS else size_tolerance
+            ratio = current[metric] / previous[metric]
+            if metric in TIME_METRICS and current[metric] - previous[metric] < 0.005:
+                continue
+            if ratio > 1 + tolerance:
+                regressions.append(
+                    f"{size} slides: {metric} {previous[metric]:.4g} -> {current[metric]:.4g} "
+                    f"(+{(ratio - 1) * 100:.0f}%)"
+                )
+    return regressions
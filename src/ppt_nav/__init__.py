@@ -1,10 +1,20 @@
 """Public API for the PPT navigation generator package."""
 
-from ppt_nav.generator import generate_from_markdown
-from ppt_nav.outline import Outline, OutlineItem
+from ppt_nav.generator import (
+	generate_from_markdown,
+	generate_presentation,
+	generate_presentation_bytes,
+	plan_presentation_layout,
+)
+from ppt_nav.outline import Outline, OutlineItem, OutlineSyntaxError, parse_outline
 
 __all__ = [
 	"generate_from_markdown",
+	"generate_presentation",
+	"generate_presentation_bytes",
+	"plan_presentation_layout",
 	"Outline",
 	"OutlineItem",
+	"OutlineSyntaxError",
+	"parse_outline",
 ]
@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+"""Content-addressed cache of built decks.
+
+A build is identified by a digest of everything that decides its output:
+the parsed outline, the template bytes, the builder options, the text
+measurement table, ppt-nav's own source and the versions of python-pptx and
+lxml, whose serialisers write the slide XML. A later build with the same
+digest copies the cached PPTX into place instead of building the deck again.
+Once the cache directory outgrows its size limit, the least recently used
+entries are removed.
+"""
+
+import hashlib
+import importlib.util
+import io
+import json
+import os
+import re
+import shutil
+from functools import lru_cache
+from pathlib import Path
+from typing import BinaryIO, List, Optional, Sequence, Tuple, Union
+
+from ppt_nav.compression import ZipOptions
+from ppt_nav.outline import Outline, OutlineItem
+from ppt_nav.paths import atomic_output, default_cache_dir
+from ppt_nav.text_metrics import TextWidthEstimator
+
+# Bump when the key layout or the entry format changes.
+_CACHE_VERSION = 1
+_SUFFIX = ".pptx"
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+class BuildCache:
+    """Built decks kept under ``directory`` as ``<digest>.pptx``.
+
+    ``directory`` defaults to ``builds/`` in the user cache directory.
+    ``max_bytes`` bounds the total size of the entries. After each store, the
+    least recently used entries are removed until the rest fit. An entry's
+    modification time records its last use and is refreshed on every hit.
+    ``hits`` and ``misses`` count the lookups made through this object.
+    """
+
+    def __init__(
+        self, directory: Optional[Path] = None, max_bytes: int = DEFAULT_MAX_BYTES
+    ) -> None:
+        if max_bytes < 0:
+            raise ValueError("Cache size must not be negative.")
+        self.directory = directory or default_cache_dir() / "builds"
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def key(
+        self,
+        outline: Outline,
+        template: Union[Path, io.BytesIO],
+        font_size: Optional[float] = None,
+        text_metrics: Optional[TextWidthEstimator] = None,
+        shared_layouts: bool = False,
+        compact_nav: bool = False,
+        zip_options: Optional[ZipOptions] = None,
+    ) -> str:
+        """Digest identifying the deck these inputs build.
+
+        The engine is not part of the key because both engines write the same
+        deck; nor is ``zip_options.threads``, which does not change the bytes.
+        The palette and layout constants live in ppt-nav's source, which is
+        hashed in place of a version number, so editing them also invalidates
+        every entry.
+        """
+
+        payload = {
+            "version": _CACHE_VERSION,
+            "generator": _generator_digest(),
+            "serialisers": _serialiser_versions(),
+            "outline": _outline_key(outline.sections),
+            "template": _template_digest(template),
+            "font_size": font_size,
+            "text_metrics": text_metrics.fingerprint() if text_metrics is not None else None,
+            "shared_layouts": shared_layouts,
+            "compact_nav": compact_nav,
+            "compression": (zip_options or ZipOptions()).fingerprint(),
+        }
+        encoded = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    def load(self, key: str, output: Union[Path, BinaryIO]) -> bool:
+        """Copy the deck stored under ``key`` to ``output``; ``False`` on a miss.
+
+        A path is replaced atomically, so an interrupted copy, or an entry
+        evicted while it is being copied, leaves the previous deck in place.
+        """
+
+        entry = self._entry_path(key)
+        try:
+            source = entry.open("rb")
+        except FileNotFoundError:
+            # Never stored, or evicted by another process since.
+            self.misses += 1
+            return False
+        # Once open, the entry stays readable even if another process evicts it.
+        with source:
+            if isinstance(output, Path):
+                with atomic_output(output) as temp_path, temp_path.open("wb") as target:
+                    shutil.copyfileobj(source, target)
+            else:
+                shutil.copyfileobj(source, output)
+        try:
+            os.utime(entry)
+        except OSError:
+            # Only LRU bookkeeping; the deck has already been written.
+            pass
+        self.hits += 1
+        return True
+
+    def store(self, key: str, data: bytes) -> None:
+        """Add a built deck under ``key`` and evict entries beyond the size limit."""
+
+        if len(data) > self.max_bytes:
+            return
+        entry = self._entry_path(key)
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            temp_path = entry.with_name(f".{entry.name}.{os.getpid()}.tmp")
+            temp_path.write_bytes(data)
+            os.replace(temp_path, entry)
+            self._evict(keep=entry)
+        except OSError:
+            # An unwritable cache only costs a rebuild next time.
+            pass
+
+    def _entry_path(self, key: str) -> Path:
+        return self.directory / f"{key}{_SUFFIX}"
+
+    def _entries(self) -> List[Tuple[int, int, Path]]:
+        entries = []
+        try:
+            paths = list(self.directory.glob(f"*{_SUFFIX}"))
+        except OSError:
+            return []
+        for path in paths:
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+        return entries
+
+    def _evict(self, keep: Path) -> None:
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            path.unlink(missing_ok=True)
+            total -= size
+
+
+def _outline_key(items: Sequence[OutlineItem]) -> list:
+    return [[item.title, _outline_key(item.children)] for item in items]
+
+
+def _template_digest(template: Union[Path, io.BytesIO]) -> str:
+    if isinstance(template, Path):
+        return hashlib.sha256(template.read_bytes()).hexdigest()
+    with template.getbuffer() as view:
+        return hashlib.sha256(view).hexdigest()
+
+
+@lru_cache(maxsize=None)
+def _generator_digest() -> str:
+    # The package's own modules stand in for a version number, so an edited
+    # checkout never serves decks built by older code.
+    digest = hashlib.sha256()
+    for path in sorted(Path(__file__).resolve().parent.glob("*.py")):
+        digest.update(path.name.encode("utf-8"))
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+@lru_cache(maxsize=None)
+def _serialiser_versions() -> Tuple[Optional[str], ...]:
+    # python-pptx and lxml write the slide XML, so upgrading either can change
+    # the output. Importing pptx takes most of a build's start-up time, which a
+    # cache hit otherwise skips, so its version is read from the package source.
+    import lxml
+
+    return (_package_version("pptx"), lxml.__version__)
+
+
+def _package_version(name: str) -> Optional[str]:
+    spec = importlib.util.find_spec(name)
+    if spec is None or spec.origin is None:
+        return None
+    source = Path(spec.origin).read_text(encoding="utf-8")
+    match = re.search(r"^__version__\s*=\s*['\"]([^'\"]+)['\"]", source, re.MULTILINE)
+    return match.group(1) if match else None
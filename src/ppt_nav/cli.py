@@ -1,17 +1,113 @@
 from __future__ import annotations
 
 import argparse
+import cProfile
+import json
 import sys
+from dataclasses import replace
 from pathlib import Path
-from typing import Sequence
+from typing import TYPE_CHECKING, Sequence
 
-from ppt_nav.generator import generate_from_markdown
+from ppt_nav.build_cache import DEFAULT_MAX_BYTES, BuildCache
+from ppt_nav.compression import ZIP_PRESETS, ZipOptions
+from ppt_nav.font_metrics import FontMetricsWidthEstimator, find_label_font_file
+from ppt_nav.generator import (
+    ENGINES,
+    BatchResult,
+    Variant,
+    collect_batch_inputs,
+    generate_batch,
+    generate_from_markdown,
+    generate_presentation,
+    generate_variants,
+    plan_presentation_layout,
+    update_from_markdown,
+    watch_markdown,
+)
+from ppt_nav.generator import resolve_template
+from ppt_nav.metrics import BuildMetrics
+from ppt_nav.outline import Outline, OutlineSyntaxError
+from ppt_nav.text_metrics import DEFAULT_EAST_ASIAN_FONT, DEFAULT_LATIN_FONT, TextWidthEstimator
+
+if TYPE_CHECKING:
+    from ppt_nav.watch import WatchUpdate
+
+# "-" as the input or output path means stdin or stdout.
+STDIO = Path("-")
 
 
 def run(argv: Sequence[str] | None = None) -> int:
     """Entry point used by both ``python -m ppt_nav`` and ``ppt-nav``."""
 
-    parsed_args = _build_parser().parse_args(argv if argv is not None else sys.argv[1:])
+    args = list(argv if argv is not None else sys.argv[1:])
+    if args[:1] == ["serve"]:
+        return _handle_serve(_build_serve_parser().parse_args(args[1:]))
+    parser = _build_parser()
+    parsed_args = parser.parse_args(args)
+    if parsed_args.cache_size < 0:
+        parser.error("--cache-size must not be negative")
+    if parsed_args.zip_threads < 1:
+        parser.error("--zip-threads must be at least 1")
+    if parsed_args.check:
+        if parsed_args.watch or parsed_args.update:
+            parser.error("--check cannot be combined with --watch/--update")
+        if parsed_args.batch or parsed_args.manifest is not None:
+            return _handle_check(collect_batch_inputs(parsed_args.batch, parsed_args.manifest))
+        if parsed_args.input is None:
+            parser.error("the following arguments are required: input")
+        return _handle_check([parsed_args.input])
+    if parsed_args.batch or parsed_args.manifest is not None:
+        if parsed_args.input is not None or parsed_args.output is not None:
+            parser.error("positional input/output cannot be combined with --batch/--manifest")
+        if parsed_args.watch or parsed_args.update:
+            parser.error("--watch/--update cannot be combined with --batch/--manifest")
+        return _handle_batch(parsed_args)
+    if parsed_args.shared_layouts:
+        if parsed_args.engine != "pptx":
+            parser.error("--shared-layouts is only supported by --engine pptx")
+        if parsed_args.watch or parsed_args.update:
+            parser.error("--shared-layouts cannot be combined with --watch/--update")
+    if parsed_args.input is None:
+        parser.error("the following arguments are required: input")
+    if parsed_args.layout is not None:
+        if parsed_args.output is not None:
+            parser.error("--layout writes the layout instead of a deck; omit the output path")
+        if parsed_args.watch or parsed_args.update or parsed_args.templates:
+            parser.error("--layout cannot be combined with --watch/--update/--templates")
+        layout_suffix = parsed_args.layout.suffix.lower()
+        if parsed_args.layout != STDIO and layout_suffix not in (".json", ".svg"):
+            parser.error("--layout needs a .json or .svg path, or '-' for JSON on stdout")
+        return _handle_layout(parsed_args)
+    if parsed_args.templates or parsed_args.font_sizes:
+        if parsed_args.output is not None:
+            parser.error("--templates/--font-sizes write one deck per variant; use --output-dir")
+        if parsed_args.template is not None and parsed_args.templates:
+            parser.error("--template cannot be combined with --templates")
+        if parsed_args.watch or parsed_args.update or parsed_args.input == STDIO:
+            parser.error("--templates/--font-sizes cannot be combined with --watch/--update or '-'")
+        return _handle_variants(parsed_args)
+    if parsed_args.jobs is not None:
+        if parsed_args.jobs < 1:
+            parser.error("--jobs must be at least 1")
+        if parsed_args.jobs > 1 and parsed_args.engine != "stream":
+            parser.error("--jobs with one outline draws slides in parallel; needs --engine stream")
+    if _cache_from_args(parsed_args) is not None and (parsed_args.watch or parsed_args.update):
+        parser.error("--cache cannot be combined with --watch/--update")
+    if STDIO in (parsed_args.input, parsed_args.output):
+        if parsed_args.watch or parsed_args.update:
+            parser.error("'-' (stdin/stdout) cannot be combined with --watch/--update")
+        if _writes_stdout(parsed_args) and sys.stdout.isatty():
+            parser.error("refusing to write a PPTX to a terminal; redirect stdout or name a file")
+    if parsed_args.watch and parsed_args.update:
+        parser.error("--watch cannot be combined with --update")
+    if parsed_args.update:
+        if parsed_args.engine != "pptx":
+            parser.error("--update edits the deck through python-pptx and ignores --engine")
+        return _handle_update(parsed_args)
+    if parsed_args.watch:
+        if parsed_args.engine != "pptx":
+            parser.error("--watch keeps the deck in memory and only supports --engine pptx")
+        return _handle_watch(parsed_args)
     return _handle_build(parsed_args)
 
 
@@ -19,13 +115,19 @@ def _build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
         prog="ppt-nav",
         description="Generate PPT decks with a two-layer navigation header.",
+        epilog="Run 'ppt-nav serve --help' for the local render service.",
+    )
+    parser.add_argument(
+        "input", type=Path, nargs="?", help="Markdown outline file ('-' reads stdin)."
     )
-    parser.add_argument("input", type=Path, help="Markdown outline file.")
     parser.add_argument(
         "output",
         type=Path,
         nargs="?",
-        help="Optional PPTX path (defaults to <input>.pptx).",
+        help=(
+            "Optional PPTX path (defaults to <input>.pptx); '-' writes to stdout, which is "
+            "also the default when the outline comes from stdin."
+        ),
     )
     parser.add_argument(
         "--font-size",
@@ -39,23 +141,434 @@ def _build_parser() -> argparse.ArgumentParser:
         default=None,
         help="Optional PPTX template path (defaults to bundled template_16-9.pptx when available).",
     )
+    parser.add_argument(
+        "--engine",
+        choices=ENGINES,
+        default="pptx",
+        help=(
+            "Build through python-pptx (default) or stream slide XML straight into the "
+            "output file, which keeps memory flat on very large decks."
+        ),
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help=(
+            "Keep running and rebuild whenever the outline changes, redrawing only the "
+            "navigation rows that changed."
+        ),
+    )
+    parser.add_argument(
+        "--update",
+        action="store_true",
+        help=(
+            "Refresh the navigation of an existing deck (the output path) in place, keeping "
+            "slide content; new outline entries get new slides."
+        ),
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help=(
+            "Only parse and validate the outline (or every --batch/--manifest input) and "
+            "report errors; nothing is built and python-pptx is never loaded."
+        ),
+    )
+    parser.add_argument(
+        "--shared-layouts",
+        action="store_true",
+        help=(
+            "Draw each section's main navigation row once on a generated slide layout "
+            "instead of on every slide; gives much smaller decks."
+        ),
+    )
+    parser.add_argument(
+        "--compact-nav",
+        action="store_true",
+        help=(
+            "Draw each navigation row's labels as one textbox with tab stops instead of one "
+            "textbox per label. Use it again with --update on decks built this way."
+        ),
+    )
+    parser.add_argument(
+        "--layout",
+        type=Path,
+        default=None,
+        metavar="FILE",
+        help=(
+            "Write the navigation layout of every slide as JSON (.json, or '-' for stdout) "
+            "or an SVG preview (.svg) instead of building a deck."
+        ),
+    )
+
+    compression = parser.add_argument_group("output compression")
+    compression.add_argument(
+        "--compression",
+        choices=tuple(ZIP_PRESETS),
+        default="default",
+        help=(
+            "How the deck's parts are compressed: 'fast' for quick previews, 'smallest' for "
+            "archiving, 'store' for none (default: zlib's default level, like PowerPoint)."
+        ),
+    )
+    compression.add_argument(
+        "--zip-threads",
+        type=int,
+        default=1,
+        metavar="N",
+        help=(
+            "Deflate large parts on N threads while slides are drawn; the deck's bytes are "
+            "the same (default: 1)."
+        ),
+    )
+
+    profiling = parser.add_argument_group("profiling")
+    profiling.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print time per build phase, per-slide percentiles, shape counts and part sizes.",
+    )
+    profiling.add_argument(
+        "--metrics-json",
+        type=Path,
+        default=None,
+        help="Write the same build metrics as JSON to this file.",
+    )
+    profiling.add_argument(
+        "--cprofile",
+        type=Path,
+        default=None,
+        metavar="FILE.prof",
+        help="Run the build under cProfile and write the stats here (view with snakeviz/pstats).",
+    )
+
+    _add_text_measurement_arguments(parser)
+
+    cache = parser.add_argument_group("build cache")
+    cache.add_argument(
+        "--cache",
+        action="store_true",
+        help=(
+            "Copy a previously built deck into place when the outline, template and options "
+            "are unchanged, instead of building it again."
+        ),
+    )
+    cache.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=None,
+        help="Build cache directory (default: builds/ in the user cache dir); implies --cache.",
+    )
+    cache.add_argument(
+        "--cache-size",
+        type=float,
+        default=DEFAULT_MAX_BYTES / 2**20,
+        metavar="MB",
+        help=(
+            "Size limit of the build cache; least recently used decks are evicted beyond it "
+            f"(default: {DEFAULT_MAX_BYTES // 2**20})."
+        ),
+    )
+
+    variants = parser.add_argument_group("variants")
+    variants.add_argument(
+        "--templates",
+        type=Path,
+        nargs="+",
+        default=[],
+        metavar="TEMPLATE",
+        help=(
+            "Build the outline once per template (and per --font-sizes entry) from a single "
+            "parse, in parallel, as <stem>-<template>-<size>pt.pptx."
+        ),
+    )
+    variants.add_argument(
+        "--font-sizes",
+        type=float,
+        nargs="+",
+        default=[],
+        metavar="PT",
+        help="Build the outline once per font size (and per --templates entry).",
+    )
+
+    batch = parser.add_argument_group("batch mode")
+    batch.add_argument(
+        "--batch",
+        metavar="PATTERN",
+        nargs="+",
+        action="extend",
+        default=[],
+        help="Build every outline matching these paths or globs (quote globs: 'decks/**/*.md').",
+    )
+    batch.add_argument(
+        "--manifest",
+        type=argparse.FileType("r", encoding="utf-8"),
+        default=None,
+        help="File listing one outline path or glob per line; '-' reads the list from stdin.",
+    )
+    batch.add_argument(
+        "--output-dir",
+        type=Path,
+        default=None,
+        help="Directory for batch or variant outputs (defaults to next to each outline).",
+    )
+    batch.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help=(
+            "Number of worker processes for batch or variant builds (default: CPU count). With "
+            "a single outline and --engine stream, slides are drawn by this many processes."
+        ),
+    )
+    return parser
+
+
+def _build_serve_parser() -> argparse.ArgumentParser:
+    from ppt_nav.server import DEFAULT_HOST, DEFAULT_PORT
+
+    parser = argparse.ArgumentParser(
+        prog="ppt-nav serve",
+        description=(
+            "Run a local render service that keeps python-pptx and the template loaded. "
+            "POST outline text to /build to get the PPTX back."
+        ),
+    )
+    parser.add_argument(
+        "--host", default=DEFAULT_HOST, help=f"Address to listen on (default: {DEFAULT_HOST})."
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=DEFAULT_PORT,
+        help=f"TCP port to listen on (default: {DEFAULT_PORT}; 0 picks a free one).",
+    )
+    parser.add_argument(
+        "--socket",
+        type=Path,
+        default=None,
+        help="Listen on this Unix socket instead of TCP.",
+    )
+    parser.add_argument(
+        "--template",
+        type=Path,
+        default=None,
+        help="Default PPTX template (requests may name another with ?template=).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes building decks (default: CPU count, at most 4).",
+    )
+    parser.add_argument(
+        "--max-pending",
+        type=int,
+        default=None,
+        help="Requests accepted at once, running or queued; more get 503 (default: 4 per worker).",
+    )
+    _add_text_measurement_arguments(parser)
     return parser
 
 
+def _add_text_measurement_arguments(parser: argparse.ArgumentParser) -> None:
+    metrics = parser.add_argument_group("text measurement")
+    metrics.add_argument(
+        "--font-metrics",
+        action="store_true",
+        help=(
+            f"Size labels from installed font files ({DEFAULT_LATIN_FONT}, "
+            f"{DEFAULT_EAST_ASIAN_FONT}) instead of the built-in estimate."
+        ),
+    )
+    metrics.add_argument(
+        "--latin-font",
+        type=Path,
+        default=None,
+        help="TrueType file (.ttf/.ttc) to measure Latin text with; implies --font-metrics.",
+    )
+    metrics.add_argument(
+        "--east-asian-font",
+        type=Path,
+        default=None,
+        help="TrueType file (.ttf/.ttc) to measure East Asian text with; implies --font-metrics.",
+    )
+
+
+def _handle_check(input_paths: Sequence[Path]) -> int:
+    if not input_paths:
+        print("No outlines matched the batch inputs.")
+        return 1
+    failures = 0
+    for input_path in input_paths:
+        try:
+            if input_path == STDIO:
+                outline = Outline.from_text(_read_stdin())
+            else:
+                outline = Outline.from_file(input_path)
+            slides = len(outline.slide_plan)
+        except FileNotFoundError:
+            print(f"{input_path}: file not found")
+            failures += 1
+            continue
+        except (ValueError, UnicodeDecodeError) as exc:
+            print(f"{input_path}: {exc}")
+            failures += 1
+            continue
+        print(f"{input_path}: ok ({len(outline.sections)} sections, {slides} slides)")
+    return 1 if failures else 0
+
+
 def _handle_build(args: argparse.Namespace) -> int:
     input_path: Path = args.input
     output_path: Path | None = args.output
     font_size: float = args.font_size
     template_path: Path | None = args.template
+    # With the deck on stdout, every message goes to stderr.
+    messages = sys.stderr if _writes_stdout(args) else sys.stdout
+
+    collected: list[BuildMetrics] = []
+    wants_metrics = args.profile or args.metrics_json is not None
+    profiler = cProfile.Profile() if args.cprofile is not None else None
+
+    try:
+        if font_size <= 0:
+            raise ValueError("Font size must be positive")
+        text_metrics = _text_metrics_from_args(args)
+        cache = _cache_from_args(args)
+        if profiler is not None:
+            profiler.enable()
+        options = dict(
+            font_size=font_size,
+            text_metrics=text_metrics,
+            engine=args.engine,
+            on_metrics=collected.append if wants_metrics else None,
+            shared_layouts=args.shared_layouts,
+            compact_nav=args.compact_nav,
+            cache=cache,
+            max_workers=args.jobs,
+            zip_options=_zip_options_from_args(args),
+        )
+        try:
+            if input_path == STDIO or _writes_stdout(args):
+                destination = _build_stdio(input_path, output_path, template_path, options)
+            else:
+                destination = generate_from_markdown(
+                    input_path, output_path, template_path=template_path, **options
+                )
+        finally:
+            if profiler is not None:
+                profiler.disable()
+    except FileNotFoundError as exc:
+        print(str(exc), file=messages)
+        return 1
+    except ValueError as exc:
+        print(f"Outline error: {exc}", file=messages)
+        return 1
+
+    if cache is None:
+        print(f"Presentation generated at {destination}", file=messages)
+    elif cache.hits:
+        print(
+            f"Presentation copied from the build cache to {destination} (cache hit)",
+            file=messages,
+        )
+    else:
+        print(f"Presentation generated at {destination} (cache miss)", file=messages)
+    if collected:
+        if args.profile:
+            print(collected[0].format_report(), file=messages)
+        if args.metrics_json is not None:
+            args.metrics_json.write_text(
+                json.dumps(collected[0].to_dict(), indent=2) + "\n", encoding="utf-8"
+            )
+            print(f"Build metrics written to {args.metrics_json}", file=messages)
+    if profiler is not None:
+        profiler.dump_stats(str(args.cprofile))
+        print(f"cProfile stats written to {args.cprofile}", file=messages)
+    return 0
+
+
+def _handle_layout(args: argparse.Namespace) -> int:
+    layout_path: Path = args.layout
+    # With the layout on stdout, every message goes to stderr.
+    messages = sys.stderr if layout_path == STDIO else sys.stdout
+    try:
+        if args.font_size <= 0:
+            raise ValueError("Font size must be positive")
+        if args.input == STDIO:
+            source = _read_stdin()
+        else:
+            if not args.input.exists():
+                raise FileNotFoundError(f"Input file not found: {args.input}")
+            source = args.input.read_text(encoding="utf-8")
+        deck = plan_presentation_layout(
+            source,
+            template=args.template,
+            font_size=args.font_size,
+            text_metrics=_text_metrics_from_args(args),
+        )
+    except FileNotFoundError as exc:
+        print(str(exc), file=messages)
+        return 1
+    except ValueError as exc:
+        print(f"Outline error: {exc}", file=messages)
+        return 1
+
+    if layout_path.suffix.lower() == ".svg":
+        layout_path.write_text(deck.to_svg(), encoding="utf-8")
+    else:
+        text = json.dumps(deck.to_dict(), ensure_ascii=False, indent=2) + "\n"
+        if layout_path == STDIO:
+            sys.stdout.write(text)
+            return 0
+        layout_path.write_text(text, encoding="utf-8")
+    print(f"Layout of {len(deck)} slides written to {layout_path}", file=messages)
+    return 0
+
+
+def _build_stdio(
+    input_path: Path, output_path: Path | None, template_path: Path | None, options: dict
+) -> str:
+    """Build with stdin as the outline and/or stdout as the deck; returns a label."""
+
+    if input_path == STDIO:
+        source = _read_stdin()
+    else:
+        if not input_path.exists():
+            raise FileNotFoundError(f"Input file not found: {input_path}")
+        source = input_path.read_text(encoding="utf-8")
+    if output_path is None or output_path == STDIO:
+        generate_presentation(source, sys.stdout.buffer, template=template_path, **options)
+        sys.stdout.buffer.flush()
+        return "<stdout>"
+    generate_presentation(source, output_path, template=template_path, **options)
+    return str(output_path)
+
+
+def _writes_stdout(args: argparse.Namespace) -> bool:
+    return args.output == STDIO or (args.output is None and args.input == STDIO)
+
+
+def _read_stdin() -> str:
+    # Outlines are UTF-8 whatever the console's encoding.
+    return sys.stdin.buffer.read().decode("utf-8")
+
+
+def _handle_update(args: argparse.Namespace) -> int:
+    input_path: Path = args.input
+    font_size: float = args.font_size
 
     try:
         if font_size <= 0:
             raise ValueError("Font size must be positive")
-        destination = generate_from_markdown(
+        result = update_from_markdown(
             input_path,
-            output_path,
+            args.output,
             font_size=font_size,
-            template_path=template_path,
+            text_metrics=_text_metrics_from_args(args),
+            compact_nav=args.compact_nav,
+            zip_options=_zip_options_from_args(args),
         )
     except FileNotFoundError as exc:
         print(str(exc))
@@ -64,5 +577,248 @@ def _handle_build(args: argparse.Namespace) -> int:
         print(f"Outline error: {exc}")
         return 1
 
-    print(f"Presentation generated at {destination}")
+    print(
+        f"Updated {result.output_path}: {result.slides_updated} slides refreshed, "
+        f"{result.slides_added} added, {result.slides_unchanged} unchanged."
+    )
+    if result.orphaned_slides:
+        positions = ", ".join(str(position) for position in result.orphaned_slides)
+        print(f"Slides no longer in the outline were left in place: {positions}")
+    return 0
+
+
+def _handle_watch(args: argparse.Namespace) -> int:
+    input_path: Path = args.input
+    font_size: float = args.font_size
+
+    def report(update: WatchUpdate) -> None:
+        if update.ok:
+            print(
+                f"Rebuilt {update.slides_changed}/{update.slide_count} slides "
+                f"({update.rows_redrawn} rows) in {update.seconds:.2f}s -> {update.output_path}"
+            )
+        else:
+            print(f"Outline error: {update.error} (keeping the previous deck)")
+
+    if font_size <= 0:
+        print("Outline error: Font size must be positive")
+        return 1
+    if not input_path.exists():
+        print(f"Input file not found: {input_path}")
+        return 1
+    print(f"Watching {input_path} for changes (Ctrl+C to stop).")
+    try:
+        watch_markdown(
+            input_path,
+            args.output,
+            font_size=font_size,
+            template_path=args.template,
+            text_metrics=_text_metrics_from_args(args),
+            on_update=report,
+            compact_nav=args.compact_nav,
+            zip_options=_zip_options_from_args(args),
+        )
+    except FileNotFoundError as exc:
+        print(str(exc))
+        return 1
+    except KeyboardInterrupt:
+        pass
     return 0
+
+
+def _handle_batch(args: argparse.Namespace) -> int:
+    font_size: float = args.font_size
+    jobs: int | None = args.jobs
+
+    if font_size <= 0:
+        print("Outline error: Font size must be positive")
+        return 1
+    if jobs is not None and jobs < 1:
+        print("--jobs must be at least 1")
+        return 1
+
+    input_paths = collect_batch_inputs(args.batch, args.manifest)
+    if not input_paths:
+        print("No outlines matched the batch inputs.")
+        return 1
+
+    cache = _cache_from_args(args)
+
+    def report(result: BatchResult) -> None:
+        if result.ok:
+            note = ", cache hit" if result.cached else ", cache miss" if cache is not None else ""
+            print(
+                f"ok     {result.input_path} -> {result.output_path} "
+                f"({result.seconds:.2f}s{note})"
+            )
+        else:
+            print(f"failed {result.input_path} ({result.seconds:.2f}s): {result.error}")
+
+    try:
+        results = generate_batch(
+            input_paths,
+            output_dir=args.output_dir,
+            font_size=font_size,
+            template_path=args.template,
+            max_workers=jobs,
+            text_metrics=_text_metrics_from_args(args),
+            engine=args.engine,
+            on_result=report,
+            shared_layouts=args.shared_layouts,
+            compact_nav=args.compact_nav,
+            cache=cache,
+            zip_options=_zip_options_from_args(args),
+        )
+    except FileNotFoundError as exc:
+        print(str(exc))
+        return 1
+    except ValueError as exc:
+        print(str(exc))
+        return 1
+
+    failures = sum(1 for result in results if not result.ok)
+    total = sum(result.seconds for result in results)
+    cached = f"{sum(1 for result in results if result.cached)} from cache, " if cache else ""
+    print(
+        f"Built {len(results) - failures}/{len(results)} presentations "
+        f"({cached}{total:.2f}s of build time)."
+    )
+    return 1 if failures else 0
+
+
+def _handle_variants(args: argparse.Namespace) -> int:
+    templates: list[Path | None] = list(args.templates) or [args.template]
+    font_sizes: list[float] = list(args.font_sizes) or [args.font_size]
+    jobs: int | None = args.jobs
+
+    if any(size <= 0 for size in font_sizes):
+        print("Outline error: Font size must be positive")
+        return 1
+    if jobs is not None and jobs < 1:
+        print("--jobs must be at least 1")
+        return 1
+
+    cache = _cache_from_args(args)
+
+    def report(result: BatchResult) -> None:
+        if result.ok:
+            note = ", cache hit" if result.cached else ", cache miss" if cache is not None else ""
+            print(f"ok     {result.output_path} ({result.seconds:.2f}s{note})")
+        else:
+            print(f"failed {result.output_path} ({result.seconds:.2f}s): {result.error}")
+
+    try:
+        results = generate_variants(
+            args.input,
+            [Variant(size, template) for template in templates for size in font_sizes],
+            output_dir=args.output_dir,
+            max_workers=jobs,
+            text_metrics=_text_metrics_from_args(args),
+            engine=args.engine,
+            on_result=report,
+            shared_layouts=args.shared_layouts,
+            compact_nav=args.compact_nav,
+            cache=cache,
+            zip_options=_zip_options_from_args(args),
+        )
+    except FileNotFoundError as exc:
+        print(str(exc))
+        return 1
+    except OutlineSyntaxError as exc:
+        print(f"Outline error: {exc}")
+        return 1
+    except ValueError as exc:
+        print(str(exc))
+        return 1
+
+    failures = sum(1 for result in results if not result.ok)
+    print(f"Built {len(results) - failures}/{len(results)} variants of {args.input}.")
+    return 1 if failures else 0
+
+
+def _handle_serve(args: argparse.Namespace) -> int:
+    from ppt_nav.server import RenderService, serve
+
+    for name in ("workers", "max_pending"):
+        value = getattr(args, name)
+        if value is not None and value < 1:
+            print(f"--{name.replace('_', '-')} must be at least 1")
+            return 1
+
+    try:
+        template_path = resolve_template(args.template)
+        service = RenderService(
+            template_path,
+            text_metrics=_text_metrics_from_args(args),
+            max_workers=args.workers,
+            max_pending=args.max_pending,
+        )
+    except FileNotFoundError as exc:
+        print(str(exc))
+        return 1
+
+    def ready(address: str) -> None:
+        workers = service.max_workers
+        print(
+            f"Serving on {address} with {workers} worker{'s' if workers != 1 else ''} "
+            "(Ctrl+C to stop).",
+            flush=True,
+        )
+
+    with service:
+        try:
+            serve(service, args.host, args.port, args.socket, on_ready=ready)
+        except OSError as exc:
+            print(f"Cannot listen: {exc}")
+            return 1
+        except ValueError as exc:
+            print(str(exc))
+            return 1
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+def _cache_from_args(args: argparse.Namespace) -> BuildCache | None:
+    if not (args.cache or args.cache_dir is not None):
+        return None
+    return BuildCache(args.cache_dir, max_bytes=int(args.cache_size * 2**20))
+
+
+def _zip_options_from_args(args: argparse.Namespace) -> ZipOptions | None:
+    if args.compression == "default" and args.zip_threads == 1:
+        return None
+    return replace(ZIP_PRESETS[args.compression], threads=args.zip_threads)
+
+
+def _text_metrics_from_args(args: argparse.Namespace) -> TextWidthEstimator | None:
+    latin_path: Path | None = args.latin_font
+    east_asian_path: Path | None = args.east_asian_font
+    if not (args.font_metrics or latin_path or east_asian_path):
+        return None
+
+    for path in (latin_path, east_asian_path):
+        if path is not None and not path.exists():
+            raise FileNotFoundError(f"Font file not found: {path}")
+    regular_faces = []
+    if latin_path is None:
+        latin_path, is_bold = find_label_font_file(DEFAULT_LATIN_FONT)
+        if latin_path is not None and not is_bold:
+            regular_faces.append(DEFAULT_LATIN_FONT)
+    if east_asian_path is None:
+        east_asian_path, is_bold = find_label_font_file(DEFAULT_EAST_ASIAN_FONT)
+        if east_asian_path is not None and not is_bold:
+            regular_faces.append(DEFAULT_EAST_ASIAN_FONT)
+    if latin_path is None and east_asian_path is None:
+        print(
+            "No font files found for text measurement; using the built-in estimate.",
+            file=sys.stderr,
+        )
+        return None
+    if regular_faces:
+        print(
+            f"No bold face found for {', '.join(regular_faces)}; measuring the bold labels "
+            "with the regular face, which is slightly narrower.",
+            file=sys.stderr,
+        )
+    return FontMetricsWidthEstimator.from_paths(latin_path, east_asian_path)
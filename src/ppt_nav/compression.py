@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+"""How the parts a build writes are compressed into the output zip.
+
+python-pptx always deflates at zlib's default level on one thread. Preview
+builds care more about write latency than file size, and archival builds
+want the smallest file, so :class:`ZipOptions` chooses the level, or
+store-only, per part type and can deflate large parts on several threads.
+zlib releases the GIL while it compresses, so the threads run alongside
+slide drawing and alongside each other. This module only needs the standard
+library, so the CLI can offer the presets without importing python-pptx.
+"""
+
+import json
+import posixpath
+import time
+import zipfile
+import zlib
+from dataclasses import dataclass
+from typing import Dict, Tuple
+
+# zipfile's own default; decks written with it match python-pptx's output.
+DEFAULT_LEVEL = 6
+
+
+@dataclass(frozen=True)
+class ZipOptions:
+    """Compression of the new and modified parts of a deck.
+
+    ``level`` is the zlib level (1-9) for every part, or 0 to store parts
+    uncompressed. ``part_levels`` overrides it per file extension, e.g.
+    ``((".rels", 0),)`` stores the small relationship parts. Template parts a
+    build leaves untouched are always copied as they are.
+
+    With ``threads`` above 1, parts of at least ``parallel_min_bytes`` are
+    deflated on that many threads while the build carries on. Entries still
+    land in the zip in order, and the bytes match a single-threaded write.
+    """
+
+    level: int = DEFAULT_LEVEL
+    part_levels: Tuple[Tuple[str, int], ...] = ()
+    threads: int = 1
+    parallel_min_bytes: int = 16 * 1024
+
+    def __post_init__(self) -> None:
+        for level in (self.level, *(level for _, level in self.part_levels)):
+            if not 0 <= level <= 9:
+                raise ValueError(f"Compression level must be between 0 and 9, not {level}.")
+        if self.threads < 1:
+            raise ValueError("Compression threads must be at least 1.")
+
+    def level_for(self, membername: str) -> int:
+        """The zlib level for zip member ``membername``; 0 means store."""
+
+        extension = posixpath.splitext(membername)[1].lower()
+        for part_extension, level in self.part_levels:
+            if part_extension == extension:
+                return level
+        return self.level
+
+    def fingerprint(self) -> str:
+        """Identifies the bytes these options write; ``threads`` does not change them."""
+
+        return json.dumps([self.level, [list(entry) for entry in self.part_levels]])
+
+
+# Named settings for the command line.
+ZIP_PRESETS: Dict[str, ZipOptions] = {
+    "default": ZipOptions(),
+    # Level 1 deflates XML several times faster for a file a few percent
+    # larger; relationship parts are too small to be worth deflating at all.
+    "fast": ZipOptions(level=1, part_levels=((".rels", 0),)),
+    "smallest": ZipOptions(level=9),
+    "store": ZipOptions(level=0),
+}
+
+
+def compress_entry(membername: str, data: bytes, level: int) -> Tuple[zipfile.ZipInfo, bytes]:
+    """Compress ``data`` as zip member ``membername`` the way ``ZipFile.writestr`` would.
+
+    Returns the entry's :class:`zipfile.ZipInfo`, with CRC and sizes filled
+    in, and its compressed bytes, ready for
+    :func:`ppt_nav.package_writer.write_raw_entry`. Safe to call from any
+    thread.
+    """
+
+    info = zipfile.ZipInfo(membername, time.localtime(time.time())[:6])
+    info.external_attr = 0o600 << 16
+    info.CRC = zlib.crc32(data)
+    info.file_size = len(data)
+    if level:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+        raw = compressor.compress(data) + compressor.flush()
+        info.compress_type = zipfile.ZIP_DEFLATED
+    else:
+        raw = bytes(data)
+        info.compress_type = zipfile.ZIP_STORED
+    info.compress_size = len(raw)
+    return info, raw
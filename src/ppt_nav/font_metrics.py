@@ -0,0 +1,329 @@
+from __future__ import annotations
+
+"""Text measurement from the advance widths of locally installed TrueType fonts.
+
+Only the ``head``, ``hhea``, ``maxp``, ``hmtx`` and ``cmap`` tables are read,
+so no font library is needed. Each font is parsed once into a compact
+codepoint-to-advance array covering the Basic Multilingual Plane and cached
+on disk; nothing is ever downloaded.
+"""
+
+import hashlib
+import os
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from ppt_nav.paths import default_cache_dir
+from ppt_nav.text_metrics import _CJK, TextWidthEstimator, _classify, _codepoint_widths
+
+_BMP_SIZE = 0x10000
+_CACHE_MAGIC = b"PNFM"
+_CACHE_VERSION = 1
+_CACHE_HEADER = struct.Struct("<4sHH")
+
+# Font files commonly holding the families the builder asks PowerPoint for.
+_KNOWN_FONT_FILES: Dict[str, Tuple[str, ...]] = {
+    "times new roman": ("times.ttf", "Times New Roman.ttf"),
+    "times new roman bold": ("timesbd.ttf", "Times New Roman Bold.ttf"),
+    "標楷體": ("kaiu.ttf", "DFKai-SB.ttf"),
+    "dfkai-sb": ("kaiu.ttf", "DFKai-SB.ttf"),
+}
+
+
+class FontMetrics:
+    """Advance widths for the BMP codepoints a single font maps.
+
+    ``advances[cp]`` is the advance in font units, or ``0`` when the font
+    has no glyph for ``cp``.
+    """
+
+    def __init__(self, units_per_em: int, advances: array) -> None:
+        if len(advances) != _BMP_SIZE:
+            raise ValueError("Font metrics must cover the whole BMP.")
+        self.units_per_em = units_per_em
+        self.advances = advances
+
+    def has_glyph(self, ch: str) -> bool:
+        cp = ord(ch)
+        return cp < _BMP_SIZE and self.advances[cp] != 0
+
+    @classmethod
+    def from_file(cls, path: Path, font_index: int = 0) -> "FontMetrics":
+        return cls(*_parse_font(path.read_bytes(), font_index))
+
+    def to_bytes(self) -> bytes:
+        advances = self.advances
+        if sys.byteorder != "little":
+            advances = array("H", advances)
+            advances.byteswap()
+        header = _CACHE_HEADER.pack(_CACHE_MAGIC, _CACHE_VERSION, self.units_per_em)
+        return header + advances.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "FontMetrics":
+        magic, version, units_per_em = _CACHE_HEADER.unpack_from(data)
+        if magic != _CACHE_MAGIC or version != _CACHE_VERSION:
+            raise ValueError("Not a ppt-nav font metrics cache file.")
+        advances = array("H")
+        advances.frombytes(data[_CACHE_HEADER.size :])
+        if sys.byteorder != "little":
+            advances.byteswap()
+        return cls(units_per_em, advances)
+
+
+def load_font_metrics(
+    path: Path,
+    font_index: int = 0,
+    cache_dir: Optional[Path] = None,
+) -> FontMetrics:
+    """Load metrics for ``path``, parsing the font only on a cache miss.
+
+    The cache entry is keyed on the font's resolved path, size, modification
+    time and collection index, so replacing the font file invalidates it.
+    ``font_index`` picks the face inside a ``.ttc`` collection.
+    """
+
+    resolved = path.resolve()
+    stat = resolved.stat()
+    key = f"{resolved}|{stat.st_size}|{stat.st_mtime_ns}|{font_index}"
+    cache_path = (
+        (cache_dir or default_cache_dir())
+        / "fonts"
+        / f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}.bin"
+    )
+
+    try:
+        return FontMetrics.from_bytes(cache_path.read_bytes())
+    except (OSError, ValueError, struct.error):
+        pass
+
+    metrics = FontMetrics.from_file(resolved, font_index)
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+        temp_path.write_bytes(metrics.to_bytes())
+        os.replace(temp_path, cache_path)
+    except OSError:
+        # An unwritable cache only costs a re-parse next time.
+        pass
+    return metrics
+
+
+def find_font_file(family: str, search_dirs: Optional[Sequence[Path]] = None) -> Optional[Path]:
+    """Locate an installed font file for ``family`` by file name.
+
+    Known families (Times New Roman, 標楷體/DFKai-SB) map to their usual file
+    names; any other family matches a file whose stem equals the family name
+    with or without spaces, ignoring case.
+    """
+
+    wanted = {name.lower() for name in _KNOWN_FONT_FILES.get(family.lower(), ())}
+    compact = family.replace(" ", "").lower()
+    for font_file in _iter_font_files(search_dirs or _system_font_dirs()):
+        name = font_file.name.lower()
+        stem = font_file.stem.replace(" ", "").lower()
+        if name in wanted or stem == compact:
+            return font_file
+    return None
+
+
+def find_label_font_file(
+    family: str, search_dirs: Optional[Sequence[Path]] = None
+) -> Tuple[Optional[Path], bool]:
+    """Locate the face of ``family`` that navigation labels are drawn in.
+
+    Labels are bold, so the bold face (e.g. ``timesbd.ttf``) is preferred and
+    the regular face is the fallback. The second item is ``True`` when the
+    file found is the bold face.
+    """
+
+    dirs = list(search_dirs or _system_font_dirs())
+    bold = find_font_file(f"{family} Bold", dirs)
+    if bold is not None:
+        return bold, True
+    return find_font_file(family, dirs), False
+
+
+class FontMetricsWidthEstimator(TextWidthEstimator):
+    """Text width estimator backed by real font advance widths.
+
+    East Asian wide characters are measured with ``east_asian`` and all
+    other characters with ``latin``, falling back to the other font and then
+    to the character-class heuristic for codepoints neither font covers.
+    Pass bold font files to match the bold navigation labels exactly. When
+    only a regular file was used, as :func:`find_label_font_file` falls back
+    to when no bold face is installed, widths come out slightly narrower than
+    the bold labels and long labels may overflow their slots.
+    """
+
+    def __init__(
+        self,
+        latin: Optional[FontMetrics] = None,
+        east_asian: Optional[FontMetrics] = None,
+        cache_size: int = 4096,
+    ) -> None:
+        super().__init__(cache_size=cache_size)
+        self._table = _merge_widths(latin, east_asian)
+
+    @classmethod
+    def from_paths(
+        cls,
+        latin_path: Optional[Path] = None,
+        east_asian_path: Optional[Path] = None,
+        cache_dir: Optional[Path] = None,
+    ) -> "FontMetricsWidthEstimator":
+        return cls(
+            latin=load_font_metrics(latin_path, cache_dir=cache_dir) if latin_path else None,
+            east_asian=(
+                load_font_metrics(east_asian_path, cache_dir=cache_dir)
+                if east_asian_path
+                else None
+            ),
+        )
+
+    def _codepoint_widths(self) -> Tuple[float, ...]:
+        return self._table
+
+
+def _merge_widths(
+    latin: Optional[FontMetrics],
+    east_asian: Optional[FontMetrics],
+) -> Tuple[float, ...]:
+    heuristic = _codepoint_widths()
+    merged: List[float] = list(heuristic)
+    for cp in range(_BMP_SIZE):
+        ch = chr(cp)
+        fonts = (east_asian, latin) if _classify(ch) == _CJK else (latin, east_asian)
+        for font in fonts:
+            if font is not None and font.advances[cp]:
+                merged[cp] = font.advances[cp] / font.units_per_em
+                break
+    return tuple(merged)
+
+
+def _system_font_dirs() -> List[Path]:
+    home = Path.home()
+    if sys.platform == "win32":
+        windir = Path(os.environ.get("WINDIR", r"C:\Windows"))
+        local = os.environ.get("LOCALAPPDATA")
+        dirs = [windir / "Fonts"]
+        if local:
+            dirs.append(Path(local) / "Microsoft" / "Windows" / "Fonts")
+        return dirs
+    if sys.platform == "darwin":
+        return [
+            home / "Library" / "Fonts",
+            Path("/Library/Fonts"),
+            Path("/System/Library/Fonts"),
+            Path("/System/Library/Fonts/Supplemental"),
+        ]
+    return [
+        home / ".fonts",
+        home / ".local" / "share" / "fonts",
+        Path("/usr/local/share/fonts"),
+        Path("/usr/share/fonts"),
+    ]
+
+
+def _iter_font_files(dirs: Iterable[Path]) -> Iterator[Path]:
+    for directory in dirs:
+        if not directory.is_dir():
+            continue
+        for root, _, files in os.walk(directory):
+            for name in sorted(files):
+                if name.lower().endswith((".ttf", ".ttc")):
+                    yield Path(root) / name
+
+
+def _parse_font(data: bytes, font_index: int) -> Tuple[int, array]:
+    offset = 0
+    if data[:4] == b"ttcf":
+        (num_fonts,) = struct.unpack_from(">I", data, 8)
+        if not 0 <= font_index < num_fonts:
+            raise ValueError(f"Font collection has no face {font_index}.")
+        (offset,) = struct.unpack_from(">I", data, 12 + 4 * font_index)
+
+    (num_tables,) = struct.unpack_from(">H", data, offset + 4)
+    tables: Dict[bytes, int] = {}
+    for record in range(num_tables):
+        tag, _, table_offset, _ = struct.unpack_from(">4sIII", data, offset + 12 + 16 * record)
+        tables[tag] = table_offset
+    required = (b"head", b"hhea", b"maxp", b"hmtx", b"cmap")
+    missing = [tag.decode() for tag in required if tag not in tables]
+    if missing:
+        raise ValueError(f"Font is missing required tables: {', '.join(missing)}")
+
+    (units_per_em,) = struct.unpack_from(">H", data, tables[b"head"] + 18)
+    (num_h_metrics,) = struct.unpack_from(">H", data, tables[b"hhea"] + 34)
+    (num_glyphs,) = struct.unpack_from(">H", data, tables[b"maxp"] + 4)
+    # hmtx starts with (advanceWidth, leftSideBearing) pairs.
+    glyph_advances = list(
+        struct.unpack_from(f">{2 * num_h_metrics}H", data, tables[b"hmtx"])[::2]
+    )
+    # Glyphs past numberOfHMetrics share the last advance width.
+    glyph_advances.extend([glyph_advances[-1]] * max(num_glyphs - num_h_metrics, 0))
+
+    advances = array("H", bytes(2 * _BMP_SIZE))
+    for cp, glyph in _read_cmap(data, tables[b"cmap"]):
+        if cp < _BMP_SIZE and 0 < glyph < len(glyph_advances):
+            # A mapped glyph with zero advance would read as "missing"; 1 unit
+            # is indistinguishable from zero once scaled.
+            advances[cp] = glyph_advances[glyph] or 1
+    return units_per_em, advances
+
+
+def _read_cmap(data: bytes, cmap_offset: int) -> Iterator[Tuple[int, int]]:
+    (num_subtables,) = struct.unpack_from(">H", data, cmap_offset + 2)
+    candidates: Dict[Tuple[int, int], int] = {}
+    for record in range(num_subtables):
+        platform, encoding, sub_offset = struct.unpack_from(
+            ">HHI", data, cmap_offset + 4 + 8 * record
+        )
+        candidates[(platform, encoding)] = cmap_offset + sub_offset
+
+    # Prefer full-repertoire Unicode subtables, then BMP-only ones.
+    for key in ((3, 10), (0, 4), (0, 6), (3, 1), (0, 3), (0, 2), (0, 1), (0, 0)):
+        subtable = candidates.get(key)
+        if subtable is None:
+            continue
+        (table_format,) = struct.unpack_from(">H", data, subtable)
+        if table_format == 4:
+            return _read_cmap_format4(data, subtable)
+        if table_format == 12:
+            return _read_cmap_format12(data, subtable)
+    raise ValueError("Font has no supported Unicode cmap subtable (format 4 or 12).")
+
+
+def _read_cmap_format4(data: bytes, offset: int) -> Iterator[Tuple[int, int]]:
+    seg_count = struct.unpack_from(">H", data, offset + 6)[0] // 2
+    end_codes = struct.unpack_from(f">{seg_count}H", data, offset + 14)
+    start_codes = struct.unpack_from(f">{seg_count}H", data, offset + 16 + 2 * seg_count)
+    id_deltas = struct.unpack_from(f">{seg_count}h", data, offset + 16 + 4 * seg_count)
+    range_offsets_at = offset + 16 + 6 * seg_count
+    range_offsets = struct.unpack_from(f">{seg_count}H", data, range_offsets_at)
+
+    for segment in range(seg_count):
+        start, end = start_codes[segment], end_codes[segment]
+        delta, range_offset = id_deltas[segment], range_offsets[segment]
+        if start == 0xFFFF:
+            continue
+        for cp in range(start, end + 1):
+            if range_offset == 0:
+                glyph = (cp + delta) & 0xFFFF
+            else:
+                glyph_at = range_offsets_at + 2 * segment + range_offset + 2 * (cp - start)
+                (glyph,) = struct.unpack_from(">H", data, glyph_at)
+                if glyph:
+                    glyph = (glyph + delta) & 0xFFFF
+            yield cp, glyph
+
+
+def _read_cmap_format12(data: bytes, offset: int) -> Iterator[Tuple[int, int]]:
+    (num_groups,) = struct.unpack_from(">I", data, offset + 12)
+    for group in range(num_groups):
+        start, end, start_glyph = struct.unpack_from(">III", data, offset + 16 + 12 * group)
+        for cp in range(start, min(end, _BMP_SIZE - 1) + 1):
+            yield cp, start_glyph + cp - start
@@ -2,11 +2,50 @@ from __future__ import annotations
 
 """High-level helpers that tie parsing and presentation building together."""
 
+import io
+import os
+import time
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    TextIO,
+    Union,
+)
 
+from ppt_nav.metrics import BuildMetrics, timed
 from ppt_nav.outline import Outline
-from ppt_nav.ppt_builder import PresentationBuilder
+from ppt_nav.paths import atomic_output
+from ppt_nav.text_metrics import TextWidthEstimator
+
+# python-pptx and lxml take most of the start-up time, so the modules that
+# use them (and the process pool) are imported by the functions that need
+# them, not at import time.
+if TYPE_CHECKING:
+    from pptx.presentation import Presentation as PptxPresentation
+
+    from ppt_nav.build_cache import BuildCache
+    from ppt_nav.compression import ZipOptions
+    from ppt_nav.layout import DeckLayout
+    from ppt_nav.ppt_builder import PresentationBuilder
+    from ppt_nav.update import UpdateResult
+    from ppt_nav.watch import WatchUpdate
+
+# A template given as a path, the file's bytes, a binary stream or a loaded
+# python-pptx Presentation; None means the bundled template.
+TemplateSource = Union[Path, str, bytes, BinaryIO, "PptxPresentation", None]
+
+# "pptx" builds through the python-pptx object model; "stream" writes slide
+# XML straight into the output zip (see ppt_nav.streaming).
+ENGINES = ("pptx", "stream")
 
 
 def generate_from_markdown(
@@ -14,6 +53,14 @@ def generate_from_markdown(
     output_path: Optional[Path] = None,
     font_size: Optional[float] = None,
     template_path: Optional[Path] = None,
+    text_metrics: Optional[TextWidthEstimator] = None,
+    engine: str = "pptx",
+    on_metrics: Optional[Callable[[BuildMetrics], None]] = None,
+    shared_layouts: bool = False,
+    compact_nav: bool = False,
+    cache: Optional[BuildCache] = None,
+    max_workers: Optional[int] = None,
+    zip_options: Optional[ZipOptions] = None,
 ) -> Path:
     """Parse ``input_path`` and build a PPTX deck at ``output_path``.
 
@@ -22,31 +69,698 @@ def generate_from_markdown(
 
     ``template_path`` is an optional PPTX template to load. When omitted, the
     bundled ``template/template_16-9.pptx`` is used when present.
+
+    ``text_metrics`` replaces the heuristic label width estimator, e.g. with a
+    :class:`ppt_nav.font_metrics.FontMetricsWidthEstimator`.
+
+    ``engine`` is one of :data:`ENGINES`. ``"stream"`` keeps memory flat on
+    very large decks by writing each slide out as soon as it is drawn.
+
+    ``on_metrics`` is called with the build's :class:`ppt_nav.metrics.BuildMetrics`
+    (time per phase, per-slide timings and shape counts, output part sizes)
+    once the deck is written. Metrics are only collected when it is given.
+
+    ``shared_layouts`` draws each section's main navigation row once, on a
+    generated slide layout that the section's slides use, instead of on
+    every slide. Decks get much smaller; only the ``"pptx"`` engine supports
+    it, and such decks cannot be refreshed with :func:`update_from_markdown`.
+
+    ``compact_nav`` draws the labels of each navigation row as one textbox
+    with a tab stop per label instead of one textbox per label.
+
+    ``cache`` is a :class:`ppt_nav.build_cache.BuildCache`. When it already
+    holds a deck built from the same inputs, that deck is copied to the
+    output instead of building it again, and ``on_metrics`` is not called.
+
+    ``max_workers`` above 1 draws the slides of a large deck in that many
+    processes. Only the ``"stream"`` engine supports it, and the deck is
+    identical to one drawn serially.
+
+    ``zip_options`` is a :class:`ppt_nav.compression.ZipOptions` that trades
+    write time against file size, e.g. ``ZIP_PRESETS["fast"]`` for previews.
+    A deck written to a path goes to a temporary file first and replaces the
+    output only once complete.
+    """
+
+    if not input_path.exists():
+        raise FileNotFoundError(f"Input file not found: {input_path}")
+
+    destination = output_path or input_path.with_suffix(".pptx")
+    with input_path.open(encoding="utf-8") as handle:
+        generate_presentation(
+            handle,
+            destination,
+            template=resolve_template(template_path),
+            font_size=font_size,
+            text_metrics=text_metrics,
+            engine=engine,
+            on_metrics=on_metrics,
+            shared_layouts=shared_layouts,
+            compact_nav=compact_nav,
+            cache=cache,
+            max_workers=max_workers,
+            zip_options=zip_options,
+        )
+    return destination
+
+
+def generate_presentation(
+    outline: Union[Outline, str, TextIO],
+    output: Union[Path, BinaryIO],
+    template: TemplateSource = None,
+    font_size: Optional[float] = None,
+    text_metrics: Optional[TextWidthEstimator] = None,
+    engine: str = "pptx",
+    on_metrics: Optional[Callable[[BuildMetrics], None]] = None,
+    shared_layouts: bool = False,
+    compact_nav: bool = False,
+    cache: Optional[BuildCache] = None,
+    max_workers: Optional[int] = None,
+    zip_options: Optional[ZipOptions] = None,
+    builder: Optional[PresentationBuilder] = None,
+) -> None:
+    """Build a deck from ``outline`` and write it to ``output``.
+
+    ``outline`` is a parsed :class:`Outline`, outline text, or an open text
+    stream such as ``sys.stdin``. ``output`` is a path or any writable binary
+    stream; unseekable streams such as ``sys.stdout.buffer`` work too.
+
+    ``template`` is a path, the template's bytes, a binary stream, or an
+    already-loaded python-pptx ``Presentation`` (which is left unchanged);
+    ``None`` uses the bundled template. Nothing is read from or written to
+    disk unless a path is given, apart from ``cache``'s directory. The
+    remaining options are as for :func:`generate_from_markdown`.
+
+    ``builder`` is a :class:`ppt_nav.ppt_builder.PresentationBuilder` to build
+    with instead of a new one. A long-running caller can keep one and reuse
+    the navigation rows it has cached across decks. It carries its own font
+    size, text measurement, navigation and compression options, so these and
+    ``cache`` and ``on_metrics`` must be left unset.
+    """
+
+    _check_engine(engine)
+    if builder is not None:
+        options = (font_size, text_metrics, zip_options, cache, on_metrics)
+        if shared_layouts or compact_nav or any(option is not None for option in options):
+            raise ValueError("Pass build options to the PresentationBuilder, not with builder=.")
+    if max_workers is not None and max_workers > 1 and engine != "stream":
+        raise ValueError("Drawing slides in parallel is only supported by the stream engine.")
+    template_source = _template_source(template)
+    metrics = BuildMetrics() if on_metrics is not None else None
+    if not isinstance(outline, Outline):
+        with timed(metrics, "parse"):
+            if isinstance(outline, str):
+                outline = Outline.from_text(outline)
+            else:
+                outline = Outline.from_lines(outline)
+    cache_key: Optional[str] = None
+    if cache is not None:
+        cache_key = cache.key(
+            outline,
+            template_source,
+            font_size=font_size,
+            text_metrics=text_metrics,
+            shared_layouts=shared_layouts,
+            compact_nav=compact_nav,
+            zip_options=zip_options,
+        )
+        if cache.load(cache_key, output):
+            return
+    if builder is None:
+        from ppt_nav.ppt_builder import PresentationBuilder
+
+        builder = PresentationBuilder(
+            font_size=font_size,
+            text_metrics=text_metrics,
+            metrics=metrics,
+            shared_layouts=shared_layouts,
+            compact_nav=compact_nav,
+            zip_options=zip_options,
+        )
+    if cache is not None and cache_key is not None:
+        # Build in memory so the same bytes go to the cache and the output.
+        buffer = io.BytesIO()
+        _build(builder, outline, buffer, template_source, engine, max_workers)
+        data = buffer.getvalue()
+        if isinstance(output, Path):
+            with atomic_output(output) as temp_path:
+                temp_path.write_bytes(data)
+        else:
+            output.write(data)
+        cache.store(cache_key, data)
+    else:
+        _build(builder, outline, output, template_source, engine, max_workers)
+    if on_metrics is not None and metrics is not None:
+        on_metrics(metrics)
+
+
+def generate_presentation_bytes(
+    outline: Union[Outline, str, TextIO], template: TemplateSource = None, **options: Any
+) -> bytes:
+    """Build a deck from ``outline`` and return the PPTX file as ``bytes``.
+
+    Takes the same arguments as :func:`generate_presentation`.
+    """
+
+    buffer = io.BytesIO()
+    generate_presentation(outline, buffer, template=template, **options)
+    return buffer.getvalue()
+
+
+def plan_presentation_layout(
+    outline: Union[Outline, str, TextIO],
+    template: TemplateSource = None,
+    font_size: Optional[float] = None,
+    text_metrics: Optional[TextWidthEstimator] = None,
+) -> DeckLayout:
+    """Lay out the navigation of every slide of ``outline`` without building a deck.
+
+    Returns the :class:`ppt_nav.layout.DeckLayout` the builder would draw, for
+    export as JSON or an SVG preview. Only the template's slide size is read,
+    and python-pptx is not imported.
+    """
+
+    from ppt_nav.layout import LayoutStyle, plan_layout, template_slide_size
+
+    template_source = _template_source(template)
+    if isinstance(outline, str):
+        outline = Outline.from_text(outline)
+    elif not isinstance(outline, Outline):
+        outline = Outline.from_lines(outline)
+    style = LayoutStyle.for_font_size(font_size, *template_slide_size(template_source))
+    measure = text_metrics or TextWidthEstimator()
+    return plan_layout(outline, style, measure.width_emu)
+
+
+def update_from_markdown(
+    input_path: Path,
+    deck_path: Optional[Path] = None,
+    output_path: Optional[Path] = None,
+    font_size: Optional[float] = None,
+    text_metrics: Optional[TextWidthEstimator] = None,
+    compact_nav: bool = False,
+    zip_options: Optional[ZipOptions] = None,
+) -> UpdateResult:
+    """Refresh the navigation of an existing deck from ``input_path``.
+
+    ``deck_path`` defaults to ``<input>.pptx`` and must have been generated
+    by ppt-nav. Only navigation shapes on slides whose plan entry changed are
+    replaced; slide bodies and hand-added slides are left alone, and slides
+    for new outline entries are inserted after their predecessor. The deck is
+    updated in place unless ``output_path`` is given. ``font_size``,
+    ``text_metrics`` and ``compact_nav`` should match the original build,
+    otherwise every row is redrawn. ``zip_options`` is as for
+    :func:`generate_from_markdown`.
     """
 
     if not input_path.exists():
         raise FileNotFoundError(f"Input file not found: {input_path}")
+    deck = deck_path or input_path.with_suffix(".pptx")
+    if not deck.exists():
+        raise FileNotFoundError(f"Presentation not found: {deck}")
 
     outline = Outline.from_file(input_path)
-    builder = PresentationBuilder(font_size=font_size)
+    from ppt_nav.ppt_builder import PresentationBuilder
+    from ppt_nav.update import update_presentation
+
+    builder = PresentationBuilder(
+        font_size=font_size,
+        text_metrics=text_metrics,
+        compact_nav=compact_nav,
+        zip_options=zip_options,
+    )
+    return update_presentation(builder, outline, deck, output_path)
+
+
+def watch_markdown(
+    input_path: Path,
+    output_path: Optional[Path] = None,
+    font_size: Optional[float] = None,
+    template_path: Optional[Path] = None,
+    text_metrics: Optional[TextWidthEstimator] = None,
+    on_update: Optional[Callable[[WatchUpdate], None]] = None,
+    interval: float = 0.5,
+    compact_nav: bool = False,
+    zip_options: Optional[ZipOptions] = None,
+) -> None:
+    """Build ``input_path`` and keep rebuilding it whenever the file changes.
+
+    The template and the built deck stay in memory between builds, and each
+    rebuild redraws only the navigation rows the edit affected before the
+    deck is rewritten atomically. ``on_update`` receives a
+    :class:`ppt_nav.watch.WatchUpdate` after every build attempt. Runs until
+    interrupted. ``zip_options`` is as for :func:`generate_from_markdown`;
+    ``ZIP_PRESETS["fast"]`` keeps each rewrite short.
+    """
+
+    if not input_path.exists():
+        raise FileNotFoundError(f"Input file not found: {input_path}")
+
+    from ppt_nav.ppt_builder import PresentationBuilder
+    from ppt_nav.watch import WatchSession, watch_outline
+
+    builder = PresentationBuilder(
+        font_size=font_size,
+        text_metrics=text_metrics,
+        compact_nav=compact_nav,
+        zip_options=zip_options,
+    )
     destination = output_path or input_path.with_suffix(".pptx")
+    with WatchSession(builder, resolve_template(template_path), destination) as session:
+        watch_outline(input_path, session, on_update or (lambda update: None), interval)
+
+
+@dataclass(frozen=True)
+class BatchResult:
+    """Outcome of building one deck in :func:`generate_batch` or :func:`generate_variants`."""
+
+    input_path: Path
+    output_path: Path
+    seconds: float
+    error: Optional[str] = None
+    cached: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def generate_batch(
+    input_paths: Sequence[Path],
+    output_dir: Optional[Path] = None,
+    font_size: Optional[float] = None,
+    template_path: Optional[Path] = None,
+    max_workers: Optional[int] = None,
+    text_metrics: Optional[TextWidthEstimator] = None,
+    engine: str = "pptx",
+    on_result: Optional[Callable[[BatchResult], None]] = None,
+    shared_layouts: bool = False,
+    compact_nav: bool = False,
+    cache: Optional[BuildCache] = None,
+    zip_options: Optional[ZipOptions] = None,
+) -> List[BatchResult]:
+    """Build every outline in ``input_paths`` across a pool of processes.
+
+    Each deck is written to ``output_dir/<stem>.pptx``, or next to its outline
+    when ``output_dir`` is omitted. Workers read the template once and reuse
+    it for every outline they build. A failing outline is recorded in its
+    :class:`BatchResult` instead of aborting the run; ``on_result`` is called
+    as each build finishes. Results are returned in input order.
+
+    ``max_workers`` defaults to the CPU count; ``1`` builds in this process.
+    ``shared_layouts``, ``compact_nav``, ``cache`` and ``zip_options`` apply
+    to each build as in :func:`generate_from_markdown`;
+    :attr:`BatchResult.cached` tells which decks were copied from the cache.
+    Outlines that would be written to the same deck, e.g. ``a/intro.md`` and
+    ``b/intro.md`` with one ``output_dir``, raise :class:`ValueError` before
+    anything is built.
+    """
+
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    _check_engine(engine)
+    resolved_template = resolve_template(template_path)
+    jobs = [
+        (
+            input_path,
+            _batch_output_path(input_path, output_dir),
+            font_size,
+            engine,
+            shared_layouts,
+            compact_nav,
+            zip_options,
+        )
+        for input_path in input_paths
+    ]
+    inputs_by_output: Dict[Path, List[Path]] = {}
+    for job in jobs:
+        inputs_by_output.setdefault(job[1].resolve(), []).append(job[0])
+    collisions = [inputs for inputs in inputs_by_output.values() if len(inputs) > 1]
+    if collisions:
+        listed = "; ".join(", ".join(str(path) for path in inputs) for inputs in collisions)
+        raise ValueError(f"Outlines would be written to the same deck: {listed}")
+    if output_dir is not None:
+        output_dir.mkdir(parents=True, exist_ok=True)
+    results: List[Optional[BatchResult]] = [None] * len(jobs)
+
+    if max_workers == 1 or len(jobs) <= 1:
+        _init_batch_worker(resolved_template, text_metrics, cache)
+        for index, job in enumerate(jobs):
+            result = _build_batch_job(*job)
+            results[index] = result
+            if on_result is not None:
+                on_result(result)
+    else:
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_init_batch_worker,
+            initargs=(resolved_template, text_metrics, cache),
+        ) as executor:
+            futures = {
+                executor.submit(_build_batch_job, *job): index for index, job in enumerate(jobs)
+            }
+            for future in as_completed(futures):
+                result = future.result()
+                results[futures[future]] = result
+                if on_result is not None:
+                    on_result(result)
+
+    return [result for result in results if result is not None]
+
+
+@dataclass(frozen=True)
+class Variant:
+    """One template and font size to build an outline with in :func:`generate_variants`."""
+
+    font_size: float
+    template_path: Optional[Path] = None
+
+
+def generate_variants(
+    input_path: Path,
+    variants: Sequence[Variant],
+    output_dir: Optional[Path] = None,
+    max_workers: Optional[int] = None,
+    text_metrics: Optional[TextWidthEstimator] = None,
+    engine: str = "pptx",
+    on_result: Optional[Callable[[BatchResult], None]] = None,
+    shared_layouts: bool = False,
+    compact_nav: bool = False,
+    cache: Optional[BuildCache] = None,
+    zip_options: Optional[ZipOptions] = None,
+) -> List[BatchResult]:
+    """Build ``input_path`` once per variant from a single parse.
+
+    The outline is parsed and every title measured in ems once, here; each
+    variant only scales those widths to its font size and lays the slides
+    out on its own template. Variants are built in parallel across up to
+    ``max_workers`` processes (default: the CPU count).
+
+    Each deck is written to ``output_dir/<stem>-<template>-<size>pt.pptx``,
+    next to the outline when ``output_dir`` is omitted. ``<template>`` is the
+    template's file name without a ``template_`` prefix, e.g.
+    ``outline-4-3-22pt.pptx``. Results are returned in ``variants`` order;
+    the other options are as for :func:`generate_batch`.
+    """
+
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    _check_engine(engine)
+    if not input_path.exists():
+        raise FileNotFoundError(f"Input file not found: {input_path}")
+    jobs = []
+    for variant in variants:
+        template = resolve_template(variant.template_path)
+        label = _variant_label(template, variant.font_size)
+        output_path = _batch_output_path(
+            input_path.with_name(f"{input_path.stem}-{label}.md"), output_dir
+        )
+        jobs.append(
+            (
+                input_path,
+                output_path,
+                template,
+                variant.font_size,
+                engine,
+                shared_layouts,
+                compact_nav,
+                zip_options,
+            )
+        )
+    outputs = [job[1] for job in jobs]
+    if len(set(outputs)) != len(outputs):
+        raise ValueError("Variants must differ in template name or font size.")
+    if output_dir is not None:
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+    outline = Outline.from_file(input_path)
+    text_metrics = text_metrics or TextWidthEstimator()
+    text_metrics.measure_em_widths(outline)
+    results: List[Optional[BatchResult]] = [None] * len(jobs)
+    workers = min(max_workers or os.cpu_count() or 1, len(jobs))
+
+    if workers <= 1:
+        _init_variant_worker(outline, text_metrics, cache)
+        for index, job in enumerate(jobs):
+            result = _build_variant_job(*job)
+            results[index] = result
+            if on_result is not None:
+                on_result(result)
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_variant_worker,
+            initargs=(outline, text_metrics, cache),
+        ) as executor:
+            futures = {
+                executor.submit(_build_variant_job, *job): index for index, job in enumerate(jobs)
+            }
+            for future in as_completed(futures):
+                result = future.result()
+                results[futures[future]] = result
+                if on_result is not None:
+                    on_result(result)
+
+    return [result for result in results if result is not None]
+
+
+def collect_batch_inputs(
+    patterns: Iterable[str] = (),
+    manifest: Optional[TextIO] = None,
+) -> List[Path]:
+    """Expand glob ``patterns`` and ``manifest`` lines into outline paths.
+
+    The manifest lists one path or glob per line; blank lines and lines
+    starting with ``#`` are skipped. Patterns that match nothing are kept
+    as-is so the batch reports them as missing instead of dropping them.
+    Duplicates, including different spellings of the same file such as
+    ``a.md`` and ``./a.md``, are removed while preserving first-seen order.
+    """
+
+    import glob
+
+    entries = list(patterns)
+    if manifest is not None:
+        for line in manifest:
+            entry = line.strip()
+            if entry and not entry.startswith("#"):
+                entries.append(entry)
+
+    paths: List[Path] = []
+    seen = set()
+    for entry in entries:
+        matches = sorted(glob.glob(entry, recursive=True)) if glob.has_magic(entry) else []
+        for match in matches or [entry]:
+            path = Path(match)
+            key = path.resolve()
+            if key not in seen:
+                seen.add(key)
+                paths.append(path)
+    return paths
+
+
+def resolve_template(template_path: Optional[Path] = None) -> Path:
+    """Path of the template to build with: ``template_path``, or the bundled one.
+
+    Raises :class:`FileNotFoundError` when the template does not exist.
+    """
 
-    resolved_template: Path
     if template_path is not None:
         if not template_path.exists():
             raise FileNotFoundError(f"Template file not found: {template_path}")
-        resolved_template = template_path
+        return template_path
+
+    # Default to the repo-provided 16:9 template.
+    default_template = Path(__file__).resolve().parents[2] / "template" / "template_16-9.pptx"
+    if not default_template.exists():
+        raise FileNotFoundError(
+            "Default template not found: template/template_16-9.pptx. "
+            "Provide one via --template."
+        )
+    return default_template
+
+
+def _check_engine(engine: str) -> None:
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine {engine!r}; expected one of {', '.join(ENGINES)}.")
+
+
+def _build(
+    builder: PresentationBuilder,
+    outline: Outline,
+    destination: Union[Path, BinaryIO],
+    template: Union[Path, BinaryIO],
+    engine: str,
+    max_workers: Optional[int] = None,
+) -> None:
+    if isinstance(destination, Path):
+        # Readers never see a half-written deck, and a failed build keeps the old one.
+        with atomic_output(destination) as temp_path:
+            _write_deck(builder, outline, temp_path, template, engine, max_workers)
     else:
-        # Default to the repo-provided 16:9 template.
-        default_template = (
-            Path(__file__).resolve().parents[2] / "template" / "template_16-9.pptx"
-        )
-        if not default_template.exists():
-            raise FileNotFoundError(
-                "Default template not found: template/template_16-9.pptx. "
-                "Provide one via --template."
-            )
-        resolved_template = default_template
+        _write_deck(builder, outline, destination, template, engine, max_workers)
 
-    builder.build(outline, destination, template_path=resolved_template)
-    return destination
+
+def _write_deck(
+    builder: PresentationBuilder,
+    outline: Outline,
+    destination: Union[Path, BinaryIO],
+    template: Union[Path, BinaryIO],
+    engine: str,
+    max_workers: Optional[int],
+) -> None:
+    if engine == "stream":
+        from ppt_nav.streaming import StreamingPresentationWriter
+
+        StreamingPresentationWriter(builder, max_workers).write(outline, destination, template)
+    else:
+        builder.build(outline, destination, template_path=template)
+
+
+def _template_source(template: TemplateSource) -> Union[Path, io.BytesIO]:
+    if template is None or isinstance(template, (Path, str)):
+        return resolve_template(Path(template) if template is not None else None)
+    if isinstance(template, (bytes, bytearray, memoryview)):
+        return io.BytesIO(template)
+    if isinstance(template, io.BytesIO):
+        return template
+    if hasattr(template, "save"):
+        # A loaded Presentation: build from a serialised copy so the caller's
+        # object is not modified.
+        buffer = io.BytesIO()
+        template.save(buffer)
+        buffer.seek(0)
+        return buffer
+    # Other streams (sockets, pipes) may not be seekable; read them once.
+    return io.BytesIO(template.read())
+
+
+def _variant_label(template: Path, font_size: float) -> str:
+    name = template.stem
+    if name.startswith("template_"):
+        name = name[len("template_") :]
+    return f"{name}-{font_size:g}pt"
+
+
+def _batch_output_path(input_path: Path, output_dir: Optional[Path]) -> Path:
+    if output_dir is None:
+        return input_path.with_suffix(".pptx")
+    return output_dir / input_path.with_suffix(".pptx").name
+
+
+# Template bytes, text measurement and build cache set up once per batch
+# worker process.
+_worker_template: Optional[bytes] = None
+_worker_text_metrics: Optional[TextWidthEstimator] = None
+_worker_cache: Optional[BuildCache] = None
+
+
+def _init_batch_worker(
+    template_path: Path,
+    text_metrics: Optional[TextWidthEstimator],
+    cache: Optional[BuildCache] = None,
+) -> None:
+    global _worker_template, _worker_text_metrics, _worker_cache
+    _worker_template = template_path.read_bytes()
+    _worker_text_metrics = text_metrics
+    _worker_cache = cache
+
+
+def _build_batch_job(
+    input_path: Path,
+    output_path: Path,
+    font_size: Optional[float],
+    engine: str,
+    shared_layouts: bool,
+    compact_nav: bool,
+    zip_options: Optional[ZipOptions],
+) -> BatchResult:
+    start = time.perf_counter()
+    try:
+        if _worker_template is None:
+            raise RuntimeError("Batch worker was not initialised with a template.")
+        if not input_path.exists():
+            raise FileNotFoundError(f"Input file not found: {input_path}")
+        hits = _worker_cache.hits if _worker_cache is not None else 0
+        generate_presentation(
+            Outline.from_file(input_path),
+            output_path,
+            template=_worker_template,
+            font_size=font_size,
+            text_metrics=_worker_text_metrics,
+            engine=engine,
+            shared_layouts=shared_layouts,
+            compact_nav=compact_nav,
+            cache=_worker_cache,
+            zip_options=zip_options,
+        )
+    except Exception as exc:  # one bad outline must not abort the batch
+        return BatchResult(
+            input_path=input_path,
+            output_path=output_path,
+            seconds=time.perf_counter() - start,
+            error=f"{type(exc).__name__}: {exc}",
+        )
+    return BatchResult(
+        input_path=input_path,
+        output_path=output_path,
+        seconds=time.perf_counter() - start,
+        cached=_worker_cache is not None and _worker_cache.hits > hits,
+    )
+
+
+# The parsed outline, shared by every variant a worker process builds.
+_worker_outline: Optional[Outline] = None
+
+
+def _init_variant_worker(
+    outline: Outline,
+    text_metrics: TextWidthEstimator,
+    cache: Optional[BuildCache],
+) -> None:
+    global _worker_outline, _worker_text_metrics, _worker_cache
+    _worker_outline = outline
+    _worker_text_metrics = text_metrics
+    _worker_cache = cache
+
+
+def _build_variant_job(
+    input_path: Path,
+    output_path: Path,
+    template_path: Path,
+    font_size: float,
+    engine: str,
+    shared_layouts: bool,
+    compact_nav: bool,
+    zip_options: Optional[ZipOptions],
+) -> BatchResult:
+    start = time.perf_counter()
+    hits = _worker_cache.hits if _worker_cache is not None else 0
+    try:
+        if _worker_outline is None:
+            raise RuntimeError("Variant worker was not initialised with an outline.")
+        generate_presentation(
+            _worker_outline,
+            output_path,
+            template=template_path,
+            font_size=font_size,
+            text_metrics=_worker_text_metrics,
+            engine=engine,
+            shared_layouts=shared_layouts,
+            compact_nav=compact_nav,
+            cache=_worker_cache,
+            zip_options=zip_options,
+        )
+    except Exception as exc:  # report the variant, keep building the others
+        return BatchResult(
+            input_path=input_path,
+            output_path=output_path,
+            seconds=time.perf_counter() - start,
+            error=f"{type(exc).__name__}: {exc}",
+        )
+    return BatchResult(
+        input_path=input_path,
+        output_path=output_path,
+        seconds=time.perf_counter() - start,
+        cached=_worker_cache is not None and _worker_cache.hits > hits,
+    )
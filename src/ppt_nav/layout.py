@@ -0,0 +1,553 @@
+from __future__ import annotations
+
+"""Navigation geometry computed without python-pptx.
+
+The functions here turn titles, a slide size and a font size into the
+rectangles, labels and colours of navigation rows. :class:`RowLayout` keeps
+a row's items in drawing order in flat arrays, and :func:`plan_layout` lays
+out a whole outline as a :class:`DeckLayout`, computing each section's rows
+once and sharing them between the section's slides.
+:class:`ppt_nav.ppt_builder.PresentationBuilder` draws these rows into
+slides; :meth:`DeckLayout.to_dict` and :meth:`DeckLayout.to_svg` export the
+same plan as JSON or as an SVG preview without building a deck.
+
+All lengths are EMU (914,400 per inch) and colours are ``RRGGBB`` hex strings.
+"""
+
+import zipfile
+from array import array
+from dataclasses import asdict, dataclass, replace
+from pathlib import Path
+from typing import (
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape, quoteattr
+
+from ppt_nav.outline import Outline
+from ppt_nav.text_metrics import DEFAULT_LATIN_FONT, EMU_PER_POINT
+
+EMU_PER_INCH = 914400
+
+# Item kinds in a RowLayout: plain rectangles (row background, divider
+# lines), the rounded chip behind the active section, and text labels.
+RECT, CHIP, LABEL = 0, 1, 2
+_KIND_NAMES = ("rect", "chip", "label")
+
+# Measures text in EMU at a font size in points, e.g. TextWidthEstimator.width_emu.
+MeasureText = Callable[[str, float], int]
+
+
+def inches(value: float) -> int:
+    """``value`` inches in EMU, truncated like ``pptx.util.Inches``."""
+
+    return int(value * EMU_PER_INCH)
+
+
+@dataclass(frozen=True)
+class LayoutStyle:
+    """Slide size, font sizes, margins and palette that navigation is laid out with."""
+
+    slide_width: int
+    slide_height: int
+    font_size_pt: float
+    sub_font_size_pt: float
+    nav_top_margin: int
+    nav_side_margin: int
+    main_row_height: int
+    sub_row_height: int
+    sub_side_margin: int
+    sub_line_thickness: int
+    sub_label_gap: int
+    body_margin_top: int
+    body_side_margin: int
+    main_bg_color: str = "8DAFD0"
+    main_inactive_text: str = "F5F8FC"
+    main_active_chip_bg: str = "BDD4EA"
+    main_active_text: str = "2B6DB4"
+    sub_inactive_text: str = "9A9A9A"
+    sub_active_text: str = "2B6DB4"
+    sub_line_color: str = "82AFDC"
+    label_font: str = DEFAULT_LATIN_FONT
+
+    @classmethod
+    def for_font_size(
+        cls,
+        font_size_pt: Optional[float] = None,
+        slide_width: int = 0,
+        slide_height: int = 0,
+    ) -> "LayoutStyle":
+        """The default style at ``font_size_pt`` (22 pt when unset).
+
+        Sub-row labels are 84% of the base size but never under 12 pt, and
+        row heights scale with the font size from a 22 pt baseline.
+        """
+
+        size = font_size_pt if font_size_pt and font_size_pt > 0 else 22.0
+        scale = size / 22.0
+        return cls(
+            slide_width=slide_width,
+            slide_height=slide_height,
+            font_size_pt=size,
+            sub_font_size_pt=max(size * 0.84, 12.0),
+            nav_top_margin=inches(0),
+            nav_side_margin=inches(0),
+            main_row_height=inches(0.56 * scale),
+            sub_row_height=inches(0.30 * scale),
+            sub_side_margin=inches(0.14),
+            sub_line_thickness=inches(0.03),
+            sub_label_gap=inches(0.1),
+            body_margin_top=inches(0.3),
+            body_side_margin=inches(0.5),
+        )
+
+    def with_slide_size(self, slide_width: int, slide_height: int) -> "LayoutStyle":
+        return replace(self, slide_width=slide_width, slide_height=slide_height)
+
+
+class RowItem(NamedTuple):
+    """One rectangle, chip or label of a :class:`RowLayout`."""
+
+    kind: int
+    left: int
+    top: int
+    width: int
+    height: int
+    color: str
+    text: str
+
+
+class RowLayout:
+    """The items of one navigation row in drawing order.
+
+    Boxes are stored four to an item in one ``array("q")`` and kinds in an
+    ``array("B")``; texts are empty for rectangles and chips. A row whose
+    labels all share a font size records it once in ``font_size_pt``.
+    """
+
+    __slots__ = ("kind", "top", "height", "font_size_pt", "kinds", "boxes", "colors", "texts")
+
+    def __init__(self, kind: str, top: int, height: int, font_size_pt: float) -> None:
+        self.kind = kind
+        self.top = top
+        self.height = height
+        self.font_size_pt = font_size_pt
+        self.kinds = array("B")
+        self.boxes = array("q")
+        self.colors: List[str] = []
+        self.texts: List[str] = []
+
+    @property
+    def bottom(self) -> int:
+        return self.top + self.height
+
+    def add(
+        self, kind: int, left: int, top: int, width: int, height: int, color: str, text: str = ""
+    ) -> None:
+        self.kinds.append(kind)
+        self.boxes.extend((left, top, width, height))
+        self.colors.append(color)
+        self.texts.append(text)
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def __iter__(self) -> Iterator[RowItem]:
+        boxes = self.boxes
+        for index, kind in enumerate(self.kinds):
+            offset = index * 4
+            yield RowItem(
+                kind,
+                boxes[offset],
+                boxes[offset + 1],
+                boxes[offset + 2],
+                boxes[offset + 3],
+                self.colors[index],
+                self.texts[index],
+            )
+
+    def last_label(self) -> int:
+        """Index of the last label item, or -1."""
+
+        for index in range(len(self.kinds) - 1, -1, -1):
+            if self.kinds[index] == LABEL:
+                return index
+        return -1
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "kind": self.kind,
+            "top": self.top,
+            "height": self.height,
+            "font_size_pt": self.font_size_pt,
+            "items": [
+                {
+                    "kind": _KIND_NAMES[item.kind],
+                    "box": [item.left, item.top, item.width, item.height],
+                    "color": item.color,
+                    **({"text": item.text} if item.kind == LABEL else {}),
+                }
+                for item in self
+            ],
+        }
+
+
+def layout_main_row(
+    titles: Sequence[str],
+    active_title: Optional[str],
+    top: int,
+    style: LayoutStyle,
+    measure: MeasureText,
+) -> RowLayout:
+    """Lay out the section row: equal-width tabs with a chip behind the active one."""
+
+    if not titles:
+        return RowLayout("main", top, 0, style.font_size_pt)
+    if style.slide_width <= 0:
+        raise ValueError("Slide width is not set.")
+    slide_width = style.slide_width
+    row_height = style.main_row_height
+    row = RowLayout("main", top, row_height, style.font_size_pt)
+    row.add(
+        RECT,
+        style.nav_side_margin,
+        top,
+        slide_width - style.nav_side_margin * 2,
+        row_height,
+        style.main_bg_color,
+    )
+
+    count = len(titles)
+    base_tab_width = slide_width // count
+    for idx, title in enumerate(titles):
+        left = idx * base_tab_width
+        item_width = slide_width - left if idx == count - 1 else base_tab_width
+
+        if title == active_title:
+            # Make the chip taller and size width by title length while
+            # keeping it inside the tab area.
+            chip_margin_y = max(int(row_height * 0.12), inches(0.02))
+            chip_height = row_height - chip_margin_y * 2
+            chip_padding_x = inches(0.24)
+            estimated_text_width = measure(title, style.font_size_pt)
+            desired_chip_width = int(estimated_text_width + chip_padding_x * 2)
+            max_chip_width = int(max(item_width - inches(0.1), int(item_width * 0.6)))
+            min_chip_width = int(min(item_width, max(estimated_text_width, inches(0.95))))
+            chip_width = max(min(desired_chip_width, max_chip_width), min_chip_width)
+            chip_margin_x = int(max((item_width - chip_width) // 2, 0))
+            row.add(
+                CHIP,
+                left + chip_margin_x,
+                top + chip_margin_y,
+                chip_width,
+                chip_height,
+                style.main_active_chip_bg,
+            )
+
+        color = style.main_active_text if title == active_title else style.main_inactive_text
+        row.add(LABEL, left, top, item_width, row_height, color, title)
+    return row
+
+
+def layout_sub_row(
+    titles: Sequence[str], top: int, style: LayoutStyle, measure: MeasureText
+) -> RowLayout:
+    """Lay out a subsection row: labels sized to their text between two lines.
+
+    Every label gets the inactive colour; which one is active differs from
+    slide to slide, so renderers recolour it.
+    """
+
+    if style.slide_width <= 0:
+        raise ValueError("Slide width is not set.")
+    row_height = style.sub_row_height
+    line_thickness = style.sub_line_thickness
+    center_y = top + row_height // 2
+    side_margin = style.sub_side_margin
+    row = RowLayout("sub", top, row_height, style.sub_font_size_pt)
+
+    left_line_start = side_margin
+    left_line_end = left_line_start + inches(0.40)
+    row.add(
+        RECT,
+        left_line_start,
+        center_y,
+        left_line_end - left_line_start,
+        line_thickness,
+        style.sub_line_color,
+    )
+
+    labels_left = left_line_end + style.sub_label_gap
+    labels_right = style.slide_width - side_margin - inches(0.35)
+    cursor = labels_left
+    item_gap = inches(0.08)
+    min_label_width = inches(0.35)
+
+    if titles and labels_right > labels_left:
+        text_padding = inches(0.08)
+        preferred_widths = [
+            max(measure(title, style.sub_font_size_pt) + text_padding, min_label_width)
+            for title in titles
+        ]
+        target_widths = fit_widths(
+            preferred_widths, labels_right - labels_left, item_gap, min_label_width
+        )
+        for idx, title in enumerate(titles):
+            remaining = max(labels_right - cursor, 0)
+            if remaining <= 0:
+                break
+            width = min(target_widths[idx], remaining)
+            row.add(LABEL, cursor, top, width, row_height, style.sub_inactive_text, title)
+            cursor += width + item_gap
+
+    right_line_start = min(max(cursor, labels_left), style.slide_width - side_margin)
+    right_line_end = style.slide_width - side_margin
+    if right_line_end > right_line_start:
+        row.add(
+            RECT,
+            right_line_start,
+            center_y,
+            right_line_end - right_line_start,
+            line_thickness,
+            style.sub_line_color,
+        )
+    return row
+
+
+def body_box(nav_bottom: int, style: LayoutStyle) -> Tuple[int, int, int, int]:
+    """``(left, top, width, height)`` of the body textbox below the navigation."""
+
+    if style.slide_width <= 0 or style.slide_height <= 0:
+        raise ValueError("Slide dimensions are not set.")
+    body_top = nav_bottom + style.body_margin_top
+    height = style.slide_height - body_top - inches(0.5)
+    width = style.slide_width - style.body_side_margin * 2
+    return style.body_side_margin, body_top, width, height
+
+
+def fit_widths(
+    preferred_widths: List[int],
+    available_width: int,
+    item_gap: int,
+    min_width: int,
+) -> List[int]:
+    """Shrink ``preferred_widths`` proportionally so they fit, none below ``min_width``."""
+
+    count = len(preferred_widths)
+    if count == 0:
+        return []
+
+    usable = max(available_width - item_gap * max(count - 1, 0), count)
+    preferred_total = sum(preferred_widths)
+    if preferred_total <= usable:
+        return preferred_widths
+
+    scale = usable / preferred_total
+    scaled = [max(min_width, int(round(width * scale))) for width in preferred_widths]
+
+    excess = sum(scaled) - usable
+    if excess <= 0:
+        return scaled
+    return _trim_widest(scaled, excess, min_width)
+
+
+def _trim_widest(widths: List[int], excess: int, min_width: int) -> List[int]:
+    # Closed-form equivalent of repeatedly taking one EMU from the widest
+    # item (lowest index on ties) until ``excess`` is gone or every item
+    # is down to ``min_width``: cut the widest items to a common level,
+    # then take the leftover EMU from the first items sitting on it.
+    ordered = sorted(widths, reverse=True)
+    count = len(ordered)
+    if sum(ordered) - min_width * count <= excess:
+        return [min_width] * count
+
+    prefix = 0
+    level = min_width
+    for taken, width in enumerate(ordered, start=1):
+        prefix += width
+        floor = max(ordered[taken] if taken < count else min_width, min_width)
+        if prefix - floor * taken >= excess:
+            level = (prefix - excess) // taken
+            break
+
+    capped = level + 1
+    leftover = excess - sum(width - capped for width in widths if width > capped)
+    trimmed: List[int] = []
+    for width in widths:
+        if width >= capped:
+            if leftover > 0:
+                width = level
+                leftover -= 1
+            else:
+                width = capped
+        trimmed.append(width)
+    return trimmed
+
+
+class DeckLayout:
+    """Navigation and body geometry for every slide of an outline.
+
+    ``rows`` holds each distinct row once. Per slide, ``slide_rows`` has two
+    entries (main row index, sub row index or -1), ``slide_active`` the
+    active subsection title or ``None``, and ``slide_bodies`` four entries
+    (the body box).
+    """
+
+    def __init__(self, style: LayoutStyle) -> None:
+        self.style = style
+        self.rows: List[RowLayout] = []
+        self.slide_titles: List[Tuple[str, Optional[str]]] = []
+        self.slide_rows = array("l")
+        self.slide_active: List[Optional[str]] = []
+        self.slide_bodies = array("q")
+
+    def __len__(self) -> int:
+        return len(self.slide_titles)
+
+    def slide_row_layouts(self, index: int) -> List[RowLayout]:
+        return [self.rows[row] for row in self.slide_rows[index * 2 : index * 2 + 2] if row >= 0]
+
+    def to_dict(self) -> Dict[str, object]:
+        """JSON-ready form of the plan; see ``ppt-nav --layout``."""
+
+        slides = []
+        for index, (section, child) in enumerate(self.slide_titles):
+            main_row, sub_row = self.slide_rows[index * 2 : index * 2 + 2]
+            slides.append(
+                {
+                    "section": section,
+                    "subsection": child,
+                    "rows": [main_row] + ([sub_row] if sub_row >= 0 else []),
+                    "active": self.slide_active[index],
+                    "body": list(self.slide_bodies[index * 4 : index * 4 + 4]),
+                }
+            )
+        return {
+            "style": asdict(self.style),
+            "rows": [row.to_dict() for row in self.rows],
+            "slides": slides,
+        }
+
+    def to_svg(self, scale: float = 1 / 9525, gap: int = 16) -> str:
+        """Every slide drawn as an SVG, stacked top to bottom.
+
+        ``scale`` converts EMU to SVG units (one pixel at 96 DPI by default).
+        Labels use the width the layout measured for them, so the preview
+        shows where a long title overflows its slot.
+        """
+
+        style = self.style
+        width = style.slide_width * scale
+        height = style.slide_height * scale
+        total_height = len(self) * (height + gap) - gap if len(self) else 0
+        parts = [
+            '<svg xmlns="http://www.w3.org/2000/svg" '
+            f'width="{width:.1f}" height="{max(total_height, 0):.1f}" '
+            f'viewBox="0 0 {width:.1f} {max(total_height, 0):.1f}" '
+            f"font-family={quoteattr(style.label_font)} font-weight=\"bold\">"
+        ]
+        for index, (section, child) in enumerate(self.slide_titles):
+            offset = index * (height + gap)
+            title = section if child is None else f"{section} / {child}"
+            parts.append(f'<g transform="translate(0 {offset:.1f})">')
+            parts.append(f"<title>{escape(title)}</title>")
+            parts.append(
+                f'<rect width="{width:.1f}" height="{height:.1f}" fill="#FFFFFF" '
+                'stroke="#CCCCCC"/>'
+            )
+            active = self.slide_active[index]
+            for row in self.slide_row_layouts(index):
+                font_px = row.font_size_pt * EMU_PER_POINT * scale
+                for item in row:
+                    x, y = item.left * scale, item.top * scale
+                    w, h = item.width * scale, item.height * scale
+                    if item.kind == LABEL:
+                        color = item.color
+                        if row.kind == "sub" and item.text == active:
+                            color = style.sub_active_text
+                        parts.append(
+                            f'<text x="{x + w / 2:.1f}" y="{y + h / 2:.1f}" '
+                            f'font-size="{font_px:.1f}" fill="#{color}" text-anchor="middle" '
+                            f'dominant-baseline="central">{escape(item.text)}</text>'
+                        )
+                    else:
+                        radius = f' rx="{min(w, h) * 0.2:.1f}"' if item.kind == CHIP else ""
+                        parts.append(
+                            f'<rect x="{x:.1f}" y="{y:.1f}" width="{w:.1f}" height="{h:.1f}"'
+                            f'{radius} fill="#{item.color}"/>'
+                        )
+            left, top, body_width, body_height = self.slide_bodies[index * 4 : index * 4 + 4]
+            parts.append(
+                f'<rect x="{left * scale:.1f}" y="{top * scale:.1f}" '
+                f'width="{body_width * scale:.1f}" height="{body_height * scale:.1f}" '
+                'fill="none" stroke="#BBBBBB" stroke-dasharray="4 3"/>'
+            )
+            parts.append("</g>")
+        parts.append("</svg>")
+        return "\n".join(parts) + "\n"
+
+
+def plan_layout(outline: Outline, style: LayoutStyle, measure: MeasureText) -> DeckLayout:
+    """Lay out every slide of ``outline``.
+
+    A section's main row (with its chip) and its sub row are computed once
+    and shared by all of the section's slides.
+    """
+
+    deck = DeckLayout(style)
+    plan = outline.slide_plan
+    for section_title, child_titles in zip(plan.section_titles, plan.child_titles):
+        main = layout_main_row(
+            plan.section_titles, section_title, style.nav_top_margin, style, measure
+        )
+        deck.rows.append(main)
+        main_index = len(deck.rows) - 1
+        sub_index = -1
+        nav_bottom = style.nav_top_margin + style.main_row_height
+        if child_titles:
+            sub = layout_sub_row(child_titles, nav_bottom, style, measure)
+            deck.rows.append(sub)
+            sub_index = len(deck.rows) - 1
+            nav_bottom += style.sub_row_height
+        body = body_box(nav_bottom, style)
+        for child_title in child_titles or (None,):
+            deck.slide_titles.append((section_title, child_title))
+            deck.slide_rows.extend((main_index, sub_index))
+            deck.slide_active.append(child_title)
+            deck.slide_bodies.extend(body)
+    return deck
+
+
+_SLIDE_SIZE_TAG = "{http://schemas.openxmlformats.org/presentationml/2006/main}sldSz"
+
+
+def template_slide_size(template: Union[Path, BinaryIO]) -> Tuple[int, int]:
+    """Slide width and height of a PPTX template, read without python-pptx.
+
+    A stream is left at the position it was passed in at.
+    """
+
+    start = template.tell() if not isinstance(template, Path) and template.seekable() else None
+    try:
+        with zipfile.ZipFile(template) as package, package.open("ppt/presentation.xml") as part:
+            for _, element in ElementTree.iterparse(part):
+                if element.tag == _SLIDE_SIZE_TAG:
+                    width, height = element.get("cx"), element.get("cy")
+                    break
+            else:
+                width = height = None
+    finally:
+        if start is not None:
+            template.seek(start)  # type: ignore[union-attr]
+    if width is None or height is None:
+        raise ValueError("Template slide dimensions are not set.")
+    return int(width), int(height)
@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+"""Build metrics: time per phase, per-slide cost and output part sizes.
+
+A :class:`BuildMetrics` handed to :class:`ppt_nav.ppt_builder.PresentationBuilder`
+(or through ``generate_from_markdown(on_metrics=...)``) is filled in as the
+deck is built. Without one the builder skips all bookkeeping.
+"""
+
+import math
+import time
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import BinaryIO, ContextManager, Dict, Iterable, Iterator, List, Optional, Union
+
+# Phases in build order; "navigation" and "body" are summed over slides.
+PHASES = ("parse", "load_template", "measure", "allocate", "navigation", "body", "save")
+
+
+@dataclass(frozen=True)
+class PartSize:
+    """Uncompressed and stored (compressed) size of one output zip entry."""
+
+    size: int
+    compressed: int
+
+
+@dataclass
+class BuildMetrics:
+    """Measurements collected while building one deck."""
+
+    phases: Dict[str, float] = field(default_factory=dict)
+    slide_seconds: List[float] = field(default_factory=list)
+    slide_shapes: List[int] = field(default_factory=list)
+    slide_xml_bytes: List[int] = field(default_factory=list)
+    parts: Dict[str, PartSize] = field(default_factory=dict)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Add the time spent in the ``with`` block to phase ``name``."""
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def add_time(self, name: str, seconds: float) -> None:
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def record_slide(self, navigation_seconds: float, body_seconds: float, shapes: int) -> None:
+        self.add_time("navigation", navigation_seconds)
+        self.add_time("body", body_seconds)
+        self.slide_seconds.append(navigation_seconds + body_seconds)
+        self.slide_shapes.append(shapes)
+
+    def merge(self, other: "BuildMetrics") -> None:
+        """Add the phase times and per-slide figures of ``other``, e.g. from a worker."""
+
+        for name, seconds in other.phases.items():
+            self.add_time(name, seconds)
+        self.slide_seconds.extend(other.slide_seconds)
+        self.slide_shapes.extend(other.slide_shapes)
+
+    def record_output(
+        self, output: Union[Path, BinaryIO], slide_membernames: Iterable[str]
+    ) -> None:
+        """Read part sizes from the finished package at ``output``.
+
+        Write-only streams such as stdout cannot be read back; part sizes are
+        left empty for them.
+        """
+
+        import zipfile  # only needed once a deck has been built
+
+        if isinstance(output, Path):
+            with zipfile.ZipFile(output) as package:
+                infos = package.infolist()
+        elif output.readable() and output.seekable():
+            position = output.tell()
+            with zipfile.ZipFile(output) as package:
+                infos = package.infolist()
+            output.seek(position)
+        else:
+            return
+        self.parts = {info.filename: PartSize(info.file_size, info.compress_size) for info in infos}
+        self.slide_xml_bytes = [
+            self.parts[name].size for name in slide_membernames if name in self.parts
+        ]
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(self.phases.values())
+
+    @property
+    def output_bytes(self) -> int:
+        return sum(part.compressed for part in self.parts.values())
+
+    def to_dict(self) -> Dict[str, object]:
+        """JSON-ready summary; see ``ppt-nav --metrics-json``."""
+
+        return {
+            "total_seconds": self.total_seconds,
+            "phases": {name: self.phases[name] for name in _ordered(self.phases)},
+            "slides": {
+                "count": len(self.slide_seconds),
+                "seconds": _distribution(self.slide_seconds),
+                "shapes": {
+                    "total": sum(self.slide_shapes),
+                    **_distribution([float(count) for count in self.slide_shapes]),
+                },
+                "xml_bytes": {
+                    "total": sum(self.slide_xml_bytes),
+                    **_distribution([float(size) for size in self.slide_xml_bytes]),
+                },
+            },
+            "output_bytes": self.output_bytes,
+            "parts": {
+                name: {"size": part.size, "compressed": part.compressed}
+                for name, part in sorted(self.parts.items())
+            },
+        }
+
+    def format_report(self, largest_parts: int = 5) -> str:
+        """Human-readable summary, as printed by ``ppt-nav --profile``."""
+
+        total = self.total_seconds
+        lines = [f"{'phase':<14} {'ms':>10} {'share':>7}"]
+        for name in _ordered(self.phases):
+            seconds = self.phases[name]
+            share = seconds / total * 100 if total else 0.0
+            lines.append(f"{name:<14} {seconds * 1e3:>10.1f} {share:>6.1f}%")
+        lines.append(f"{'total':<14} {total * 1e3:>10.1f}")
+
+        if self.slide_seconds:
+            times = _distribution(self.slide_seconds)
+            lines.append(
+                f"slides: {len(self.slide_seconds)}, per slide p50 {times['p50'] * 1e3:.2f} ms, "
+                f"p90 {times['p90'] * 1e3:.2f} ms, p99 {times['p99'] * 1e3:.2f} ms, "
+                f"max {times['max'] * 1e3:.2f} ms"
+            )
+            shapes = _distribution([float(count) for count in self.slide_shapes])
+            lines.append(
+                f"shapes: {sum(self.slide_shapes)} total, {shapes['mean']:.1f} per slide "
+                f"(max {shapes['max']:.0f})"
+            )
+        if self.slide_xml_bytes:
+            sizes = _distribution([float(size) for size in self.slide_xml_bytes])
+            lines.append(
+                f"slide XML: {sum(self.slide_xml_bytes) / 1024:.1f} KB, per slide "
+                f"p50 {sizes['p50'] / 1024:.1f} KB, max {sizes['max'] / 1024:.1f} KB"
+            )
+        if self.parts:
+            lines.append(f"output: {self.output_bytes / 1024:.1f} KB in {len(self.parts)} parts")
+            ranked = sorted(self.parts.items(), key=lambda item: item[1].compressed, reverse=True)
+            for name, part in ranked[:largest_parts]:
+                lines.append(
+                    f"  {name}: {part.compressed / 1024:.1f} KB "
+                    f"({part.size / 1024:.1f} KB uncompressed)"
+                )
+        return "\n".join(lines)
+
+
+def timed(metrics: Optional[BuildMetrics], name: str) -> ContextManager[None]:
+    """``metrics.phase(name)``, or a no-op when no metrics are being collected."""
+
+    return metrics.phase(name) if metrics is not None else nullcontext()
+
+
+def _ordered(phases: Dict[str, float]) -> List[str]:
+    known = [name for name in PHASES if name in phases]
+    return known + sorted(name for name in phases if name not in PHASES)
+
+
+def _distribution(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {"mean": 0.0, "p50": 0.0, "p90": 0.0, "p99": 0.0, "max": 0.0}
+    ordered = sorted(values)
+    return {
+        "mean": sum(ordered) / len(ordered),
+        "p50": _percentile(ordered, 0.50),
+        "p90": _percentile(ordered, 0.90),
+        "p99": _percentile(ordered, 0.99),
+        "max": ordered[-1],
+    }
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    # Nearest-rank percentile of an already sorted list.
+    rank = min(max(math.ceil(fraction * len(ordered)), 1), len(ordered))
+    return ordered[rank - 1]
@@ -1,11 +1,13 @@
 from __future__ import annotations
 
+import sys
+from array import array
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Iterator, List, Optional, Sequence, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class OutlineItem:
     """Represents a single entry in the markdown outline."""
 
@@ -17,7 +19,7 @@ class OutlineItem:
         return bool(self.children)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class SlidePlanEntry:
     """Describes the section/subsection pairing that becomes one PPT slide."""
 
@@ -25,32 +27,160 @@ class SlidePlanEntry:
     child: Optional[OutlineItem]
 
 
-@dataclass(frozen=True)
+class SlidePlan:
+    """Random access to the slides of an outline, one per subsection.
+
+    Slide ``i`` belongs to section ``slide_sections[i]`` and shows that
+    section's subsection ``slide_children[i]``, or none when it is ``-1``.
+    ``section_starts[s]`` is the first slide of section ``s``, with the slide
+    count appended. These are flat arrays, so the index costs a few bytes per
+    slide, and :class:`SlidePlanEntry` objects are only created on access.
+    ``section_titles`` and ``child_titles`` hold every row's titles once.
+
+    A deck shows two heading levels, so sections whose subsections have items
+    of their own raise :class:`ValueError` instead of losing those items.
+    """
+
+    __slots__ = (
+        "sections",
+        "section_titles",
+        "child_titles",
+        "slide_sections",
+        "slide_children",
+        "section_starts",
+        "_slides_by_title",
+    )
+
+    def __init__(self, sections: Tuple[OutlineItem, ...]) -> None:
+        self.sections = sections
+        self.section_titles = tuple(section.title for section in sections)
+        self.child_titles = tuple(
+            tuple(child.title for child in section.children) for section in sections
+        )
+        self.slide_sections = array("l")
+        self.slide_children = array("l")
+        self.section_starts = array("l")
+        for index, section in enumerate(sections):
+            for child in section.children:
+                if child.children:
+                    raise ValueError(
+                        f"'{section.title}' > '{child.title}' has items below it; "
+                        "decks show only two heading levels."
+                    )
+            self.section_starts.append(len(self.slide_sections))
+            count = len(section.children)
+            self.slide_sections.extend([index] * (count or 1))
+            self.slide_children.extend(range(count) if count else (-1,))
+        self.section_starts.append(len(self.slide_sections))
+        self._slides_by_title: Optional[Dict[str, Tuple[int, ...]]] = None
+
+    def __len__(self) -> int:
+        return len(self.slide_sections)
+
+    def __getitem__(self, index: int) -> SlidePlanEntry:
+        section = self.sections[self.slide_sections[index]]
+        child = self.slide_children[index]
+        return SlidePlanEntry(section, section.children[child] if child >= 0 else None)
+
+    def __iter__(self) -> Iterator[SlidePlanEntry]:
+        for section in self.sections:
+            if section.children:
+                for child in section.children:
+                    yield SlidePlanEntry(section=section, child=child)
+            else:
+                yield SlidePlanEntry(section=section, child=None)
+
+    def section_slides(self, section_index: int) -> range:
+        """Indices of the slides of section ``section_index``."""
+
+        return range(self.section_starts[section_index], self.section_starts[section_index + 1])
+
+    def slides_titled(self, title: str) -> Tuple[int, ...]:
+        """Indices of the slides whose section or subsection is titled ``title``."""
+
+        if self._slides_by_title is None:
+            found: Dict[str, List[int]] = {}
+            for section_index, section_title in enumerate(self.section_titles):
+                slides = self.section_slides(section_index)
+                found.setdefault(section_title, []).extend(slides)
+                for slide, child_title in zip(slides, self.child_titles[section_index]):
+                    found.setdefault(child_title, []).append(slide)
+            self._slides_by_title = {
+                key: tuple(sorted(set(indices))) for key, indices in found.items()
+            }
+        return self._slides_by_title.get(title, ())
+
+
+@dataclass(frozen=True, slots=True)
 class Outline:
     """Full outline along with utility helpers for downstream builders."""
 
     sections: Tuple[OutlineItem, ...]
+    # Built on first use; see slide_plan.
+    _slide_plan: Optional[SlidePlan] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    @classmethod
+    def from_lines(cls, lines: Iterable[str], max_depth: int = 2) -> "Outline":
+        return cls(sections=parse_outline(lines, max_depth))
 
     @classmethod
-    def from_text(cls, text: str) -> "Outline":
-        return cls(sections=_parse_markdown_lines(text.splitlines()))
+    def from_text(cls, text: str, max_depth: int = 2) -> "Outline":
+        return cls.from_lines(text.splitlines(), max_depth)
 
     @classmethod
-    def from_file(cls, path: Path) -> "Outline":
-        return cls.from_text(path.read_text(encoding="utf-8"))
+    def from_file(cls, path: Path, max_depth: int = 2) -> "Outline":
+        with path.open(encoding="utf-8") as handle:
+            return cls.from_lines(handle, max_depth)
+
+    @property
+    def slide_plan(self) -> SlidePlan:
+        """Index of this outline's slides, built once."""
+
+        plan = self._slide_plan
+        if plan is None:
+            plan = SlidePlan(self.sections)
+            object.__setattr__(self, "_slide_plan", plan)
+        return plan
 
     def iter_slide_plan(self) -> Iterator[SlidePlanEntry]:
-        for section in self.sections:
-            if section.children:
-                for child in section.children:
-                    yield SlidePlanEntry(section=section, child=child)
-            else:
-                yield SlidePlanEntry(section=section, child=None)
+        return iter(self.slide_plan)
+
+
+class OutlineSyntaxError(ValueError):
+    """A malformed outline line; ``line_number`` is 1-based."""
+
+    def __init__(self, line_number: int, message: str) -> None:
+        super().__init__(f"Line {line_number}: {message}")
+        self.line_number = line_number
+
+
+def parse_outline(lines: Iterable[str], max_depth: int = 2) -> Tuple[OutlineItem, ...]:
+    """Parse markdown bullet ``lines`` into top-level :class:`OutlineItem` s.
+
+    ``lines`` may be any iterable of strings, such as an open file or
+    ``sys.stdin``; it is consumed once, line by line. Items are indented by
+    two spaces per level and nest at most ``max_depth`` levels deep. Lines
+    that are not bullets are ignored. Decks are planned from the first two
+    levels only, and :class:`SlidePlan` rejects outlines with more.
+
+    Each item is frozen as soon as its last child has been read, so the tree
+    is built in a single pass without an intermediate mutable copy.
+    """
 
+    if max_depth < 1:
+        raise ValueError("max_depth must be at least 1.")
 
-def _parse_markdown_lines(lines: Sequence[str]) -> Tuple[OutlineItem, ...]:
-    sections: List[_MutableNode] = []
-    stack: List[_MutableNode] = []
+    # One (title, children so far) frame per open item on the current path;
+    # frame 0 collects the top-level items.
+    open_titles: List[str] = []
+    open_children: List[List[OutlineItem]] = [[]]
+
+    def close_to(depth: int) -> None:
+        while len(open_titles) > depth:
+            item = OutlineItem(title=open_titles.pop(), children=tuple(open_children.pop()))
+            open_children[-1].append(item)
 
     for line_number, raw_line in enumerate(lines, start=1):
         line = raw_line.rstrip()
@@ -62,42 +192,25 @@ def _parse_markdown_lines(lines: Sequence[str]) -> Tuple[OutlineItem, ...]:
 
         indent = len(line) - len(stripped)
         if indent % 2 != 0:
-            raise ValueError(f"Line {line_number}: indentation must use multiples of two spaces.")
+            raise OutlineSyntaxError(line_number, "indentation must use multiples of two spaces.")
         level = indent // 2 + 1
-        if level > 2:
-            raise ValueError("Only two heading levels are supported.")
-
-        title = stripped[2:].strip()
+        if level > max_depth:
+            raise OutlineSyntaxError(
+                line_number, f"only {max_depth} heading levels are supported."
+            )
+        if level > len(open_titles) + 1:
+            raise OutlineSyntaxError(
+                line_number, f"found a level-{level} item without a parent at level {level - 1}."
+            )
+
+        # Interned so titles repeated across the outline share one string.
+        title = sys.intern(stripped[2:].strip())
         if not title:
-            raise ValueError(f"Line {line_number}: bullet items must have a title.")
-
-        node = _MutableNode(title=title, level=level)
-
-        while len(stack) >= level:
-            stack.pop()
-
-        if level == 1:
-            sections.append(node)
-        else:
-            if not stack:
-                raise ValueError(
-                    f"Line {line_number}: found a second-level item without a parent section."
-                )
-            stack[-1].children.append(node)
-        stack.append(node)
+            raise OutlineSyntaxError(line_number, "bullet items must have a title.")
 
-    return tuple(_freeze(node) for node in sections)
+        close_to(level - 1)
+        open_titles.append(title)
+        open_children.append([])
 
-
-@dataclass
-class _MutableNode:
-    title: str
-    level: int
-    children: List["_MutableNode"] = field(default_factory=list)
-
-
-def _freeze(node: _MutableNode) -> OutlineItem:
-    return OutlineItem(
-        title=node.title,
-        children=tuple(_freeze(child) for child in node.children),
-    )
+    close_to(0)
+    return tuple(open_children[0])
@@ -0,0 +1,306 @@
+from __future__ import annotations
+
+"""Package writing that copies untouched template parts without recompressing.
+
+Saving through python-pptx re-serialises and re-deflates every part of the
+template (masters, layouts, themes, embedded media and fonts) even though a
+build never changes them. :func:`save_presentation` writes only new and
+modified parts and copies every other zip entry's compressed bytes straight
+from a memory-mapped template archive. The parts it writes go through a
+:class:`PartWriter`, which compresses them as a
+:class:`ppt_nav.compression.ZipOptions` says.
+"""
+
+import hashlib
+import io
+import mmap
+import struct
+import sys
+import zipfile
+import zlib
+from collections import deque
+from functools import partial
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    BinaryIO,
+    Callable,
+    Collection,
+    Deque,
+    Dict,
+    Optional,
+    Union,
+)
+
+from pptx.opc.serialized import _ContentTypesItem
+from pptx.opc.oxml import serialize_part_xml
+from pptx.presentation import Presentation as PptxPresentation
+
+from ppt_nav.compression import ZipOptions, compress_entry
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future, ThreadPoolExecutor
+
+_CONTENT_TYPES = "[Content_Types].xml"
+_LOCAL_HEADER = struct.Struct("<4s2B4HL2L2H")
+_LOCAL_HEADER_SIGNATURE = b"PK\x03\x04"
+
+# write_raw_entry appends entries through ZipFile internals, which are the
+# same from Python 3.10 to 3.13. Other versions decompress and use writestr,
+# which is slower but cannot write a corrupt deck if those internals change.
+RAW_WRITES = (3, 10) <= sys.version_info[:2] <= (3, 13) and hasattr(
+    zipfile.ZipFile, "_writecheck"
+)
+
+
+class RawZipSource:
+    """Read-only view of a zip archive that hands out entries still compressed.
+
+    Paths are memory-mapped; in-memory streams such as ``BytesIO`` are used
+    through their buffer without copying.
+    """
+
+    def __init__(self, source: Union[Path, BinaryIO, bytes]) -> None:
+        self._file: Optional[BinaryIO] = None
+        self._mmap: Optional[mmap.mmap] = None
+        archive: BinaryIO
+        if isinstance(source, Path):
+            self._file = source.open("rb")
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._buffer = memoryview(self._mmap)
+            archive = self._file
+        elif isinstance(source, io.BytesIO):
+            self._buffer = source.getbuffer()
+            archive = source
+        else:
+            data = source if isinstance(source, bytes) else source.read()
+            self._buffer = memoryview(data)
+            archive = io.BytesIO(data)
+        self.zip = zipfile.ZipFile(archive)
+        self.infos: Dict[str, zipfile.ZipInfo] = {
+            info.filename: info for info in self.zip.infolist()
+        }
+
+    def __contains__(self, name: object) -> bool:
+        return name in self.infos
+
+    def digest(self) -> str:
+        """SHA-256 of the whole archive, hashed from the mapped buffer."""
+
+        return hashlib.sha256(self._buffer).hexdigest()
+
+    def raw_entry(self, name: str) -> Optional[memoryview]:
+        """Compressed bytes of ``name``, or ``None`` if they cannot be reused as-is."""
+
+        info = self.infos[name]
+        if info.flag_bits & 0x1:  # encrypted
+            return None
+        offset = info.header_offset
+        fields = _LOCAL_HEADER.unpack_from(self._buffer, offset)
+        if fields[0] != _LOCAL_HEADER_SIGNATURE:
+            return None
+        name_length, extra_length = fields[-2], fields[-1]
+        start = offset + _LOCAL_HEADER.size + name_length + extra_length
+        return self._buffer[start : start + info.compress_size]
+
+    def close(self) -> None:
+        self.zip.close()
+        self._buffer.release()
+        if self._mmap is not None:
+            self._mmap.close()
+        if self._file is not None:
+            self._file.close()
+
+    def __enter__(self) -> "RawZipSource":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+def copy_entry(output: zipfile.ZipFile, source: RawZipSource, name: str) -> None:
+    """Copy ``name`` from ``source`` into ``output`` without recompressing it.
+
+    Entries that cannot be copied raw are decompressed and written normally.
+    """
+
+    raw = source.raw_entry(name) if RAW_WRITES else None
+    if raw is None:
+        output.writestr(source.infos[name], source.zip.read(name))
+        return
+
+    original = source.infos[name]
+    info = zipfile.ZipInfo(original.filename, original.date_time)
+    info.compress_type = original.compress_type
+    info.external_attr = original.external_attr
+    info.create_system = original.create_system
+    info.CRC = original.CRC
+    info.compress_size = original.compress_size
+    info.file_size = original.file_size
+    write_raw_entry(output, info, raw)
+
+
+def write_raw_entry(output: zipfile.ZipFile, info: zipfile.ZipInfo, raw: bytes) -> None:
+    """Append an already-compressed entry described by ``info`` to ``output``.
+
+    ``info`` must carry the entry's CRC, compressed and uncompressed sizes.
+    zipfile has no public API for this, so this mirrors what
+    ``ZipFile.writestr`` does after compressing. Without :data:`RAW_WRITES`,
+    stored and deflated entries are decompressed and added with ``writestr``
+    instead, deflated at zipfile's default level.
+    """
+
+    if not RAW_WRITES:
+        if info.compress_type == zipfile.ZIP_DEFLATED:
+            data = zlib.decompress(raw, -15)
+        elif info.compress_type == zipfile.ZIP_STORED:
+            data = bytes(raw)
+        else:
+            raise ValueError(f"Cannot rewrite {info.filename}: unsupported compression.")
+        output.writestr(info, data)
+        return
+
+    zip64 = info.file_size > zipfile.ZIP64_LIMIT or info.compress_size > zipfile.ZIP64_LIMIT
+    with output._lock:  # type: ignore[attr-defined]
+        if output._seekable:  # type: ignore[attr-defined]
+            output.fp.seek(output.start_dir)  # type: ignore[union-attr]
+        info.header_offset = output.fp.tell()  # type: ignore[union-attr]
+        output._writecheck(info)  # type: ignore[attr-defined]
+        output._didModify = True  # type: ignore[attr-defined]
+        output.fp.write(info.FileHeader(zip64))  # type: ignore[union-attr]
+        output.fp.write(raw)  # type: ignore[union-attr]
+        output.filelist.append(info)
+        output.NameToInfo[info.filename] = info
+        output.start_dir = output.fp.tell()  # type: ignore[union-attr]
+
+
+class PartWriter:
+    """Adds entries to ``output`` in order, compressed as ``options`` say.
+
+    With ``options.threads`` above 1, parts of at least
+    ``options.parallel_min_bytes`` are deflated on a thread pool while the
+    caller carries on. Entries queue behind a part that is still being
+    compressed and are written as soon as it is done. Only a few parts per
+    thread are held at once. :meth:`close` writes whatever is still queued.
+    """
+
+    def __init__(self, output: zipfile.ZipFile, options: Optional[ZipOptions] = None) -> None:
+        self.output = output
+        self.options = options or ZipOptions()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        if self.options.threads > 1:
+            from concurrent.futures import ThreadPoolExecutor
+
+            self._executor = ThreadPoolExecutor(self.options.threads)
+        self._pending: Deque[Union[Future, Callable[[], None]]] = deque()
+        self._window = self.options.threads * 4
+
+    def write(self, membername: str, data: bytes) -> None:
+        """Add a new part, compressed at the level its type calls for."""
+
+        level = self.options.level_for(membername)
+        if self._executor is not None and level and len(data) >= self.options.parallel_min_bytes:
+            self._queue(self._executor.submit(compress_entry, membername, data, level))
+        elif level:
+            self._queue(
+                partial(
+                    self.output.writestr,
+                    membername,
+                    data,
+                    compress_type=zipfile.ZIP_DEFLATED,
+                    compresslevel=level,
+                )
+            )
+        else:
+            self._queue(
+                partial(self.output.writestr, membername, data, compress_type=zipfile.ZIP_STORED)
+            )
+
+    def copy(self, source: RawZipSource, name: str) -> None:
+        """Add ``name`` from ``source`` without recompressing it; see :func:`copy_entry`."""
+
+        self._queue(partial(copy_entry, self.output, source, name))
+
+    def close(self) -> None:
+        try:
+            self._flush(0)
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown(cancel_futures=True)
+                self._executor = None
+
+    def __enter__(self) -> "PartWriter":
+        return self
+
+    def __exit__(self, exc_type: object, *exc_info: object) -> None:
+        if exc_type is None:
+            self.close()
+        elif self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    def _queue(self, entry: Union[Future, Callable[[], None]]) -> None:
+        if not self._pending and callable(entry):
+            entry()
+            return
+        self._pending.append(entry)
+        self._flush(self._window)
+
+    def _flush(self, limit: int) -> None:
+        # Writes queued entries in order, waiting on compression only while
+        # more than ``limit`` entries are queued.
+        while self._pending:
+            entry = self._pending[0]
+            if callable(entry):
+                entry()
+            elif len(self._pending) > limit or entry.done():
+                info, raw = entry.result()
+                write_raw_entry(self.output, info, raw)
+            else:
+                return
+            self._pending.popleft()
+
+
+def save_presentation(
+    prs: PptxPresentation,
+    output_path: Union[Path, BinaryIO],
+    template: RawZipSource,
+    modified_partnames: Collection[str],
+    zip_options: Optional[ZipOptions] = None,
+) -> None:
+    """Save ``prs`` like ``prs.save`` but copy untouched template parts raw.
+
+    A part is written fresh when it is new (absent from ``template``) or
+    listed in ``modified_partnames`` (e.g. ``"/ppt/presentation.xml"``); its
+    relationships item is handled the same way. Everything else, including
+    the package relationships, is copied compressed from ``template``.
+    Parts must keep the partnames they were loaded with (avoid
+    ``prs.slides``, which renumbers slide parts). ``zip_options`` sets how
+    the written parts are compressed.
+    """
+
+    package = prs.part.package
+    parts = tuple(package.iter_parts())
+    modified = set(modified_partnames)
+
+    with zipfile.ZipFile(output_path, "w", zipfile.ZIP_DEFLATED) as zip_file:
+        with PartWriter(zip_file, zip_options) as output:
+            output.write(_CONTENT_TYPES, serialize_part_xml(_ContentTypesItem.xml_for(parts)))
+
+            package_rels = "_rels/.rels"
+            if package_rels in template:
+                output.copy(template, package_rels)
+            else:
+                output.write(package_rels, package._rels.xml)
+
+            for part in parts:
+                membername = part.partname.membername
+                rels_membername = part.partname.rels_uri.membername
+                if membername in template and part.partname not in modified:
+                    output.copy(template, membername)
+                    if rels_membername in template:
+                        output.copy(template, rels_membername)
+                    continue
+                output.write(membername, part.blob)
+                if part._rels:
+                    output.write(rels_membername, part.rels.xml)
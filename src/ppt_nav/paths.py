@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+"""Filesystem locations shared by the package's on-disk caches, and atomic file output."""
+
+import os
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+
+def default_cache_dir() -> Path:
+    """Per-user cache directory for ppt-nav (``PPT_NAV_CACHE_DIR`` overrides it)."""
+
+    override = os.environ.get("PPT_NAV_CACHE_DIR")
+    if override:
+        return Path(override)
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or str(Path.home() / "AppData" / "Local")
+    elif sys.platform == "darwin":
+        base = str(Path.home() / "Library" / "Caches")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(base) / "ppt-nav"
+
+
+@contextmanager
+def atomic_output(path: Path) -> Iterator[Path]:
+    """Yield a temporary path next to ``path`` and move it over ``path`` on success.
+
+    Readers of ``path`` see either the old file or the complete new one,
+    never a half-written deck.
+    """
+
+    temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        yield temp_path
+        os.replace(temp_path, path)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
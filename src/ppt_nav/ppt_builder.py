@@ -1,59 +1,163 @@
 from __future__ import annotations
 
-import unicodedata
+import copy
+import hashlib
+import time
+from xml.sax.saxutils import escape, quoteattr
 from pathlib import Path
-from typing import Iterable, Optional
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
 
 from pptx import Presentation as PresentationFactory
 from pptx.dml.color import RGBColor
 from pptx.enum.shapes import MSO_AUTO_SHAPE_TYPE
 from pptx.enum.text import MSO_ANCHOR, PP_ALIGN
-from pptx.oxml.ns import qn
-from pptx.oxml.xmlchemy import OxmlElement
+from pptx.opc.constants import CONTENT_TYPE as CT
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.opc.packuri import PackURI
+from pptx.oxml import parse_xml
+from pptx.oxml.ns import nsdecls, qn
+from pptx.oxml.xmlchemy import BaseOxmlElement, OxmlElement
+from pptx.parts.slide import SlideLayoutPart, SlidePart
 from pptx.presentation import Presentation as PptxPresentation
-from pptx.util import Inches, Pt
+from pptx.shapes.shapetree import SlideShapes
+from pptx.slide import Slide, SlideLayout
+from pptx.util import Emu, Pt
 
-from ppt_nav.outline import Outline, OutlineItem, SlidePlanEntry
+from ppt_nav.compression import ZipOptions
+from ppt_nav.layout import (
+    CHIP,
+    LABEL,
+    LayoutStyle,
+    RowLayout,
+    body_box,
+    layout_main_row,
+    layout_sub_row,
+)
+from ppt_nav.metrics import BuildMetrics, timed
+from ppt_nav.outline import Outline, OutlineItem, SlidePlan, SlidePlanEntry
+from ppt_nav.package_writer import RawZipSource, save_presentation
+from ppt_nav.text_metrics import DEFAULT_EAST_ASIAN_FONT, DEFAULT_LATIN_FONT, TextWidthEstimator
+
+# Prebuilt shape elements for one navigation row plus the row's bottom edge.
+_NavFragment = Tuple[Tuple[BaseOxmlElement, ...], int]
+
+# One navigation label: title, left edge, width and text colour.
+_Label = Tuple[str, int, int, RGBColor]
+
+# DrawingML allows at most 32 tab stops per paragraph.
+_MAX_TAB_STOPS = 32
+
+
+class _NavRow(NamedTuple):
+    """One navigation row: what it shows, how to draw it and its active label."""
+
+    key: Tuple[Hashable, ...]
+    draw: Callable[[Slide, int], int]
+    height: int
+    active_title: Optional[str] = None
+    active_color: Optional[RGBColor] = None
+
+
+class _LayoutCanvas(NamedTuple):
+    """Slide-like wrapper so the row drawing code can draw onto a slide layout."""
+
+    shapes: SlideShapes
+
+
+# Prefix of the names given to generated slides and navigation shapes, which
+# lets later runs find them in a deck that has since been edited by hand.
+MARKER_PREFIX = "ppt-nav:"
 
 
 class PresentationBuilder:
-    def __init__(self, font_size: Optional[float] = None) -> None:
-        self.nav_side_margin = Inches(0)
-        self.nav_top_margin = Inches(0)
-        self.body_margin_top = Inches(0.3)
-        self.body_side_margin = Inches(0.5)
+    def __init__(
+        self,
+        font_size: Optional[float] = None,
+        text_metrics: Optional[TextWidthEstimator] = None,
+        metrics: Optional[BuildMetrics] = None,
+        shared_layouts: bool = False,
+        compact_nav: bool = False,
+        zip_options: Optional[ZipOptions] = None,
+    ) -> None:
+        # Geometry and palette defaults for the font size; see LayoutStyle.
+        style = LayoutStyle.for_font_size(font_size)
+        self.nav_side_margin = Emu(style.nav_side_margin)
+        self.nav_top_margin = Emu(style.nav_top_margin)
+        self.body_margin_top = Emu(style.body_margin_top)
+        self.body_side_margin = Emu(style.body_side_margin)
 
         # Theme palette; can be overridden from CLI via --color.
-        self.main_bg_color = RGBColor(141, 175, 208)
-        self.main_inactive_text = RGBColor(245, 248, 252)
-        self.main_active_chip_bg = RGBColor(189, 212, 234)
-        self.main_active_text = RGBColor(43, 109, 180)
-        self.sub_inactive_text = RGBColor(154, 154, 154)
-        self.sub_active_text = RGBColor(43, 109, 180)
-        self.sub_line_color = RGBColor(130, 175, 220)
+        self.main_bg_color = RGBColor.from_string(style.main_bg_color)
+        self.main_inactive_text = RGBColor.from_string(style.main_inactive_text)
+        self.main_active_chip_bg = RGBColor.from_string(style.main_active_chip_bg)
+        self.main_active_text = RGBColor.from_string(style.main_active_text)
+        self.sub_inactive_text = RGBColor.from_string(style.sub_inactive_text)
+        self.sub_active_text = RGBColor.from_string(style.sub_active_text)
+        self.sub_line_color = RGBColor.from_string(style.sub_line_color)
 
         # Base font size in points for navigation and body
-        self.font_size_pt = font_size if font_size and font_size > 0 else 22.0
-        self.sub_font_size_pt = max(self.font_size_pt * 0.84, 12.0)
-        # Scale navigation row heights with font size (22pt baseline).
-        base_main_nav_height_in = 0.56
-        base_sub_nav_height_in = 0.30
-        scale = self.font_size_pt / 22.0
-        self.main_nav_row_height = Inches(base_main_nav_height_in * scale)
-        self.sub_nav_row_height = Inches(base_sub_nav_height_in * scale)
-        self.sub_nav_side_margin = Inches(0.14)
-        self.sub_nav_line_thickness = Inches(0.03)
-        self.sub_nav_label_gap = Inches(0.1)
+        self.font_size_pt = style.font_size_pt
+        self.sub_font_size_pt = style.sub_font_size_pt
+        # Row heights scale with font size (22pt baseline).
+        self.main_nav_row_height = Emu(style.main_row_height)
+        self.sub_nav_row_height = Emu(style.sub_row_height)
+        self.sub_nav_side_margin = Emu(style.sub_side_margin)
+        self.sub_nav_line_thickness = Emu(style.sub_line_thickness)
+        self.sub_nav_label_gap = Emu(style.sub_label_gap)
         # slide_width/slide_height from python-pptx are int-like EMU values.
         # Keep them as concrete ints to avoid Optional math issues in type checkers.
         self._slide_width: int = 0
         self._slide_height: int = 0
+        # Navigation rows keyed on titles, active label, geometry and palette;
+        # see _draw_cached_row.
+        self._nav_fragments: Dict[Hashable, _NavFragment] = {}
+        self.text_metrics = text_metrics or TextWidthEstimator()
+        # Phase and per-slide timings; only collected when provided.
+        self.metrics = metrics
+        # Draw each section's main row once, on a slide layout of its own,
+        # instead of on every slide; see _add_section_layouts.
+        self.shared_layouts = shared_layouts
+        # Draw each row's labels as one textbox of tab-separated runs rather
+        # than one textbox per label; see _add_label_row.
+        self.compact_nav = compact_nav
+        # How the written parts are compressed; see ppt_nav.compression.
+        self.zip_options = zip_options
 
         # Default fonts for body textboxes: Latin and East Asian.
         # Note: PowerPoint uses separate font slots; setting only `font.name`
         # often doesn't affect CJK rendering, so we also set `a:ea` explicitly.
-        self.body_font_latin = "Times New Roman"
-        self.body_font_east_asian = "標楷體"
+        self.body_font_latin = DEFAULT_LATIN_FONT
+        self.body_font_east_asian = DEFAULT_EAST_ASIAN_FONT
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Lets worker processes draw slides with a copy of this builder (see
+        # ppt_nav.streaming). Cached fragments are lxml trees and metrics
+        # belong to the caller, so neither is copied, and RGBColor cannot be
+        # unpickled, so colours travel as hex strings.
+        state = dict(self.__dict__, _nav_fragments={}, metrics=None)
+        colors = [name for name, value in state.items() if isinstance(value, RGBColor)]
+        for name in colors:
+            state[name] = str(state[name])
+        state["_pickled_colors"] = colors
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        state = dict(state)
+        for name in state.pop("_pickled_colors"):
+            state[name] = RGBColor.from_string(state[name])
+        self.__dict__.update(state)
 
     def _set_paragraph_default_fonts(self, paragraph) -> None:
         pPr = paragraph._p.get_or_add_pPr()
@@ -69,179 +173,430 @@ class PresentationBuilder:
     def build(
         self,
         outline: Outline,
-        output_path: Path,
-        template_path: Path,
+        output_path: Union[Path, BinaryIO],
+        template_path: Union[Path, BinaryIO],
     ) -> None:
-        prs = PresentationFactory(str(template_path))
-        # python-pptx stubs may type these as Optional/Unknown; guard for type checkers.
-        slide_width = prs.slide_width
-        slide_height = prs.slide_height
-        if slide_width is None or slide_height is None:
-            raise ValueError("Presentation slide dimensions are not set.")
-        self._slide_width = int(slide_width)
-        self._slide_height = int(slide_height)
-        for plan_entry in outline.iter_slide_plan():
-            self._add_slide(prs, outline.sections, plan_entry)
-        prs.save(str(output_path))
-
-    def _add_slide(
+        # A binary stream lets callers that build many decks read the template
+        # bytes once and hand each build a fresh BytesIO over them.
+        metrics = self.metrics
+        with RawZipSource(template_path) as template:
+            with timed(metrics, "load_template"):
+                prs = PresentationFactory(
+                    str(template_path) if isinstance(template_path, Path) else template_path
+                )
+            # python-pptx stubs may type these as Optional/Unknown; guard for type checkers.
+            slide_width = prs.slide_width
+            slide_height = prs.slide_height
+            if slide_width is None or slide_height is None:
+                raise ValueError("Presentation slide dimensions are not set.")
+            with timed(metrics, "measure"):
+                self._begin_build(outline, int(slide_width), int(slide_height))
+            plan = outline.slide_plan
+            blank_layout = prs.slide_layouts[6]
+            # Only the presentation part (its slide list) and the new slides
+            # change; every other template part is copied without recompressing.
+            modified = {prs.part.partname}
+            with timed(metrics, "allocate"):
+                if self.shared_layouts:
+                    layouts = self._add_section_layouts(prs, blank_layout, outline.sections)
+                    slides = []
+                    for section_index, layout in enumerate(layouts):
+                        count = len(plan.section_slides(section_index))
+                        slides.extend(self._add_slides(prs, layout, count))
+                    # The master lists the new layouts.
+                    modified.add(blank_layout.slide_master.part.partname)
+                else:
+                    slides = self._add_slides(prs, blank_layout, len(plan))
+            for index, slide in enumerate(slides):
+                self._fill_slide(slide, plan, index)
+            with timed(metrics, "save"):
+                save_presentation(prs, output_path, template, modified, self.zip_options)
+        if metrics is not None:
+            metrics.record_output(
+                output_path, [slide.part.partname.membername for slide in slides]
+            )
+
+    def _begin_build(self, outline: Outline, slide_width: int, slide_height: int) -> None:
+        self._slide_width = slide_width
+        self._slide_height = slide_height
+        self.text_metrics.measure_outline(outline, self.font_size_pt, self.sub_font_size_pt)
+
+    def _add_slides(self, prs: PptxPresentation, layout: SlideLayout, count: int) -> List[Slide]:
+        """Append ``count`` blank slides using ``layout`` in one pass.
+
+        ``prs.slides.add_slide`` rescans the presentation part's relationships
+        and every existing ``p:sldId`` on each call, which makes building a
+        deck quadratic in its slide count. Here partnames, rIds and slide ids
+        are allocated from counters computed once, with the same numbering
+        python-pptx would pick.
+        """
+
+        pres_part = prs.part
+        sld_id_lst = pres_part._element.get_or_add_sldIdLst()
+        used_ids = [int(slide_id) for slide_id in sld_id_lst.xpath("./p:sldId/@id")]
+        next_slide_id = max([255] + used_ids) + 1
+        # python-pptx numbers the new slide after the slide count; also step
+        # past any higher-numbered slide part an edited deck may contain.
+        existing_numbers = [
+            rel.target_part.partname.idx or 0
+            for rel in pres_part.rels.values()
+            if rel.reltype == RT.SLIDE and not rel.is_external
+        ]
+        next_partname = max([len(sld_id_lst)] + existing_numbers) + 1
+        layout_part = layout.part
+        rels = pres_part.rels
+        # What clone_layout_placeholders would find, looked up once rather
+        # than by scanning every layout shape again for each slide.
+        placeholders = list(layout.iter_cloneable_placeholders())
+
+        slides: List[Slide] = []
+        for offset in range(count):
+            partname = PackURI(f"/ppt/slides/slide{next_partname + offset}.xml")
+            slide_part = SlidePart.new(partname, pres_part.package, layout_part)
+            # A new part cannot already be related, so skip get_or_add's scan
+            # for an existing relationship and add one directly.
+            r_id = rels._add_relationship(RT.SLIDE, slide_part)
+            sld_id_lst._add_sldId(id=next_slide_id + offset, rId=r_id)
+            slide = slide_part.slide
+            for placeholder in placeholders:
+                slide.shapes.clone_placeholder(placeholder)
+            slides.append(slide)
+        return slides
+
+    def _add_section_layouts(
         self,
         prs: PptxPresentation,
+        base_layout: SlideLayout,
         sections: Iterable[OutlineItem],
-        plan_entry: SlidePlanEntry,
-    ) -> None:
-        layout = prs.slide_layouts[6]
-        slide = prs.slides.add_slide(layout)
-        nav_bottom = self._add_navigation(slide, sections, plan_entry)
+    ) -> List[SlideLayout]:
+        """Clone ``base_layout`` once per section, with the section's main row on it.
+
+        The main navigation row only depends on which section is active, so
+        slides built on these layouts inherit it instead of each carrying a
+        copy; they draw just the sub row and their body. The layouts are
+        added to ``base_layout``'s master, named after their section.
+        """
+
+        package = prs.part.package
+        base_part = base_layout.part
+        master_part = base_layout.slide_master.part
+        layout_id_lst = master_part._element.get_or_add_sldLayoutIdLst()
+        # Slide master and layout ids share one number space.
+        used_ids = [int(i) for i in prs.part._element.xpath("./p:sldMasterIdLst/p:sldMasterId/@id")]
+        for master in prs.slide_masters:
+            used_ids.extend(
+                int(i) for i in master._element.xpath("./p:sldLayoutIdLst/p:sldLayoutId/@id")
+            )
+        next_layout_id = max([2147483647] + used_ids) + 1
+        next_partname = 1 + max(
+            [0]
+            + [
+                part.partname.idx or 0
+                for part in package.iter_parts()
+                if part.partname.startswith("/ppt/slideLayouts/slideLayout")
+            ]
+        )
+
+        style_key = self._nav_style_key()
+        top = int(self.nav_top_margin)
+        section_titles = tuple(section.title for section in sections)
+        layouts: List[SlideLayout] = []
+        for offset, section in enumerate(sections):
+            element = copy.deepcopy(base_part._element)
+            # A custom layout rather than a second "blank" one.
+            element.attrib.pop("type", None)
+            element.cSld.name = f"{MARKER_PREFIX}{section.title}"
+            partname = PackURI(f"/ppt/slideLayouts/slideLayout{next_partname + offset}.xml")
+            layout_part = SlideLayoutPart(partname, CT.PML_SLIDE_LAYOUT, package, element)
+            # Both layouts live in the same folder, so the base layout's
+            # relationships (its master, any pictures) apply unchanged.
+            layout_part.rels._rels.update(base_part.rels.items())
+            r_id = master_part.rels._add_relationship(RT.SLIDE_LAYOUT, layout_part)
+            # python-pptx maps only r:id on p:sldLayoutId, so set id directly.
+            layout_id = layout_id_lst._add_sldLayoutId()
+            layout_id.set("id", str(next_layout_id + offset))
+            layout_id.rId = r_id
+
+            layout = layout_part.slide_layout
+            canvas = _LayoutCanvas(SlideShapes(element.cSld.spTree, layout))
+            row = _NavRow(
+                ("main", section_titles, section.title),
+                lambda slide, top, title=section.title: self._draw_main_navigation_row(
+                    slide, section_titles, title, top
+                ),
+                int(self.main_nav_row_height),
+            )
+            self._draw_nav_row(canvas, row, top, style_key)
+            layouts.append(layout)
+        return layouts
+
+    def _fill_slide(self, slide: Slide, plan: SlidePlan, index: int) -> None:
+        plan_entry = plan[index]
+        slide._element.cSld.name = self._slide_marker(plan_entry)
+        if self.metrics is None:
+            nav_bottom = self._add_navigation(slide, plan, index)
+            self._add_body_placeholder(slide, plan_entry, nav_bottom)
+            return
+
+        start = time.perf_counter()
+        nav_bottom = self._add_navigation(slide, plan, index)
+        drawn = time.perf_counter()
         self._add_body_placeholder(slide, plan_entry, nav_bottom)
+        self.metrics.record_slide(drawn - start, time.perf_counter() - drawn, len(slide.shapes))
 
-    def _add_navigation(
-        self,
-        slide,
-        sections: Iterable[OutlineItem],
-        plan_entry: SlidePlanEntry,
-    ) -> int:
-        current_section = plan_entry.section
-        current_child = plan_entry.child
+    def _add_navigation(self, slide, plan: SlidePlan, index: int) -> int:
         top = int(self.nav_top_margin)
-        section_titles = [section.title for section in sections]
-        top = self._draw_main_navigation_row(slide, section_titles, current_section.title, top)
-        if current_section.children:
-            child_titles = [child.title for child in current_section.children]
-            active_child = current_child.title if current_child else None
-            top = self._draw_sub_navigation_row(slide, child_titles, active_child, top)
+        style_key = self._nav_style_key()
+        for row in self._navigation_rows(plan, index):
+            if self.shared_layouts and row.key[0] == "main":
+                # Already on the slide's layout.
+                top += row.height
+                continue
+            top, _ = self._draw_nav_row(slide, row, top, style_key)
         return top
 
+    def _navigation_rows(self, plan: SlidePlan, index: int) -> List[_NavRow]:
+        """Describe the navigation rows of slide ``index`` of ``plan``, top to bottom."""
+
+        section_index = plan.slide_sections[index]
+        section_titles = plan.section_titles
+        section_title = section_titles[section_index]
+        rows = [
+            _NavRow(
+                ("main", section_titles, section_title),
+                lambda slide, top: self._draw_main_navigation_row(
+                    slide, section_titles, section_title, top
+                ),
+                int(self.main_nav_row_height),
+            )
+        ]
+        child_titles = plan.child_titles[section_index]
+        if child_titles:
+            # Sub rows of one section differ only in which label is active, so
+            # cache the row with every label inactive and recolour per slide.
+            rows.append(
+                _NavRow(
+                    ("sub", child_titles),
+                    lambda slide, top: self._draw_sub_navigation_row(
+                        slide, child_titles, None, top
+                    ),
+                    int(self.sub_nav_row_height),
+                    child_titles[plan.slide_children[index]],
+                    self.sub_active_text,
+                )
+            )
+        return rows
+
+    def _draw_nav_row(
+        self, slide, row: _NavRow, top: int, style_key: Hashable
+    ) -> Tuple[int, List[BaseOxmlElement]]:
+        return self._draw_cached_row(
+            slide,
+            (*row.key, top, style_key),
+            lambda: row.draw(slide, top),
+            self._row_marker(row, top, style_key),
+            active_title=row.active_title,
+            active_color=row.active_color,
+        )
+
+    def _row_marker(self, row: _NavRow, top: int, style_key: Hashable) -> str:
+        # Names every shape of a drawn row, e.g. "ppt-nav:sub:3f2a9c01d4", so
+        # the row can be found again and compared against a fresh layout.
+        return f"{MARKER_PREFIX}{row.key[0]}:{_digest((row.key, top, row.active_title, style_key))}"
+
+    def _slide_marker(self, plan_entry: SlidePlanEntry) -> str:
+        # Stored as the slide's name; identifies the plan entry by its titles.
+        child_title = plan_entry.child.title if plan_entry.child else None
+        return (
+            f"{MARKER_PREFIX}{_digest(plan_entry.section.title)}:"
+            f"{_digest(child_title) if child_title is not None else ''}"
+        )
+
+    def _nav_style_key(self) -> Hashable:
+        # Everything besides titles and the active label that affects how a
+        # navigation row is drawn.
+        key = (
+            self._slide_width,
+            self._slide_height,
+            self.font_size_pt,
+            self.sub_font_size_pt,
+            int(self.nav_side_margin),
+            int(self.main_nav_row_height),
+            int(self.sub_nav_row_height),
+            int(self.sub_nav_side_margin),
+            int(self.sub_nav_line_thickness),
+            int(self.sub_nav_label_gap),
+            self.body_font_latin,
+            self.main_bg_color,
+            self.main_inactive_text,
+            self.main_active_chip_bg,
+            self.main_active_text,
+            self.sub_inactive_text,
+            self.sub_active_text,
+            self.sub_line_color,
+        )
+        # Appended only when set so markers of existing decks stay valid.
+        return key + ("compact",) if self.compact_nav else key
+
+    def _draw_cached_row(
+        self,
+        slide,
+        key: Hashable,
+        draw: Callable[[], int],
+        marker: str,
+        active_title: Optional[str] = None,
+        active_color: Optional[RGBColor] = None,
+    ) -> Tuple[int, List[BaseOxmlElement]]:
+        """Draw a navigation row once per ``key`` and clone its XML afterwards.
+
+        The first time a row is needed it is drawn through the python-pptx
+        shape API and the resulting ``p:sp`` elements are kept. Every slide
+        then gets deep copies appended to its ``spTree`` with fresh shape ids,
+        named after ``marker``. Labels reading ``active_title`` are recoloured
+        to ``active_color``. Returns the row's bottom edge and its shapes.
+        """
+
+        sp_tree = slide.shapes._spTree
+        cached = self._nav_fragments.get(key)
+        if cached is None:
+            first_new = len(sp_tree)
+            bottom = draw()
+            drawn = list(sp_tree[first_new:])
+            for element in drawn:
+                sp_tree.remove(element)
+            cached = (tuple(drawn), bottom)
+            self._nav_fragments[key] = cached
+
+        elements, bottom = cached
+        next_id = sp_tree.max_shape_id + 1
+        clones: List[BaseOxmlElement] = []
+        for element in elements:
+            clone = copy.deepcopy(element)
+            c_nv_pr = clone.find(".//" + qn("p:cNvPr"))
+            if c_nv_pr is not None:
+                # Same "<name> <id - 1>" numbering python-pptx gives new shapes.
+                c_nv_pr.set("id", str(next_id))
+                c_nv_pr.set("name", f"{marker} {next_id - 1}")
+                next_id += 1
+            if active_title is not None and active_color is not None:
+                self._recolor_label(clone, active_title, active_color)
+            sp_tree.insert_element_before(clone, "p:extLst")
+            clones.append(clone)
+        return bottom, clones
+
+    def _recolor_label(self, element: BaseOxmlElement, title: str, color: RGBColor) -> None:
+        # Every label is a single run, several per shape in compact rows where
+        # each run starts with the tab leading to its stop.
+        for run in element.iterfind(".//" + qn("a:r")):
+            if run.findtext(qn("a:t"), "").lstrip("\t") != title:
+                continue
+            for srgb in run.iterfind(f"{qn('a:rPr')}/{qn('a:solidFill')}/{qn('a:srgbClr')}"):
+                srgb.set("val", str(color))
+
+    def _layout_style(self) -> LayoutStyle:
+        """The builder's current geometry and palette as a :class:`LayoutStyle`."""
+
+        return LayoutStyle(
+            slide_width=self._slide_width,
+            slide_height=self._slide_height,
+            font_size_pt=self.font_size_pt,
+            sub_font_size_pt=self.sub_font_size_pt,
+            nav_top_margin=int(self.nav_top_margin),
+            nav_side_margin=int(self.nav_side_margin),
+            main_row_height=int(self.main_nav_row_height),
+            sub_row_height=int(self.sub_nav_row_height),
+            sub_side_margin=int(self.sub_nav_side_margin),
+            sub_line_thickness=int(self.sub_nav_line_thickness),
+            sub_label_gap=int(self.sub_nav_label_gap),
+            body_margin_top=int(self.body_margin_top),
+            body_side_margin=int(self.body_side_margin),
+            main_bg_color=str(self.main_bg_color),
+            main_inactive_text=str(self.main_inactive_text),
+            main_active_chip_bg=str(self.main_active_chip_bg),
+            main_active_text=str(self.main_active_text),
+            sub_inactive_text=str(self.sub_inactive_text),
+            sub_active_text=str(self.sub_active_text),
+            sub_line_color=str(self.sub_line_color),
+            label_font=self.body_font_latin,
+        )
+
     def _draw_main_navigation_row(
         self, slide, titles, active_title: Optional[str], top: int
     ) -> int:
-        if not titles:
-            return top
-        if self._slide_width <= 0:
-            raise ValueError("Slide width is not set.")
-        row_height = int(self.main_nav_row_height)
-        bg = slide.shapes.add_shape(
-            MSO_AUTO_SHAPE_TYPE.RECTANGLE,
-            int(self.nav_side_margin),
-            top,
-            int(self._slide_width - int(self.nav_side_margin) * 2),
-            row_height,
+        row = layout_main_row(
+            titles, active_title, top, self._layout_style(), self._estimate_text_width_emu
         )
-        self._style_solid_shape(bg, self.main_bg_color)
-
-        count = len(titles)
-        base_tab_width = int(self._slide_width // count)
-        for idx, title in enumerate(titles):
-            left = idx * base_tab_width
-            if idx == count - 1:
-                item_width = int(self._slide_width - left)
-            else:
-                item_width = base_tab_width
-
-            if title == active_title:
-                # Make the chip taller and size width by title length while
-                # keeping it inside the tab area.
-                chip_margin_y = max(int(row_height * 0.12), int(Inches(0.02)))
-                chip_height = int(row_height - chip_margin_y * 2)
-                chip_padding_x = int(Inches(0.24))
-                estimated_text_width = self._estimate_text_width_emu(title, self.font_size_pt)
-                desired_chip_width = int(estimated_text_width + chip_padding_x * 2)
-                max_chip_width = int(max(item_width - int(Inches(0.1)), int(item_width * 0.6)))
-                min_chip_width = int(min(item_width, max(estimated_text_width, int(Inches(0.95)))))
-                chip_width = max(min(desired_chip_width, max_chip_width), min_chip_width)
-                chip_margin_x = int(max((item_width - chip_width) // 2, 0))
-                chip = slide.shapes.add_shape(
-                    MSO_AUTO_SHAPE_TYPE.ROUNDED_RECTANGLE,
-                    int(left + chip_margin_x),
-                    int(top + chip_margin_y),
-                    chip_width,
-                    chip_height,
-                )
-                self._style_solid_shape(chip, self.main_active_chip_bg)
-                chip.adjustments[0] = 0.2
-
-            self._add_centered_label(
-                slide,
-                title,
-                int(left),
-                top,
-                int(item_width),
-                row_height,
-                self.main_active_text if title == active_title else self.main_inactive_text,
-            )
-        return top + row_height
+        self._draw_row(slide, row)
+        return row.bottom
 
     def _draw_sub_navigation_row(self, slide, titles, active_title: Optional[str], top: int) -> int:
-        if self._slide_width <= 0:
-            raise ValueError("Slide width is not set.")
-
-        row_height = int(self.sub_nav_row_height)
-        line_thickness = int(self.sub_nav_line_thickness)
-        center_y = int(top + row_height // 2)
-        side_margin = int(self.sub_nav_side_margin)
-
-        left_line_start = side_margin
-        left_line_end = int(left_line_start + int(Inches(0.40)))
-        left_line = slide.shapes.add_shape(
-            MSO_AUTO_SHAPE_TYPE.RECTANGLE,
-            left_line_start,
-            int(center_y),
-            int(left_line_end - left_line_start),
-            line_thickness,
-        )
-        self._style_solid_shape(left_line, self.sub_line_color)
-
-        labels_left = int(left_line_end + int(self.sub_nav_label_gap))
-        labels_right = int(self._slide_width - side_margin - int(Inches(0.35)))
-        cursor = labels_left
-        item_gap = int(Inches(0.08))
-        min_label_width = int(Inches(0.35))
-
-        if titles and labels_right > labels_left:
-            text_padding = int(Inches(0.08))
-            preferred_widths = [
-                max(
-                    self._estimate_text_width_emu(title, self.sub_font_size_pt) + text_padding,
-                    min_label_width,
-                )
-                for title in titles
-            ]
-            target_widths = self._fit_widths_to_space(
-                preferred_widths,
-                int(labels_right - labels_left),
-                item_gap,
-                min_label_width,
-            )
-            for idx, title in enumerate(titles):
-                remaining = max(labels_right - cursor, 0)
-                if remaining <= 0:
-                    break
-                width = min(target_widths[idx], remaining)
-                self._add_left_label(
-                    slide,
-                    title,
-                    cursor,
-                    top,
-                    width,
-                    row_height,
-                    self.sub_active_text if title == active_title else self.sub_inactive_text,
-                    self.sub_font_size_pt,
-                )
-                cursor += int(width + item_gap)
-
-        right_line_start = int(min(max(cursor, labels_left), self._slide_width - side_margin))
-        right_line_end = int(self._slide_width - side_margin)
-        if right_line_end > right_line_start:
-            right_line = slide.shapes.add_shape(
-                MSO_AUTO_SHAPE_TYPE.RECTANGLE,
-                right_line_start,
-                int(center_y),
-                int(right_line_end - right_line_start),
-                line_thickness,
-            )
-            self._style_solid_shape(right_line, self.sub_line_color)
+        row = layout_sub_row(titles, top, self._layout_style(), self._estimate_text_width_emu)
+        self._draw_row(slide, row, active_title, self.sub_active_text)
+        return row.bottom
 
-        return top + row_height
+    def _draw_row(
+        self,
+        slide,
+        row: RowLayout,
+        active_title: Optional[str] = None,
+        active_color: Optional[RGBColor] = None,
+    ) -> None:
+        """Add the shapes of a laid-out row to ``slide`` in drawing order.
+
+        Labels reading ``active_title`` get ``active_color``. With
+        ``compact_nav`` the labels become one tab-stop textbox, drawn in place
+        of the row's last label, unless a label is wider than its cell (see
+        :meth:`_labels_overflow`).
+        """
+
+        compact = self.compact_nav and not self._labels_overflow(row)
+        last_label = row.last_label() if compact else -1
+        labels: List[_Label] = []
+        for index, item in enumerate(row):
+            if item.kind == LABEL:
+                if item.text == active_title and active_color is not None:
+                    color = active_color
+                else:
+                    color = RGBColor.from_string(item.color)
+                if not compact:
+                    self._add_label(
+                        slide,
+                        item.text,
+                        item.left,
+                        item.top,
+                        item.width,
+                        item.height,
+                        color,
+                        row.font_size_pt,
+                    )
+                    continue
+                labels.append((item.text, item.left, item.width, color))
+                if index == last_label:
+                    self._add_label_row(slide, labels, row.top, row.height, row.font_size_pt)
+                continue
+            shape = slide.shapes.add_shape(
+                MSO_AUTO_SHAPE_TYPE.ROUNDED_RECTANGLE
+                if item.kind == CHIP
+                else MSO_AUTO_SHAPE_TYPE.RECTANGLE,
+                item.left,
+                item.top,
+                item.width,
+                item.height,
+            )
+            self._style_solid_shape(shape, RGBColor.from_string(item.color))
+            if item.kind == CHIP:
+                shape.adjustments[0] = 0.2
+
+    def _labels_overflow(self, row: RowLayout) -> bool:
+        # A label centred on a tab stop must fit in its cell: a wider one runs
+        # past the next stop, so the next tab skips a stop and every later
+        # label in the textbox lands one cell to the right. Such rows keep one
+        # textbox per label.
+        return any(
+            item.kind == LABEL
+            and self._estimate_text_width_emu(item.text, row.font_size_pt) > item.width
+            for item in row
+        )
 
     def _style_solid_shape(self, shape, fill_color: RGBColor) -> None:
         shape.fill.solid()
@@ -249,7 +604,7 @@ class PresentationBuilder:
         shape.line.fill.background()
         shape.shadow.inherit = False
 
-    def _add_centered_label(
+    def _add_label(
         self,
         slide,
         text: str,
@@ -258,6 +613,7 @@ class PresentationBuilder:
         width: int,
         height: int,
         color: RGBColor,
+        font_size_pt: float,
     ) -> None:
         box = slide.shapes.add_textbox(left, top, width, height)
         tf = box.text_frame
@@ -269,95 +625,58 @@ class PresentationBuilder:
         run = para.add_run()
         run.text = text
         run.font.bold = True
-        run.font.size = Pt(self.font_size_pt)
+        run.font.size = Pt(font_size_pt)
         run.font.color.rgb = color
         run.font.name = self.body_font_latin
 
-    def _add_left_label(
+    def _add_label_row(
         self,
         slide,
-        text: str,
-        left: int,
+        labels: List[_Label],
         top: int,
-        width: int,
         height: int,
-        color: RGBColor,
         font_size_pt: float,
     ) -> None:
-        box = slide.shapes.add_textbox(left, top, width, height)
-        tf = box.text_frame
-        tf.clear()
-        tf.vertical_anchor = MSO_ANCHOR.MIDDLE
-        tf.margin_left = tf.margin_right = 0
-        para = tf.paragraphs[0]
-        para.alignment = PP_ALIGN.CENTER
-        run = para.add_run()
-        run.text = text
-        run.font.bold = True
-        run.font.size = Pt(font_size_pt)
-        run.font.color.rgb = color
-        run.font.name = self.body_font_latin
+        """Draw ``labels`` as tab-separated runs in as few textboxes as possible.
+
+        Each label is a run starting with a tab that jumps to a centre-aligned
+        stop in the middle of its cell, so it lands where its own centred
+        textbox would put it. The font is set once in the textbox's list style
+        and runs only carry their colour. A textbox holds up to
+        :data:`_MAX_TAB_STOPS` labels.
+        """
+
+        list_style = (
+            f'<a:lstStyle><a:lvl1pPr><a:defRPr b="1" sz="{Pt(font_size_pt).centipoints}">'
+            f"<a:latin typeface={quoteattr(self.body_font_latin)}/></a:defRPr></a:lvl1pPr>"
+            "</a:lstStyle>"
+        )
+        for start in range(0, len(labels), _MAX_TAB_STOPS):
+            chunk = labels[start : start + _MAX_TAB_STOPS]
+            box_left = chunk[0][1]
+            box_width = chunk[-1][1] + chunk[-1][2] - box_left
+            stops = "".join(
+                f'<a:tab pos="{left + width // 2 - box_left}" algn="ctr"/>'
+                for _, left, width, _ in chunk
+            )
+            runs = "".join(
+                f'<a:r><a:rPr><a:solidFill><a:srgbClr val="{color}"/></a:solidFill></a:rPr>'
+                f"<a:t>\t{escape(title)}</a:t></a:r>"
+                for title, _, _, color in chunk
+            )
+            box = slide.shapes.add_textbox(box_left, top, box_width, height)
+            sp = box._element
+            sp.replace(
+                sp.txBody,
+                parse_xml(
+                    f'<p:txBody {nsdecls("a", "p")}><a:bodyPr wrap="none" lIns="0" rIns="0" '
+                    f'anchor="ctr"/>{list_style}<a:p><a:pPr><a:tabLst>{stops}</a:tabLst>'
+                    f"</a:pPr>{runs}</a:p></p:txBody>"
+                ),
+            )
 
     def _estimate_text_width_emu(self, text: str, font_size_pt: float) -> int:
-        # Estimate width by character category to reduce over/under-estimation
-        # for mixed-case English, digits, spaces, and CJK text.
-        stripped = text.strip()
-        if not stripped:
-            stripped = " "
-
-        em_width = 0.0
-        for ch in stripped:
-            if ch.isspace():
-                em_width += 0.32
-            elif self._is_cjk_char(ch):
-                em_width += 1.0
-            elif ch in "ilI.,:;'`!|":
-                em_width += 0.3
-            elif ch in "MW@#%&":
-                em_width += 0.8
-            elif ch.isupper():
-                em_width += 0.65
-            elif ch.islower():
-                em_width += 0.5
-            elif ch.isdigit():
-                em_width += 0.55
-            else:
-                em_width += 0.5
-
-        width_pt = max(em_width * font_size_pt, font_size_pt * 1.2)
-        return int(width_pt * 12700)
-
-    def _is_cjk_char(self, ch: str) -> bool:
-        return unicodedata.east_asian_width(ch) in {"W", "F"}
-
-    def _fit_widths_to_space(
-        self,
-        preferred_widths: list[int],
-        available_width: int,
-        item_gap: int,
-        min_width: int,
-    ) -> list[int]:
-        count = len(preferred_widths)
-        if count == 0:
-            return []
-
-        usable = max(available_width - item_gap * max(count - 1, 0), count)
-        preferred_total = sum(preferred_widths)
-        if preferred_total <= usable:
-            return preferred_widths
-
-        scale = usable / preferred_total
-        scaled = [max(min_width, int(round(width * scale))) for width in preferred_widths]
-
-        total = sum(scaled)
-        while total > usable:
-            idx = max(range(count), key=lambda i: scaled[i])
-            if scaled[idx] <= min_width:
-                break
-            scaled[idx] -= 1
-            total -= 1
-
-        return scaled
+        return self.text_metrics.width_emu(text, font_size_pt)
 
     def _add_body_placeholder(
         self,
@@ -365,12 +684,8 @@ class PresentationBuilder:
         plan_entry: SlidePlanEntry,
         nav_bottom: int,
     ) -> None:
-        if self._slide_width <= 0 or self._slide_height <= 0:
-            raise ValueError("Slide dimensions are not set.")
-        body_top = int(nav_bottom + int(self.body_margin_top))
-        height = int(self._slide_height - body_top - int(Inches(0.5)))
-        width = int(self._slide_width - int(self.body_side_margin) * 2)
-        box = slide.shapes.add_textbox(int(self.body_side_margin), body_top, width, height)
+        left, body_top, width, height = body_box(nav_bottom, self._layout_style())
+        box = slide.shapes.add_textbox(left, body_top, width, height)
         tf = box.text_frame
         tf.clear()
         para = tf.paragraphs[0]
@@ -384,3 +699,7 @@ class PresentationBuilder:
         extra_para = tf.add_paragraph()
         extra_para.font.size = Pt(self.font_size_pt)
         self._set_paragraph_default_fonts(extra_para)
+
+
+def _digest(value: object) -> str:
+    return hashlib.sha1(repr(value).encode("utf-8")).hexdigest()[:10]
@@ -0,0 +1,443 @@
+from __future__ import annotations
+
+"""Local render service behind ``ppt-nav serve``.
+
+A short-lived ``ppt-nav`` call spends most of its time starting Python,
+importing python-pptx and lxml and loading the template. The service pays
+for that once: a bounded pool of worker processes imports everything up
+front, keeps template bytes and builders (with their cached navigation
+rows) between requests, and turns outline text into PPTX bytes.
+
+Requests are plain HTTP over TCP or a Unix socket::
+
+    POST /build?font_size=20&compact_nav=1   body: outline text (UTF-8)
+    GET  /health
+
+``/build`` answers with the deck (200), the outline or option error as
+text (400), a missing template (404), or 503 when every worker is busy and
+the queue is full. :func:`request_build` is a client for the same API.
+The service is meant for local use: it binds to localhost by default and
+reads any template path a request names.
+"""
+
+import http.client
+import json
+import os
+import socket
+import socketserver
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, fields
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, Optional, Tuple, Union
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from ppt_nav.generator import ENGINES, generate_presentation_bytes
+from ppt_nav.outline import Outline
+from ppt_nav.text_metrics import TextWidthEstimator
+
+# Only worker processes build decks; the server process and clients never
+# need python-pptx.
+if TYPE_CHECKING:
+    from ppt_nav.ppt_builder import PresentationBuilder
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+PPTX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.presentationml.presentation"
+
+# Largest outline accepted in one request.
+MAX_OUTLINE_BYTES = 16 * 2**20
+
+
+@dataclass(frozen=True)
+class RenderOptions:
+    """Build options a request can set; they mirror the ``ppt-nav`` flags."""
+
+    font_size: Optional[float] = None
+    # Resolved on the server; defaults to the template the service started with.
+    template: Optional[Path] = None
+    engine: str = "pptx"
+    compact_nav: bool = False
+    shared_layouts: bool = False
+
+    @classmethod
+    def from_query(cls, query: str) -> "RenderOptions":
+        """Parse ``font_size=20&compact_nav=1``-style options; raises ``ValueError``."""
+
+        known = {option.name for option in fields(cls)}
+        values: Dict[str, object] = {}
+        for name, value in parse_qsl(query, keep_blank_values=True):
+            if name not in known:
+                raise ValueError(f"Unknown option {name!r}.")
+            if name == "font_size":
+                try:
+                    size = float(value)
+                except ValueError:
+                    raise ValueError(f"font_size must be a number, not {value!r}.") from None
+                if size <= 0:
+                    raise ValueError("Font size must be positive")
+                values[name] = size
+            elif name == "template":
+                values[name] = Path(value)
+            elif name == "engine":
+                if value not in ENGINES:
+                    raise ValueError(
+                        f"Unknown engine {value!r}; expected one of {', '.join(ENGINES)}."
+                    )
+                values[name] = value
+            else:
+                values[name] = value.lower() not in ("", "0", "false", "no")
+        return cls(**values)  # type: ignore[arg-type]
+
+    def to_query(self) -> str:
+        params = []
+        if self.font_size is not None:
+            params.append(("font_size", repr(self.font_size)))
+        if self.template is not None:
+            params.append(("template", str(self.template)))
+        if self.engine != "pptx":
+            params.append(("engine", self.engine))
+        if self.compact_nav:
+            params.append(("compact_nav", "1"))
+        if self.shared_layouts:
+            params.append(("shared_layouts", "1"))
+        return urlencode(params)
+
+
+class ServiceBusy(RuntimeError):
+    """Every worker is busy and the request queue is full."""
+
+
+class RenderService:
+    """Builds decks from outline text in a bounded pool of warm worker processes.
+
+    At most ``max_workers`` builds run at once and at most ``max_pending``
+    (running plus queued) are accepted; :meth:`render` raises
+    :class:`ServiceBusy` beyond that rather than queueing without bound.
+    """
+
+    def __init__(
+        self,
+        template_path: Path,
+        text_metrics: Optional[TextWidthEstimator] = None,
+        max_workers: Optional[int] = None,
+        max_pending: Optional[int] = None,
+    ) -> None:
+        self.template_path = template_path
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self.max_pending = max_pending or self.max_workers * 4
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            initializer=_init_render_worker,
+            initargs=(template_path, text_metrics),
+        )
+        # Start every worker now so the first requests do not pay for imports.
+        for future in [
+            self._executor.submit(_warm_up_worker) for _ in range(self.max_workers)
+        ]:
+            future.result()
+
+    def render(self, outline_text: str, options: RenderOptions) -> Tuple[int, bytes]:
+        """Build ``outline_text``; returns an HTTP status and the deck or an error message."""
+
+        if not self._slots.acquire(blocking=False):
+            raise ServiceBusy(f"All {self.max_pending} request slots are in use.")
+        try:
+            return self._executor.submit(_render_job, outline_text, options).result()
+        finally:
+            self._slots.release()
+
+    def close(self) -> None:
+        self._executor.shutdown(cancel_futures=True)
+
+    def __enter__(self) -> "RenderService":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+def make_server(
+    service: RenderService,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    socket_path: Optional[Path] = None,
+) -> socketserver.BaseServer:
+    """HTTP server for ``service`` on ``host:port``, or on a Unix socket at ``socket_path``."""
+
+    server: Union[_TCPRenderServer, _UnixRenderServer]
+    if socket_path is not None:
+        if not hasattr(socketserver, "ThreadingUnixStreamServer"):
+            raise ValueError("Unix sockets are not supported on this platform.")
+        # A socket file left behind by an earlier run would make bind fail.
+        if socket_path.is_socket():
+            socket_path.unlink()
+        server = _UnixRenderServer(str(socket_path), _RenderHandler)
+    else:
+        server = _TCPRenderServer((host, port), _RenderHandler)
+    server.service = service
+    return server
+
+
+def serve(
+    service: RenderService,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    socket_path: Optional[Path] = None,
+    on_ready: Optional[Callable[[str], None]] = None,
+) -> None:
+    """Serve ``service`` until interrupted; ``on_ready`` gets the listening address."""
+
+    with make_server(service, host, port, socket_path) as server:
+        if on_ready is not None:
+            on_ready(server_address(server))
+        try:
+            server.serve_forever()
+        finally:
+            if socket_path is not None:
+                socket_path.unlink(missing_ok=True)
+
+
+def server_address(server: socketserver.BaseServer) -> str:
+    """Where ``server`` listens, as ``http://host:port`` or the socket path."""
+
+    address = server.server_address
+    if isinstance(address, tuple):
+        return f"http://{address[0]}:{address[1]}"
+    return str(address)
+
+
+def request_build(
+    outline_text: str,
+    options: Optional[RenderOptions] = None,
+    url: str = f"http://{DEFAULT_HOST}:{DEFAULT_PORT}",
+    socket_path: Optional[Path] = None,
+    timeout: float = 120.0,
+) -> bytes:
+    """Ask a running ``ppt-nav serve`` for the deck of ``outline_text``.
+
+    Connects to ``socket_path`` when given, otherwise to ``url``. Raises
+    :class:`RenderError` with the server's message when it rejects the
+    request.
+    """
+
+    query = (options or RenderOptions()).to_query()
+    connection: http.client.HTTPConnection
+    if socket_path is not None:
+        connection = _UnixHTTPConnection(str(socket_path), timeout)
+    else:
+        parts = urlsplit(url)
+        connection = http.client.HTTPConnection(
+            parts.hostname or DEFAULT_HOST, parts.port or DEFAULT_PORT, timeout=timeout
+        )
+    try:
+        connection.request(
+            "POST",
+            f"/build?{query}" if query else "/build",
+            body=outline_text.encode("utf-8"),
+            headers={"Content-Type": "text/markdown; charset=utf-8"},
+        )
+        response = connection.getresponse()
+        body = response.read()
+    finally:
+        connection.close()
+    if response.status != 200:
+        raise RenderError(response.status, body.decode("utf-8", "replace"))
+    return body
+
+
+class RenderError(RuntimeError):
+    """A request :func:`request_build` sent was rejected; ``status`` is the HTTP status."""
+
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(f"{status}: {message}")
+        self.status = status
+        self.message = message
+
+
+class _RenderHandler(BaseHTTPRequestHandler):
+    server_version = "ppt-nav"
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        if urlsplit(self.path).path != "/health":
+            self._reply(404, b"Not found.")
+            return
+        service = self.server.service  # type: ignore[attr-defined]
+        health = {
+            "status": "ok",
+            "workers": service.max_workers,
+            "max_pending": service.max_pending,
+        }
+        self._reply(200, json.dumps(health).encode("utf-8"), "application/json")
+
+    def do_POST(self) -> None:
+        target = urlsplit(self.path)
+        # Until the body has been read, an error reply must close the
+        # connection, or the unread body would be taken for the next request.
+        if target.path != "/build":
+            self.close_connection = True
+            self._reply(404, b"Not found.")
+            return
+        try:
+            length = int(self.headers.get("Content-Length", ""))
+        except ValueError:
+            self.close_connection = True
+            self._reply(411, b"Content-Length is required.")
+            return
+        if length < 0:
+            self.close_connection = True
+            self._reply(400, b"Content-Length must not be negative.")
+            return
+        if length > MAX_OUTLINE_BYTES:
+            self.close_connection = True
+            self._reply(413, b"Outline is too large.")
+            return
+        body = self.rfile.read(length)
+        try:
+            outline_text = body.decode("utf-8")
+            options = RenderOptions.from_query(target.query)
+        except ValueError as exc:
+            self._reply(400, str(exc).encode("utf-8"))
+            return
+
+        service = self.server.service  # type: ignore[attr-defined]
+        try:
+            status, payload = service.render(outline_text, options)
+        except ServiceBusy as exc:
+            self._reply(503, str(exc).encode("utf-8"), headers={"Retry-After": "1"})
+            return
+        except Exception as exc:  # a crashed build must not take the server down
+            self._reply(500, f"{type(exc).__name__}: {exc}".encode("utf-8"))
+            return
+        if status == 200:
+            self._reply(200, payload, PPTX_CONTENT_TYPE)
+        else:
+            self._reply(status, payload)
+
+    def _reply(
+        self,
+        status: int,
+        body: bytes,
+        content_type: str = "text/plain; charset=utf-8",
+        headers: Optional[Dict[str, str]] = None,
+    ) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self) -> str:
+        # Unix socket peers have no address.
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+
+class _TCPRenderServer(ThreadingHTTPServer):
+    daemon_threads = True
+    service: RenderService
+
+
+if hasattr(socketserver, "ThreadingUnixStreamServer"):  # not on Windows
+
+    class _UnixRenderServer(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+        service: RenderService
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path: str, timeout: float) -> None:
+        super().__init__("localhost", timeout=timeout)
+        self._socket_path = path
+
+    def connect(self) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self._socket_path)
+
+
+# Per worker process: the default template, text measurement, the templates
+# read most recently (keyed by path, mtime and size) and one builder per
+# option set.
+_worker_template_path: Optional[Path] = None
+_worker_text_metrics: Optional[TextWidthEstimator] = None
+_worker_templates: OrderedDict[Tuple[Path, int, int], bytes] = OrderedDict()
+_worker_builders: Dict[Tuple[Optional[float], bool, bool], PresentationBuilder] = {}
+
+# Cached navigation rows a worker's builder keeps before starting afresh.
+_MAX_NAV_FRAGMENTS = 4096
+
+# Templates a worker keeps in memory; the least recently used is dropped.
+_MAX_TEMPLATES = 4
+
+
+def _init_render_worker(template_path: Path, text_metrics: Optional[TextWidthEstimator]) -> None:
+    global _worker_template_path, _worker_text_metrics
+    _worker_template_path = template_path
+    _worker_text_metrics = text_metrics
+    _template_bytes(template_path)
+
+
+def _warm_up_worker() -> None:
+    # Runs one tiny build so lxml, python-pptx and the builder code paths
+    # are loaded before the first real request.
+    _render_job("- Warm-up\n  - Start\n", RenderOptions())
+
+
+def _render_job(outline_text: str, options: RenderOptions) -> Tuple[int, bytes]:
+    # Errors are returned as (status, message) rather than raised: some
+    # exception types (e.g. OutlineSyntaxError) do not survive pickling.
+    try:
+        if _worker_template_path is None:
+            raise RuntimeError("Render worker was not initialised with a template.")
+        template = _template_bytes(options.template or _worker_template_path)
+        outline = Outline.from_text(outline_text)
+        deck = generate_presentation_bytes(
+            outline, template=template, engine=options.engine, builder=_builder_for(options)
+        )
+    except FileNotFoundError as exc:
+        return 404, str(exc).encode("utf-8")
+    except ValueError as exc:
+        return 400, str(exc).encode("utf-8")
+    return 200, deck
+
+
+def _template_bytes(path: Path) -> bytes:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Template file not found: {path}") from None
+    key = (path.resolve(), stat.st_mtime_ns, stat.st_size)
+    data = _worker_templates.get(key)
+    if data is not None:
+        _worker_templates.move_to_end(key)
+        return data
+    # Drop older versions of the same template.
+    for stale in [k for k in _worker_templates if k[0] == key[0]]:
+        del _worker_templates[stale]
+    data = _worker_templates[key] = path.read_bytes()
+    while len(_worker_templates) > _MAX_TEMPLATES:
+        _worker_templates.popitem(last=False)
+    return data
+
+
+def _builder_for(options: RenderOptions) -> PresentationBuilder:
+    from ppt_nav.ppt_builder import PresentationBuilder
+
+    key = (options.font_size, options.compact_nav, options.shared_layouts)
+    builder = _worker_builders.get(key)
+    if builder is None:
+        builder = _worker_builders[key] = PresentationBuilder(
+            font_size=options.font_size,
+            text_metrics=_worker_text_metrics,
+            compact_nav=options.compact_nav,
+            shared_layouts=options.shared_layouts,
+        )
+    elif len(builder._nav_fragments) > _MAX_NAV_FRAGMENTS:
+        builder._nav_fragments.clear()
+    return builder
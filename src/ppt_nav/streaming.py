@@ -0,0 +1,379 @@
+from __future__ import annotations
+
+"""Streaming PPTX writer that bypasses the python-pptx object model.
+
+:class:`PresentationBuilder.build` loads the whole template into python-pptx
+and keeps every generated slide in memory until ``prs.save``. The writer here
+copies the template package entry by entry, still compressed, and serialises
+each slide into the output zip as soon as it is drawn, so peak memory does not
+grow with the number of slides. Slides are drawn by the same builder code on detached
+slide elements, so their XML matches what the python-pptx engine writes.
+
+Because each slide is drawn on its own detached element, slides can also be
+drawn in worker processes. The main process then writes their XML in plan
+order.
+
+What the writer needs from the template (slide size, the layout for new
+slides, a blank slide on it) is compiled once per template and cached on disk;
+see :mod:`ppt_nav.template_cache`.
+"""
+
+import math
+import posixpath
+import re
+import zipfile
+from collections import deque
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO, Deque, Dict, Iterator, List, Optional, Tuple, Union
+
+from pptx.opc.constants import CONTENT_TYPE as CT
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.opc.oxml import CT_Relationships, CT_Types, serialize_part_xml
+from pptx.oxml import parse_xml
+from pptx.oxml.ns import qn
+from pptx.oxml.slide import CT_Slide
+from pptx.oxml.xmlchemy import BaseOxmlElement
+from pptx.slide import Slide, SlideLayout
+
+from ppt_nav.metrics import BuildMetrics, timed
+from ppt_nav.outline import Outline, SlidePlan
+from ppt_nav.package_writer import PartWriter, RawZipSource
+from ppt_nav.ppt_builder import PresentationBuilder
+from ppt_nav.template_cache import CompiledTemplate, Rel, load_compiled_template
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+_CONTENT_TYPES = "[Content_Types].xml"
+_LAYOUT_INDEX = 6
+_SLIDE_MEMBERNAME = re.compile(r"ppt/slides/slide(\d+)\.xml")
+
+# Starting a worker process costs about as much as drawing this many slides,
+# so smaller decks use fewer workers or none.
+_MIN_SLIDES_PER_WORKER = 50
+
+
+class StreamingPresentationWriter:
+    """Writes a deck by streaming slide XML straight into the output zip.
+
+    With ``max_workers`` above 1, slides are drawn and serialised in up to
+    that many worker processes, each taking a contiguous chunk of the slide
+    plan at a time. The deck is identical to one drawn in this process.
+
+    ``template_cache_dir`` is where compiled templates are kept; it defaults
+    to the user cache directory.
+    """
+
+    def __init__(
+        self,
+        builder: PresentationBuilder,
+        max_workers: Optional[int] = None,
+        template_cache_dir: Optional[Path] = None,
+    ) -> None:
+        if builder.shared_layouts:
+            raise ValueError("Shared layouts are only supported by the pptx engine.")
+        if max_workers is not None and max_workers < 1:
+            raise ValueError("max_workers must be at least 1.")
+        self.builder = builder
+        self.max_workers = max_workers or 1
+        self.template_cache_dir = template_cache_dir
+
+    def write(
+        self,
+        outline: Outline,
+        output_path: Union[Path, BinaryIO],
+        template_path: Union[Path, BinaryIO],
+    ) -> None:
+        metrics = self.builder.metrics
+        with RawZipSource(template_path) as source:
+            with timed(metrics, "load_template"):
+                compiled = load_compiled_template(
+                    source.digest(), lambda: compile_template(source.zip), self.template_cache_dir
+                )
+                package = _TemplatePackage(source.zip, compiled)
+            plan = outline.slide_plan
+            with timed(metrics, "allocate"):
+                slide_partnames = package.append_slides(len(plan))
+            with timed(metrics, "measure"):
+                self.builder._begin_build(outline, package.slide_width, package.slide_height)
+
+            with zipfile.ZipFile(output_path, "w", zipfile.ZIP_DEFLATED) as zip_file:
+                with PartWriter(zip_file, self.builder.zip_options) as output:
+                    with timed(metrics, "save"):
+                        output.write(_CONTENT_TYPES, package.content_types_xml())
+                        for name in source.infos:
+                            if name == _CONTENT_TYPES:
+                                continue
+                            modified = package.modified_entry(name)
+                            if modified is None:
+                                # Untouched template parts keep their compressed bytes.
+                                output.copy(source, name)
+                            else:
+                                output.write(name, modified)
+
+                    slide_rels = package.slide_rels_xml()
+                    workers = min(self.max_workers, len(plan) // _MIN_SLIDES_PER_WORKER)
+                    if workers > 1:
+                        drawn = _draw_in_workers(
+                            self.builder, outline, compiled.slide_skeleton, len(plan), workers
+                        )
+                        for partname, slide_xml in zip(slide_partnames, drawn):
+                            with timed(metrics, "save"):
+                                output.write(partname, slide_xml)
+                                output.write(_rels_membername(partname), slide_rels)
+                    else:
+                        for index, partname in enumerate(slide_partnames):
+                            slide = Slide(parse_xml(compiled.slide_skeleton), None)
+                            self.builder._fill_slide(slide, plan, index)
+                            with timed(metrics, "save"):
+                                output.write(partname, serialize_part_xml(slide._element))
+                                output.write(_rels_membername(partname), slide_rels)
+                    with timed(metrics, "save"):
+                        # Slides still being compressed on other threads.
+                        output.close()
+        if metrics is not None:
+            metrics.record_output(output_path, slide_partnames)
+
+
+def compile_template(template: zipfile.ZipFile) -> CompiledTemplate:
+    """Read what :class:`StreamingPresentationWriter` needs from a template package."""
+
+    package_rels = _read_rels(template, "")
+    presentation = _target_of(package_rels, RT.OFFICE_DOCUMENT, "")
+    presentation_xml = parse_xml(template.read(presentation))
+    presentation_rels = _read_rels(template, presentation)
+
+    sld_sz = presentation_xml.sldSz
+    if sld_sz is None:
+        raise ValueError("Presentation slide dimensions are not set.")
+
+    # Same layout python-pptx returns for prs.slide_layouts[6]: the
+    # seventh layout of the first slide master.
+    master_id = presentation_xml.sldMasterIdLst.sldMasterId_lst[0]
+    master = _resolve(presentation, _rel_target(presentation_rels, master_id.rId))
+    master_xml = parse_xml(template.read(master))
+    layout_ids = master_xml.find(qn("p:sldLayoutIdLst"))
+    if layout_ids is None or len(layout_ids) <= _LAYOUT_INDEX:
+        raise ValueError(f"Template slide master has no layout {_LAYOUT_INDEX + 1}.")
+    layout_rid = layout_ids[_LAYOUT_INDEX].get(qn("r:id"))
+    layout_partname = _resolve(master, _rel_target(_read_rels(template, master), layout_rid))
+
+    slide = Slide(CT_Slide.new(), None)
+    slide.shapes.clone_layout_placeholders(
+        SlideLayout(parse_xml(template.read(layout_partname)), None)
+    )
+
+    content_types = parse_xml(template.read(_CONTENT_TYPES))
+    return CompiledTemplate(
+        slide_width=int(sld_sz.cx),
+        slide_height=int(sld_sz.cy),
+        presentation=presentation,
+        presentation_rels=tuple(presentation_rels),
+        layout_partname=layout_partname,
+        content_type_defaults={
+            element.get("Extension"): element.get("ContentType")
+            for element in content_types.findall(qn("ct:Default"))
+        },
+        content_type_overrides={
+            element.get("PartName"): element.get("ContentType")
+            for element in content_types.findall(qn("ct:Override"))
+        },
+        slide_skeleton=serialize_part_xml(slide._element),
+    )
+
+
+class _TemplatePackage:
+    """The parts of a template package that appending slides touches."""
+
+    def __init__(self, template: zipfile.ZipFile, compiled: CompiledTemplate) -> None:
+        self._zip = template
+        self._compiled = compiled
+        self._modified: Dict[str, bytes] = {}
+        self.presentation = compiled.presentation
+        self.slide_width = compiled.slide_width
+        self.slide_height = compiled.slide_height
+        self.layout_partname = compiled.layout_partname
+        self._new_slides: List[str] = []
+
+    def modified_entry(self, membername: str) -> Optional[bytes]:
+        return self._modified.get(membername)
+
+    def append_slides(self, count: int) -> List[str]:
+        """Register ``count`` new slides and return their zip member names.
+
+        Partnames, rIds and slide ids follow python-pptx's numbering, and the
+        presentation part and its relationships are updated to match.
+        """
+
+        presentation_xml = parse_xml(self._zip.read(self.presentation))
+        sld_id_lst = presentation_xml.get_or_add_sldIdLst()
+        used_ids = [int(slide_id) for slide_id in sld_id_lst.xpath("./p:sldId/@id")]
+        next_slide_id = max([255] + used_ids) + 1
+        # Like PresentationBuilder._add_slides: number after the slide count,
+        # and past any higher-numbered slide part left by deleted slides.
+        existing_numbers = [
+            int(match.group(1))
+            for match in map(_SLIDE_MEMBERNAME.fullmatch, self._zip.namelist())
+            if match is not None
+        ]
+        first_number = max([len(sld_id_lst)] + existing_numbers) + 1
+        rels = list(self._compiled.presentation_rels)
+        used_rids = {rel[0] for rel in rels}
+        base = posixpath.dirname(self.presentation)
+
+        for offset in range(count):
+            partname = f"ppt/slides/slide{first_number + offset}.xml"
+            r_id = _next_rid(used_rids)
+            used_rids.add(r_id)
+            rels.append((r_id, RT.SLIDE, posixpath.relpath(partname, base), False))
+            sld_id_lst._add_sldId(id=next_slide_id + offset, rId=r_id)
+            self._new_slides.append(partname)
+
+        self._modified[self.presentation] = serialize_part_xml(presentation_xml)
+        self._modified[_rels_membername(self.presentation)] = _rels_xml(rels)
+        return list(self._new_slides)
+
+    def slide_rels_xml(self) -> bytes:
+        target = posixpath.relpath(self.layout_partname, "ppt/slides")
+        return _rels_xml([("rId1", RT.SLIDE_LAYOUT, target, False)])
+
+    def content_types_xml(self) -> bytes:
+        defaults = self._compiled.content_type_defaults
+        overrides = dict(self._compiled.content_type_overrides)
+        for partname in self._new_slides:
+            overrides[f"/{partname}"] = CT.PML_SLIDE
+
+        types = CT_Types.new()
+        for ext, content_type in sorted(defaults.items()):
+            types.add_default(ext, content_type)
+        for partname, content_type in sorted(overrides.items()):
+            types.add_override(partname, content_type)
+        return serialize_part_xml(types)
+
+
+def _draw_in_workers(
+    builder: PresentationBuilder,
+    outline: Outline,
+    slide_skeleton: bytes,
+    count: int,
+    workers: int,
+) -> Iterator[bytes]:
+    """Yield the XML of slides ``0..count-1`` in order, drawn by worker processes.
+
+    Only a few chunks per worker are in flight at once, so finished slides
+    never pile up faster than the zip can take them.
+    """
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    chunk = max(math.ceil(count / (workers * 4)), 1)
+    chunks = iter(range(0, count, chunk))
+    metrics = builder.metrics
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_slide_worker,
+        initargs=(builder, outline, slide_skeleton, metrics is not None),
+    ) as executor:
+        pending: Deque[Future] = deque()
+
+        def submit_next() -> None:
+            start = next(chunks, None)
+            if start is not None:
+                pending.append(executor.submit(_draw_slide_chunk, start, start + chunk))
+
+        for _ in range(workers * 2):
+            submit_next()
+        while pending:
+            slides, chunk_metrics = pending.popleft().result()
+            submit_next()
+            if metrics is not None and chunk_metrics is not None:
+                metrics.merge(chunk_metrics)
+            yield from slides
+
+
+# What a slide worker process draws with: the builder, the slide plan and the
+# blank slide XML, set up once per process.
+_worker_state: Optional[Tuple[PresentationBuilder, SlidePlan, bytes]] = None
+_worker_collects_metrics = False
+
+
+def _init_slide_worker(
+    builder: PresentationBuilder, outline: Outline, slide_skeleton: bytes, collect_metrics: bool
+) -> None:
+    global _worker_state, _worker_collects_metrics
+    _worker_state = (builder, outline.slide_plan, slide_skeleton)
+    _worker_collects_metrics = collect_metrics
+
+
+def _draw_slide_chunk(start: int, stop: int) -> Tuple[List[bytes], Optional[BuildMetrics]]:
+    if _worker_state is None:
+        raise RuntimeError("Slide worker was not initialised.")
+    builder, plan, slide_skeleton = _worker_state
+    builder.metrics = BuildMetrics() if _worker_collects_metrics else None
+    slides = []
+    for index in range(start, min(stop, len(plan))):
+        slide = Slide(parse_xml(slide_skeleton), None)
+        builder._fill_slide(slide, plan, index)
+        slides.append(serialize_part_xml(slide._element))
+    return slides, builder.metrics
+
+
+def _read_rels(template: zipfile.ZipFile, partname: str) -> List[Rel]:
+    membername = _rels_membername(partname)
+    if membername not in template.NameToInfo:
+        return []
+    rels_xml: BaseOxmlElement = parse_xml(template.read(membername))
+    return [
+        (
+            rel.get("Id"),
+            rel.get("Type"),
+            rel.get("Target"),
+            rel.get("TargetMode") == "External",
+        )
+        for rel in rels_xml.findall(qn("pr:Relationship"))
+    ]
+
+
+def _rels_membername(partname: str) -> str:
+    directory, name = posixpath.split(partname)
+    return posixpath.join(directory, "_rels", f"{name}.rels")
+
+
+def _resolve(source_partname: str, target: str) -> str:
+    if target.startswith("/"):
+        return target[1:]
+    return posixpath.normpath(posixpath.join(posixpath.dirname(source_partname), target))
+
+
+def _rel_target(rels: List[Rel], r_id: str) -> str:
+    for rel_id, _, target, _ in rels:
+        if rel_id == r_id:
+            return target
+    raise ValueError(f"Relationship {r_id} not found in template.")
+
+
+def _target_of(rels: List[Rel], reltype: str, source_partname: str) -> str:
+    for _, rel_type, target, is_external in rels:
+        if rel_type == reltype and not is_external:
+            return _resolve(source_partname, target)
+    raise ValueError("Template package has no presentation part.")
+
+
+def _next_rid(used: set) -> str:
+    # Mirrors python-pptx: first free "rIdN" counting down from len + 1.
+    for number in range(len(used) + 1, 0, -1):
+        candidate = f"rId{number}"
+        if candidate not in used:
+            return candidate
+    raise ValueError("No free relationship id.")
+
+
+def _rels_xml(rels: List[Rel]) -> bytes:
+    def numeric_order(rel: Rel) -> Tuple[int, str]:
+        r_id = rel[0]
+        return (int(r_id[3:]) if r_id.startswith("rId") and r_id[3:].isdigit() else 0, r_id)
+
+    rels_xml = CT_Relationships.new()
+    for r_id, reltype, target, is_external in sorted(rels, key=numeric_order):
+        rels_xml.add_rel(r_id, reltype, target, is_external)
+    return rels_xml.xml_file_bytes
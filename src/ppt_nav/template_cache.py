@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+"""On-disk cache of the template facts the streaming engine needs.
+
+Before writing any slide, :class:`ppt_nav.streaming.StreamingPresentationWriter`
+has to parse the template's package relationships, presentation part, slide
+master and content types, only to learn the slide size, which layout new
+slides use and how to register them. Corporate templates with many layouts
+make that a large share of a short build. A :class:`CompiledTemplate` holds
+those answers, plus a serialised blank slide with the layout's placeholders
+already cloned. It is stored under ``templates/`` in the user cache directory,
+keyed on the template's content hash, so editing the template invalidates it
+automatically.
+"""
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+from pptx import __version__ as _PPTX_VERSION
+
+from ppt_nav.paths import default_cache_dir
+
+# Bump when the entry format or what is compiled changes.
+_CACHE_VERSION = 1
+
+# (rId, reltype, target, is_external) as stored in a .rels part.
+Rel = Tuple[str, str, str, bool]
+
+
+@dataclass(frozen=True)
+class CompiledTemplate:
+    """Slide size, partnames and skeleton parts read once from a template package."""
+
+    slide_width: int
+    slide_height: int
+    presentation: str
+    presentation_rels: Tuple[Rel, ...]
+    layout_partname: str
+    content_type_defaults: Dict[str, str]
+    content_type_overrides: Dict[str, str]
+    # p:sld XML of a blank slide on the layout, placeholders included.
+    slide_skeleton: bytes
+
+    def to_bytes(self) -> bytes:
+        payload = {
+            "version": _CACHE_VERSION,
+            "slide_width": self.slide_width,
+            "slide_height": self.slide_height,
+            "presentation": self.presentation,
+            "presentation_rels": [list(rel) for rel in self.presentation_rels],
+            "layout_partname": self.layout_partname,
+            "content_type_defaults": self.content_type_defaults,
+            "content_type_overrides": self.content_type_overrides,
+            "slide_skeleton": self.slide_skeleton.decode("utf-8"),
+        }
+        return json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "CompiledTemplate":
+        payload = json.loads(data)
+        if not isinstance(payload, dict) or payload.get("version") != _CACHE_VERSION:
+            raise ValueError("Not a ppt-nav compiled template.")
+        return cls(
+            slide_width=payload["slide_width"],
+            slide_height=payload["slide_height"],
+            presentation=payload["presentation"],
+            presentation_rels=tuple(
+                (r_id, reltype, target, bool(is_external))
+                for r_id, reltype, target, is_external in payload["presentation_rels"]
+            ),
+            layout_partname=payload["layout_partname"],
+            content_type_defaults=payload["content_type_defaults"],
+            content_type_overrides=payload["content_type_overrides"],
+            slide_skeleton=payload["slide_skeleton"].encode("utf-8"),
+        )
+
+
+def load_compiled_template(
+    digest: str,
+    compile_template: Callable[[], CompiledTemplate],
+    cache_dir: Optional[Path] = None,
+) -> CompiledTemplate:
+    """The compiled form of the template whose content hash is ``digest``.
+
+    ``compile_template`` parses the template and only runs on a cache miss.
+    The entry is also keyed on the python-pptx version, whose serialiser
+    produced the skeleton slide.
+    """
+
+    key = f"{_CACHE_VERSION}|{_PPTX_VERSION}|{digest}"
+    cache_path = (
+        (cache_dir or default_cache_dir())
+        / "templates"
+        / f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}.json"
+    )
+
+    try:
+        return CompiledTemplate.from_bytes(cache_path.read_bytes())
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    compiled = compile_template()
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+        temp_path.write_bytes(compiled.to_bytes())
+        os.replace(temp_path, cache_path)
+    except OSError:
+        # An unwritable cache only costs a re-parse next time.
+        pass
+    return compiled
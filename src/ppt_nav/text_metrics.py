@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+"""Text width estimation used to size navigation chips and labels."""
+
+import hashlib
+import unicodedata
+from array import array
+from collections import OrderedDict
+from typing import Iterable, NamedTuple, Optional, Tuple
+
+from ppt_nav.outline import Outline
+
+EMU_PER_POINT = 12700
+
+# Fonts the builder asks PowerPoint for: Latin and East Asian.
+DEFAULT_LATIN_FONT = "Times New Roman"
+DEFAULT_EAST_ASIAN_FONT = "標楷體"
+
+# Width of each character class in ems.
+_SPACE, _CJK, _NARROW, _WIDE, _UPPER, _LOWER, _DIGIT, _OTHER = range(8)
+_CLASS_WIDTHS = (0.32, 1.0, 0.3, 0.8, 0.65, 0.5, 0.55, 0.5)
+_NARROW_CHARS = "ilI.,:;'`!|"
+_WIDE_CHARS = "MW@#%&"
+
+# Em width of every BMP codepoint, built on first use.
+_bmp_widths: Optional[Tuple[float, ...]] = None
+
+
+def _classify(ch: str) -> int:
+    # Estimate width by character category to reduce over/under-estimation
+    # for mixed-case English, digits, spaces, and CJK text.
+    if ch.isspace():
+        return _SPACE
+    if unicodedata.east_asian_width(ch) in {"W", "F"}:
+        return _CJK
+    if ch in _NARROW_CHARS:
+        return _NARROW
+    if ch in _WIDE_CHARS:
+        return _WIDE
+    if ch.isupper():
+        return _UPPER
+    if ch.islower():
+        return _LOWER
+    if ch.isdigit():
+        return _DIGIT
+    return _OTHER
+
+
+def _codepoint_widths() -> Tuple[float, ...]:
+    global _bmp_widths
+    if _bmp_widths is None:
+        _bmp_widths = tuple(_CLASS_WIDTHS[_classify(chr(cp))] for cp in range(0x10000))
+    return _bmp_widths
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class TextWidthEstimator:
+    """Estimates rendered text width from per-character class widths.
+
+    Per-codepoint widths come from a table covering the Basic Multilingual
+    Plane, and results are memoised per ``(text, font size)`` in a bounded
+    LRU cache whose hit/miss counters are available from :meth:`cache_info`.
+    Each text's width in ems, which does not depend on the font size, is
+    memoised separately, so measuring a title at another size is a
+    multiplication.
+    """
+
+    def __init__(self, cache_size: int = 4096) -> None:
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Tuple[str, float], int]" = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._fingerprint: Optional[str] = None
+        self._em_widths: "OrderedDict[str, float]" = OrderedDict()
+
+    def width_emu(self, text: str, font_size_pt: float) -> int:
+        key = (text, font_size_pt)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._hits += 1
+            self._cache.move_to_end(key)
+            return cached
+
+        self._misses += 1
+        width = self._measure(text, font_size_pt)
+        self._cache[key] = width
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return width
+
+    def measure_all(self, texts: Iterable[str], font_size_pt: float) -> None:
+        """Warm the cache for ``texts`` at ``font_size_pt``."""
+
+        for text in texts:
+            self.width_emu(text, font_size_pt)
+
+    def measure_em_widths(self, outline: Outline) -> None:
+        """Memoise the em width of every title in ``outline``.
+
+        Done once before an outline is built at several font sizes, possibly
+        in other processes that receive a copy of this estimator.
+        """
+
+        for section in outline.sections:
+            self._cached_em_width(section.title)
+            for child in section.children:
+                self._cached_em_width(child.title)
+
+    def measure_outline(
+        self,
+        outline: Outline,
+        section_font_size_pt: float,
+        child_font_size_pt: float,
+    ) -> None:
+        """Measure every title in ``outline`` up front.
+
+        Section titles are measured at the main-row size and sub-item titles
+        at the sub-row size, matching how the builder looks them up.
+        """
+
+        self.measure_all((section.title for section in outline.sections), section_font_size_pt)
+        self.measure_all(
+            (child.title for section in outline.sections for child in section.children),
+            child_font_size_pt,
+        )
+
+    def cache_info(self) -> CacheInfo:
+        return CacheInfo(self._hits, self._misses, self.cache_size, len(self._cache))
+
+    def clear_cache(self) -> None:
+        self._cache.clear()
+        self._em_widths.clear()
+        self._hits = self._misses = 0
+
+    def fingerprint(self) -> str:
+        """Identify how this estimator measures text, e.g. to key cached builds.
+
+        The built-in table only changes with ppt-nav itself; estimators with a
+        table of their own are identified by a digest of it. Subclasses that
+        measure text some other way should override this.
+        """
+
+        name = f"{type(self).__module__}.{type(self).__qualname__}"
+        if type(self)._codepoint_widths is TextWidthEstimator._codepoint_widths:
+            return name
+        if self._fingerprint is None:
+            table = array("d", self._codepoint_widths()).tobytes()
+            self._fingerprint = f"{name}:{hashlib.sha256(table).hexdigest()}"
+        return self._fingerprint
+
+    def em_width(self, text: str) -> float:
+        """Width of ``text`` in ems, without caching."""
+
+        stripped = text.strip() or " "
+        # Accumulate left to right (not via sum(), whose rounding differs
+        # between Python versions) so widths are reproducible to the EMU.
+        em_width = 0.0
+        if max(stripped) <= "\uffff":
+            table = self._codepoint_widths()
+            for ch in stripped:
+                em_width += table[ord(ch)]
+        else:
+            for ch in stripped:
+                em_width += _CLASS_WIDTHS[_classify(ch)]
+        return em_width
+
+    def _codepoint_widths(self) -> Tuple[float, ...]:
+        # Hook for estimators that derive per-codepoint widths elsewhere.
+        return _codepoint_widths()
+
+    def _cached_em_width(self, text: str) -> float:
+        em_width = self._em_widths.get(text)
+        if em_width is not None:
+            self._em_widths.move_to_end(text)
+            return em_width
+        em_width = self.em_width(text)
+        self._em_widths[text] = em_width
+        if len(self._em_widths) > self.cache_size:
+            self._em_widths.popitem(last=False)
+        return em_width
+
+    def _measure(self, text: str, font_size_pt: float) -> int:
+        width_pt = max(self._cached_em_width(text) * font_size_pt, font_size_pt * 1.2)
+        return int(width_pt * EMU_PER_POINT)
@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+"""Refresh the navigation of an existing deck without touching slide content.
+
+Generated slides carry their plan entry in the slide name and every
+navigation shape is named after the row it belongs to (see
+:data:`ppt_nav.ppt_builder.MARKER_PREFIX`). :func:`update_presentation` uses
+those markers to pair the deck's slides with the outline's plan entries,
+redraws only navigation rows whose marker no longer matches, and adds slides
+for new entries. Body content, slides added by hand and slides whose entry
+left the outline are kept as they are.
+"""
+
+import io
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from pptx import Presentation as PresentationFactory
+from pptx.oxml.ns import qn
+from pptx.oxml.xmlchemy import BaseOxmlElement
+from pptx.slide import Slide
+
+from ppt_nav.outline import Outline, SlidePlan
+from ppt_nav.package_writer import RawZipSource, save_presentation
+from ppt_nav.paths import atomic_output
+from ppt_nav.ppt_builder import MARKER_PREFIX, PresentationBuilder
+
+
+@dataclass(frozen=True)
+class UpdateResult:
+    """What :func:`update_presentation` changed in a deck."""
+
+    output_path: Path
+    slides_updated: int
+    slides_added: int
+    slides_unchanged: int
+    # 1-based positions of generated slides that no outline entry matched.
+    orphaned_slides: Tuple[int, ...] = ()
+
+
+def update_presentation(
+    builder: PresentationBuilder,
+    outline: Outline,
+    deck_path: Path,
+    output_path: Optional[Path] = None,
+) -> UpdateResult:
+    """Bring the navigation of ``deck_path`` in line with ``outline``.
+
+    Slides are matched to plan entries by their titles. A slide whose section
+    or subsection title alone changed is matched as a rename and keeps its
+    content. The result is written atomically to ``output_path``, which
+    defaults to ``deck_path`` itself.
+    """
+
+    destination = output_path or deck_path
+    # Work from an in-memory copy so the deck can be replaced in place.
+    data = deck_path.read_bytes()
+    with RawZipSource(io.BytesIO(data)) as source:
+        prs = PresentationFactory(io.BytesIO(data))
+        slide_width = prs.slide_width
+        slide_height = prs.slide_height
+        if slide_width is None or slide_height is None:
+            raise ValueError("Presentation slide dimensions are not set.")
+        builder._begin_build(outline, int(slide_width), int(slide_height))
+
+        # Walk the slide list directly: prs.slides would renumber slide parts,
+        # and untouched slides are copied from the source under their names.
+        pres_part = prs.part
+        sld_id_lst = pres_part._element.get_or_add_sldIdLst()
+        generated: List[Tuple[BaseOxmlElement, Slide]] = []
+        for sld_id in sld_id_lst:
+            slide = pres_part.related_slide(sld_id.rId)
+            if (slide._element.cSld.name or "").startswith(MARKER_PREFIX):
+                generated.append((sld_id, slide))
+                # The main row of such slides lives on a generated layout,
+                # which this refresh does not rewrite.
+                if slide.slide_layout.name.startswith(MARKER_PREFIX):
+                    raise ValueError(
+                        f"{deck_path} was built with shared layouts; build it again instead."
+                    )
+        if not generated:
+            raise ValueError(
+                f"{deck_path} has no slides generated by ppt-nav; build it again instead."
+            )
+
+        plan = outline.slide_plan
+        matches = _match_slides(
+            [builder._slide_marker(plan_entry) for plan_entry in plan],
+            [slide._element.cSld.name for _, slide in generated],
+        )
+
+        style_key = builder._nav_style_key()
+        modified: Set[str] = set()
+        unchanged = 0
+        for index, match in enumerate(matches):
+            if match is None:
+                continue
+            _, slide = generated[match]
+            if _refresh_slide(builder, slide, plan, index, style_key):
+                modified.add(slide.part.partname)
+            else:
+                unchanged += 1
+
+        added = _add_missing_slides(prs, builder, plan, matches, generated)
+        if added:
+            modified.add(pres_part.partname)
+
+        if modified or destination != deck_path:
+            with atomic_output(destination) as temp_path:
+                save_presentation(prs, temp_path, source, modified, builder.zip_options)
+
+        claimed = {match for match in matches if match is not None}
+        orphans = {sld_id for index, (sld_id, _) in enumerate(generated) if index not in claimed}
+        orphaned_slides = tuple(
+            position for position, sld_id in enumerate(sld_id_lst, start=1) if sld_id in orphans
+        )
+
+    return UpdateResult(
+        output_path=destination,
+        slides_updated=len(modified - {pres_part.partname}),
+        slides_added=added,
+        slides_unchanged=unchanged,
+        orphaned_slides=orphaned_slides,
+    )
+
+
+def _match_slides(entry_markers: List[str], slide_markers: List[str]) -> List[Optional[int]]:
+    """Pair each plan entry with the index of a generated slide, if any.
+
+    Markers read ``ppt-nav:<section digest>:<child digest>``. Exact matches
+    are taken first, then slides sharing only the subsection title (section
+    renamed), then slides sharing only the section title (subsection
+    renamed). Within each pass slides are claimed in deck order.
+    """
+
+    def exact(marker: str) -> str:
+        return marker
+
+    def child_only(marker: str) -> str:
+        return marker.rsplit(":", 1)[1]
+
+    def section_only(marker: str) -> str:
+        return marker[len(MARKER_PREFIX) :].split(":", 1)[0]
+
+    matches: List[Optional[int]] = [None] * len(entry_markers)
+    claimed: Set[int] = set()
+    passes: Tuple[Callable[[str], str], ...] = (exact, child_only, section_only)
+    for key in passes:
+        pool: Dict[str, List[int]] = {}
+        for index, marker in enumerate(slide_markers):
+            if index not in claimed and key(marker):
+                pool.setdefault(key(marker), []).append(index)
+        for position, marker in enumerate(entry_markers):
+            candidates = pool.get(key(marker))
+            if matches[position] is None and candidates:
+                index = candidates.pop(0)
+                matches[position] = index
+                claimed.add(index)
+    return matches
+
+
+def _refresh_slide(
+    builder: PresentationBuilder,
+    slide: Slide,
+    plan: SlidePlan,
+    index: int,
+    style_key: object,
+) -> bool:
+    """Redraw navigation rows on ``slide`` whose marker changed; report changes."""
+
+    changed = False
+    slide_marker = builder._slide_marker(plan[index])
+    if slide._element.cSld.name != slide_marker:
+        slide._element.cSld.name = slide_marker
+        changed = True
+
+    sp_tree = slide.shapes._spTree
+    drawn: Dict[str, List[BaseOxmlElement]] = {}
+    for element in sp_tree.iterchildren():
+        name = _shape_name(element)
+        if name.startswith(MARKER_PREFIX):
+            kind = name[len(MARKER_PREFIX) :].split(":", 1)[0]
+            drawn.setdefault(kind, []).append(element)
+
+    top = int(builder.nav_top_margin)
+    for row in builder._navigation_rows(plan, index):
+        row_marker = builder._row_marker(row, top, style_key)
+        existing = drawn.pop(row.key[0], [])
+        if existing and all(_shape_name(e).rsplit(" ", 1)[0] == row_marker for e in existing):
+            top += row.height
+            continue
+        top, elements = builder._draw_nav_row(slide, row, top, style_key)
+        if existing:
+            # Keep the row where it was in the z-order.
+            for element in elements:
+                existing[0].addprevious(element)
+        for element in existing:
+            sp_tree.remove(element)
+        changed = True
+
+    for stale in drawn.values():
+        for element in stale:
+            sp_tree.remove(element)
+        changed = True
+    return changed
+
+
+def _add_missing_slides(
+    prs,
+    builder: PresentationBuilder,
+    plan: SlidePlan,
+    matches: List[Optional[int]],
+    generated: List[Tuple[BaseOxmlElement, Slide]],
+) -> int:
+    """Build slides for unmatched entries, each placed after its predecessor."""
+
+    missing = matches.count(None)
+    if not missing:
+        return 0
+
+    sld_id_lst = prs.part._element.get_or_add_sldIdLst()
+    slides = builder._add_slides(prs, prs.slide_layouts[6], missing)
+    new_ids = iter(list(sld_id_lst)[-missing:])
+    new_slides = iter(slides)
+    previous: Optional[BaseOxmlElement] = None
+    for index, match in enumerate(matches):
+        if match is not None:
+            previous = generated[match][0]
+            continue
+        sld_id = next(new_ids)
+        builder._fill_slide(next(new_slides), plan, index)
+        if previous is not None:
+            previous.addnext(sld_id)
+        else:
+            generated[0][0].addprevious(sld_id)
+        previous = sld_id
+    return missing
+
+
+def _shape_name(element: BaseOxmlElement) -> str:
+    # Only top-level shapes are considered; nav rows are never grouped.
+    c_nv_pr = element.find(f"./*/{qn('p:cNvPr')}")
+    return c_nv_pr.get("name", "") if c_nv_pr is not None else ""
@@ -0,0 +1,272 @@
+from __future__ import annotations
+
+"""Incremental rebuilds for ``ppt-nav --watch``.
+
+A :class:`WatchSession` keeps the template, the python-pptx presentation and
+the shapes drawn on every slide in memory. When the outline changes it
+compares each slide's navigation rows with what the slide already shows and
+redraws only the rows that differ, so renaming one child touches the sub rows
+of its section and nothing else. The deck is then saved atomically.
+"""
+
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Hashable, List, Optional, Tuple
+
+from pptx import Presentation as PresentationFactory
+from pptx.oxml.ns import qn
+from pptx.oxml.xmlchemy import BaseOxmlElement
+from pptx.slide import Slide
+
+from ppt_nav.outline import Outline, SlidePlan
+from ppt_nav.package_writer import RawZipSource, save_presentation
+from ppt_nav.paths import atomic_output
+from ppt_nav.ppt_builder import PresentationBuilder
+
+
+@dataclass(frozen=True)
+class WatchUpdate:
+    """Outcome of one (re)build in a watch session."""
+
+    output_path: Path
+    slide_count: int
+    slides_changed: int
+    rows_redrawn: int
+    seconds: float
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class _DrawnRow:
+    # What the row shows (row key, top edge, active label) and the shapes
+    # drawing it on the slide.
+    signature: Hashable
+    elements: List[BaseOxmlElement]
+    bottom: int
+
+
+@dataclass
+class _SlideState:
+    slide: Slide
+    rows: List[_DrawnRow] = field(default_factory=list)
+    body: Optional[_DrawnRow] = None
+
+
+class WatchSession:
+    """Holds a built deck in memory and rebuilds it incrementally."""
+
+    def __init__(
+        self,
+        builder: PresentationBuilder,
+        template_path: Path,
+        output_path: Path,
+    ) -> None:
+        if builder.shared_layouts:
+            raise ValueError("Watch mode does not support shared layouts.")
+        self.builder = builder
+        self.output_path = output_path
+        self._template = RawZipSource(template_path)
+        self._prs = PresentationFactory(str(template_path))
+        slide_width = self._prs.slide_width
+        slide_height = self._prs.slide_height
+        if slide_width is None or slide_height is None:
+            raise ValueError("Presentation slide dimensions are not set.")
+        self._slide_size = (int(slide_width), int(slide_height))
+        self._layout = self._prs.slide_layouts[6]
+        self._slides: List[_SlideState] = []
+        self._saved = False
+
+    def update(self, outline: Outline) -> WatchUpdate:
+        """Bring the deck in line with ``outline`` and save it."""
+
+        start = time.perf_counter()
+        builder = self.builder
+        builder._begin_build(outline, *self._slide_size)
+        plan = outline.slide_plan
+        resized = len(plan) != len(self._slides)
+        self._resize(len(plan))
+
+        style_key = builder._nav_style_key()
+        slides_changed = 0
+        rows_redrawn = 0
+        for index, state in enumerate(self._slides):
+            redrawn = self._sync_slide(state, plan, index, style_key)
+            if redrawn:
+                slides_changed += 1
+                rows_redrawn += redrawn
+
+        if slides_changed or resized or not self._saved:
+            with atomic_output(self.output_path) as temp_path:
+                save_presentation(
+                    self._prs,
+                    temp_path,
+                    self._template,
+                    {self._prs.part.partname},
+                    self.builder.zip_options,
+                )
+            self._saved = True
+        return WatchUpdate(
+            output_path=self.output_path,
+            slide_count=len(plan),
+            slides_changed=slides_changed,
+            rows_redrawn=rows_redrawn,
+            seconds=time.perf_counter() - start,
+        )
+
+    def close(self) -> None:
+        self._template.close()
+
+    def __enter__(self) -> "WatchSession":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def _resize(self, count: int) -> None:
+        # Slides are matched to plan entries by position, so growing or
+        # shrinking the outline only adds or drops slides at the end.
+        if count > len(self._slides):
+            added = self.builder._add_slides(self._prs, self._layout, count - len(self._slides))
+            self._slides.extend(_SlideState(slide) for slide in added)
+        while len(self._slides) > count:
+            self._slides.pop()
+            pres_part = self._prs.part
+            sld_id_lst = pres_part._element.get_or_add_sldIdLst()
+            sld_id = sld_id_lst[-1]
+            sld_id_lst.remove(sld_id)
+            pres_part.drop_rel(sld_id.rId)
+
+    def _sync_slide(
+        self,
+        state: _SlideState,
+        plan: SlidePlan,
+        index: int,
+        style_key: Hashable,
+    ) -> int:
+        """Redraw the rows of ``state`` that no longer match; return how many."""
+
+        builder = self.builder
+        slide = state.slide
+        plan_entry = plan[index]
+        slide._element.cSld.name = builder._slide_marker(plan_entry)
+        redrawn = 0
+        top = int(builder.nav_top_margin)
+        rows = builder._navigation_rows(plan, index)
+        kept: List[_DrawnRow] = []
+        for position, row in enumerate(rows):
+            signature = (row.key, top, row.active_title, style_key)
+            previous = state.rows[position] if position < len(state.rows) else None
+            if previous is not None and previous.signature == signature:
+                kept.append(previous)
+                top = previous.bottom
+                continue
+            if previous is not None:
+                _remove(slide, previous.elements)
+            top, elements = builder._draw_nav_row(slide, row, top, style_key)
+            kept.append(_DrawnRow(signature, elements, top))
+            redrawn += 1
+        for stale in state.rows[len(rows) :]:
+            _remove(slide, stale.elements)
+            redrawn += 1
+        state.rows = kept
+
+        # The body placeholder only moves when the navigation height changes.
+        if state.body is None or state.body.signature != top:
+            if state.body is not None:
+                _remove(slide, state.body.elements)
+            nav_bottom = top
+            elements = _capture(
+                slide, lambda: builder._add_body_placeholder(slide, plan_entry, nav_bottom)
+            )
+            state.body = _DrawnRow(top, elements, top)
+            redrawn += 1
+
+        if redrawn:
+            _restore_order(slide, state)
+        return redrawn
+
+
+def watch_outline(
+    input_path: Path,
+    session: WatchSession,
+    on_update: Callable[[WatchUpdate], None],
+    interval: float = 0.5,
+    should_stop: Callable[[], bool] = lambda: False,
+) -> None:
+    """Rebuild through ``session`` whenever ``input_path`` changes.
+
+    The file is polled every ``interval`` seconds. An outline that fails to
+    parse is reported through ``on_update`` and leaves the last good deck in
+    place. Runs until ``should_stop`` returns true or the caller interrupts.
+    """
+
+    last_seen: Optional[Tuple[int, int]] = None
+    while not should_stop():
+        try:
+            stat = input_path.stat()
+            seen = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            # Editors that save by rename briefly remove the file.
+            seen = None
+        if seen is not None and seen != last_seen:
+            last_seen = seen
+            start = time.perf_counter()
+            try:
+                update = session.update(Outline.from_file(input_path))
+            except (OSError, ValueError) as exc:
+                update = WatchUpdate(
+                    output_path=session.output_path,
+                    slide_count=0,
+                    slides_changed=0,
+                    rows_redrawn=0,
+                    seconds=time.perf_counter() - start,
+                    error=str(exc),
+                )
+            on_update(update)
+        time.sleep(interval)
+
+
+def _capture(slide: Slide, draw: Callable[[], None]) -> List[BaseOxmlElement]:
+    # Shapes are inserted before p:extLst, so collect whatever is new rather
+    # than slicing off the end of the tree.
+    sp_tree = slide.shapes._spTree
+    existing = set(sp_tree)
+    draw()
+    return [element for element in sp_tree if element not in existing]
+
+
+def _remove(slide: Slide, elements: List[BaseOxmlElement]) -> None:
+    sp_tree = slide.shapes._spTree
+    for element in elements:
+        sp_tree.remove(element)
+
+
+def _restore_order(slide: Slide, state: _SlideState) -> None:
+    """Put the drawn shapes back in build order and renumber them.
+
+    A fresh build appends the rows top to bottom and then the body, with
+    shape ids counting up from the layout placeholders; doing the same here
+    keeps a rebuilt slide identical to one built from scratch.
+    """
+
+    sp_tree = slide.shapes._spTree
+    drawn = [element for row in state.rows for element in row.elements]
+    if state.body is not None:
+        drawn.extend(state.body.elements)
+    for element in drawn:
+        sp_tree.remove(element)
+
+    next_id = sp_tree.max_shape_id + 1
+    for element in drawn:
+        c_nv_pr = element.find(".//" + qn("p:cNvPr"))
+        if c_nv_pr is not None:
+            base_name = c_nv_pr.get("name", "").rsplit(" ", 1)[0]
+            c_nv_pr.set("id", str(next_id))
+            c_nv_pr.set("name", f"{base_name} {next_id - 1}")
+            next_id += 1
+        sp_tree.insert_element_before(element, "p:extLst")
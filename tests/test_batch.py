@@ -0,0 +1,31 @@
+"""Tests for collecting batch inputs and the checks ``generate_batch`` runs first."""
+
+from __future__ import annotations
+
+import io
+from pathlib import Path
+
+import pytest
+
+from ppt_nav.generator import collect_batch_inputs, generate_batch
+
+
+def test_collect_batch_inputs_drops_other_spellings_of_a_path(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "decks").mkdir()
+    (tmp_path / "decks" / "intro.md").write_text("- Intro\n", encoding="utf-8")
+
+    manifest = io.StringIO("./decks/intro.md\n# comment\ndecks/../decks/intro.md\n")
+    assert collect_batch_inputs(["decks/*.md"], manifest) == [Path("decks/intro.md")]
+
+
+def test_generate_batch_rejects_outputs_that_resolve_to_one_file(tmp_path: Path) -> None:
+    (tmp_path / "sub").mkdir()
+    outline = tmp_path / "intro.md"
+    outline.write_text("- Intro\n", encoding="utf-8")
+
+    with pytest.raises(ValueError, match="same deck"):
+        generate_batch([outline, tmp_path / "sub" / ".." / "intro.md"], max_workers=1)
+    assert not (tmp_path / "intro.pptx").exists()
@@ -0,0 +1,14 @@
+"""Smoke tests that keep the benchmark suite in step with the builder."""
+
+from __future__ import annotations
+
+from benchmarks.suite import PHASES, run_size
+
+
+def test_run_size_builds_a_small_deck() -> None:
+    result = run_size(10, 1)
+
+    assert result["slides"] == 10
+    assert result["output_bytes"] > 0
+    assert all(result[f"{phase}_s"] >= 0 for phase in PHASES)
+    assert result["peak_traced_mb"] > 0
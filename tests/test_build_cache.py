@@ -0,0 +1,61 @@
+"""Build cache keys and lookups."""
+
+from __future__ import annotations
+
+import io
+from pathlib import Path
+
+import pytest
+
+from ppt_nav import build_cache
+from ppt_nav.build_cache import BuildCache
+from ppt_nav.outline import Outline
+
+OUTLINE = Outline.from_text("- Introduction\n- Results\n  - Accuracy\n")
+
+
+def test_key_changes_with_the_serialiser_versions(monkeypatch: pytest.MonkeyPatch) -> None:
+    cache = BuildCache(Path("unused"))
+    template = io.BytesIO(b"template")
+    key = cache.key(OUTLINE, template)
+
+    monkeypatch.setattr(build_cache, "_serialiser_versions", lambda: ("9.9.9", "6.1.3"))
+
+    assert cache.key(OUTLINE, template) != key
+
+
+def test_serialiser_versions_are_the_installed_ones() -> None:
+    import lxml.etree
+    import pptx
+
+    pptx_version, lxml_version = build_cache._serialiser_versions()
+    assert pptx_version == pptx.__version__
+    parts = tuple(int(part) for part in lxml_version.split("."))
+    assert lxml.etree.LXML_VERSION[: len(parts)] == parts
+
+
+def test_hit_is_reported_when_the_entry_is_evicted_after_the_copy(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    cache = BuildCache(tmp_path)
+    cache.store("k", b"deck")
+
+    def evicted(path: object) -> None:
+        raise FileNotFoundError(path)
+
+    monkeypatch.setattr(build_cache.os, "utime", evicted)
+    output = io.BytesIO()
+
+    assert cache.load("k", output)
+    assert output.getvalue() == b"deck"
+    assert (cache.hits, cache.misses) == (1, 0)
+
+
+def test_miss_leaves_the_output_alone(tmp_path: Path) -> None:
+    cache = BuildCache(tmp_path / "cache")
+    output = tmp_path / "deck.pptx"
+    output.write_bytes(b"previous")
+
+    assert not cache.load("missing", output)
+    assert output.read_bytes() == b"previous"
+    assert cache.misses == 1
@@ -0,0 +1,79 @@
+"""Compact navigation rows against the per-label geometry they replace."""
+
+from __future__ import annotations
+
+import io
+from typing import Dict, List, Tuple
+
+import pytest
+from pptx import Presentation
+from pptx.oxml.ns import qn
+
+from ppt_nav import generate_presentation_bytes
+from ppt_nav.text_metrics import TextWidthEstimator
+
+# Sections with a handful of short children lay out comfortably; the long,
+# numerous children force fit_widths to clamp cells below their labels' widths.
+OUTLINES = {
+    "roomy": "- Intro\n  - Goals\n  - Scope\n- Method\n  - Data\n  - Model\n- Results\n",
+    "crowded": "- Overview\n"
+    + "".join(f"  - Quarterly business review part {index}\n" for index in range(14))
+    + "- A very long section title that cannot fit its tab\n- Close\n",
+}
+
+_Centre = Tuple[str, int]
+
+
+def _label_centres(slide) -> List[_Centre]:
+    """Where each label lands, as (text, centre x), in textbox order.
+
+    Compact rows are laid out the way PowerPoint does it: a tab moves to the
+    first stop past the end of the previous text, and the label is centred
+    on that stop.
+    """
+
+    measure = TextWidthEstimator()
+    centres: List[_Centre] = []
+    for shape in slide.shapes:
+        if not shape.has_text_frame:
+            continue
+        body = shape._element.txBody
+        stops = [int(tab.get("pos")) for tab in body.iter(qn("a:tab"))]
+        if not stops:
+            runs = list(body.iter(qn("a:r")))
+            if len(runs) == 1 and runs[0].findtext(qn("a:t")):
+                centres.append((runs[0].findtext(qn("a:t")), shape.left + shape.width // 2))
+            continue
+        size_pt = int(next(body.iter(qn("a:defRPr"))).get("sz")) / 100
+        cursor = 0
+        for run in body.iter(qn("a:r")):
+            text = run.findtext(qn("a:t")).lstrip("\t")
+            width = measure.width_emu(text, size_pt)
+            stop = next((pos for pos in stops if pos > cursor), stops[-1])
+            centres.append((text, shape.left + stop))
+            cursor = stop + width // 2
+    return centres
+
+
+def _slides(text: str, compact_nav: bool) -> List[Dict[str, List[int]]]:
+    deck = Presentation(io.BytesIO(generate_presentation_bytes(text, compact_nav=compact_nav)))
+    slides = []
+    for slide in deck.slides:
+        by_text: Dict[str, List[int]] = {}
+        for label, centre in _label_centres(slide):
+            by_text.setdefault(label, []).append(centre)
+        slides.append(by_text)
+    return slides
+
+
+@pytest.mark.parametrize("name", sorted(OUTLINES))
+def test_compact_labels_land_on_their_own_cells(name: str) -> None:
+    separate = _slides(OUTLINES[name], compact_nav=False)
+    compact = _slides(OUTLINES[name], compact_nav=True)
+
+    assert len(compact) == len(separate)
+    for compact_labels, separate_labels in zip(compact, separate):
+        assert compact_labels.keys() == separate_labels.keys()
+        for label, centres in separate_labels.items():
+            # Tab stops are rounded to whole EMU, as are textbox centres.
+            assert compact_labels[label] == pytest.approx(centres, abs=1)
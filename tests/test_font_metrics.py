@@ -0,0 +1,21 @@
+"""Font file discovery for label measurement."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+from ppt_nav.font_metrics import find_label_font_file
+
+
+def test_label_font_prefers_the_bold_face(tmp_path: Path) -> None:
+    (tmp_path / "times.ttf").write_bytes(b"")
+    (tmp_path / "timesbd.ttf").write_bytes(b"")
+
+    assert find_label_font_file("Times New Roman", [tmp_path]) == (tmp_path / "timesbd.ttf", True)
+
+
+def test_label_font_falls_back_to_the_regular_face(tmp_path: Path) -> None:
+    (tmp_path / "times.ttf").write_bytes(b"")
+
+    assert find_label_font_file("Times New Roman", [tmp_path]) == (tmp_path / "times.ttf", False)
+    assert find_label_font_file("Garamond", [tmp_path]) == (None, False)
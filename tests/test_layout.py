@@ -0,0 +1,79 @@
+"""Property tests for ``ppt_nav.layout.fit_widths``.
+
+The closed-form allocator must agree exactly with the one-EMU-at-a-time
+shrink loop it replaced, which ``benchmarks/bench_fit_widths.py`` keeps as
+``reference_fit``.
+"""
+
+from __future__ import annotations
+
+import io
+import random
+import zipfile
+
+import pytest
+
+from benchmarks.bench_fit_widths import check_equivalence, reference_fit
+from ppt_nav.layout import fit_widths, inches, template_slide_size
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_matches_reference_on_random_widths(seed: int) -> None:
+    check_equivalence(rounds=2_000, seed=seed)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_matches_reference_with_widths_below_minimum(seed: int) -> None:
+    rng = random.Random(seed)
+    for _ in range(2_000):
+        min_width = rng.randint(1, 50)
+        widths = [rng.randint(0, 300) for _ in range(rng.randint(0, 12))]
+        available = rng.randint(0, 2000)
+        gap = rng.randint(0, 20)
+        expected = reference_fit(list(widths), available, gap, min_width)
+        assert fit_widths(list(widths), available, gap, min_width) == expected, (
+            widths,
+            available,
+            gap,
+            min_width,
+        )
+
+
+def test_matches_reference_on_slide_sized_rows() -> None:
+    rng = random.Random(1)
+    min_width = inches(0.35)
+    gap = inches(0.08)
+    for count in (1, 8, 16, 40):
+        widths = [rng.randint(inches(0.1), inches(6)) for _ in range(count)]
+        for available in (inches(2), inches(12.5)):
+            expected = reference_fit(list(widths), available, gap, min_width)
+            assert fit_widths(list(widths), available, gap, min_width) == expected
+
+
+def test_widths_that_fit_are_kept() -> None:
+    widths = [100, 200, 300]
+    assert fit_widths(list(widths), 1_000, 10, 50) == widths
+    assert fit_widths([], 1_000, 10, 50) == []
+
+
+def _package(presentation_xml: bytes) -> io.BytesIO:
+    stream = io.BytesIO()
+    with zipfile.ZipFile(stream, "w") as package:
+        package.writestr("ppt/presentation.xml", presentation_xml)
+    return stream
+
+
+def test_template_slide_size_reads_any_prefix_and_attribute_order() -> None:
+    stream = _package(
+        b'<pml:presentation xmlns:pml='
+        b'"http://schemas.openxmlformats.org/presentationml/2006/main">'
+        b'<pml:sldSz type="custom" cy="6858000" cx="12192000"/></pml:presentation>'
+    )
+    stream.seek(7)
+    assert template_slide_size(stream) == (12192000, 6858000)
+    assert stream.tell() == 7
+
+
+def test_template_slide_size_requires_slide_size() -> None:
+    with pytest.raises(ValueError):
+        template_slide_size(_package(b"<presentation/>"))
@@ -0,0 +1,36 @@
+"""Tests for outline parsing and the slide plan built from it."""
+
+from __future__ import annotations
+
+import pytest
+
+from ppt_nav.generator import generate_presentation_bytes
+from ppt_nav.outline import Outline, OutlineSyntaxError
+
+DEEP_OUTLINE = "- Methods\n  - Survey\n    - Sampling\n- Results\n"
+
+
+def test_third_level_is_a_syntax_error_by_default() -> None:
+    with pytest.raises(OutlineSyntaxError, match="Line 3"):
+        Outline.from_text(DEEP_OUTLINE)
+
+
+def test_deeper_outline_parses_but_cannot_be_planned() -> None:
+    outline = Outline.from_text(DEEP_OUTLINE, max_depth=3)
+    assert outline.sections[0].children[0].children[0].title == "Sampling"
+    with pytest.raises(ValueError, match="'Methods' > 'Survey'"):
+        outline.slide_plan
+
+
+def test_deeper_outline_is_not_built() -> None:
+    with pytest.raises(ValueError, match="two heading levels"):
+        generate_presentation_bytes(Outline.from_text(DEEP_OUTLINE, max_depth=3))
+
+
+def test_slide_plan_has_one_slide_per_subsection() -> None:
+    plan = Outline.from_text("- A\n  - A1\n  - A2\n- B\n").slide_plan
+    assert [(entry.section.title, entry.child and entry.child.title) for entry in plan] == [
+        ("A", "A1"),
+        ("A", "A2"),
+        ("B", None),
+    ]
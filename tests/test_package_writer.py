@@ -0,0 +1,62 @@
+"""Round trips of zip entries copied or written without recompressing."""
+
+from __future__ import annotations
+
+import io
+import zipfile
+from typing import Dict
+
+import pytest
+
+from ppt_nav import package_writer
+from ppt_nav.compression import compress_entry
+from ppt_nav.generator import resolve_template
+from ppt_nav.package_writer import RawZipSource, copy_entry, write_raw_entry
+
+PARTS = {
+    "ppt/slides/slide1.xml": "<p:sld>" + "<p:sp>導覽 navigation</p:sp>" * 400 + "</p:sld>",
+    "ppt/slides/_rels/slide1.xml.rels": "<Relationships/>",
+    "docProps/empty.xml": "",
+}
+
+
+@pytest.fixture(params=[True, False], ids=["raw", "writestr"])
+def raw_writes(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch) -> bool:
+    if request.param and not package_writer.RAW_WRITES:
+        pytest.skip("Raw zip writes are not supported on this Python.")
+    monkeypatch.setattr(package_writer, "RAW_WRITES", request.param)
+    return request.param
+
+
+def _read_back(data: bytes) -> Dict[str, bytes]:
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        assert archive.testzip() is None
+        return {info.filename: archive.read(info) for info in archive.infolist()}
+
+
+def test_copied_template_entries_read_back(raw_writes: bool) -> None:
+    template = resolve_template(None)
+    output = io.BytesIO()
+    with RawZipSource(template) as source, zipfile.ZipFile(output, "w") as archive:
+        for name in source.infos:
+            copy_entry(archive, source, name)
+
+    with zipfile.ZipFile(template) as original:
+        expected = {info.filename: original.read(info) for info in original.infolist()}
+        sizes = {info.filename: info.compress_size for info in original.infolist()}
+    assert _read_back(output.getvalue()) == expected
+    if raw_writes:
+        with zipfile.ZipFile(output) as copied:
+            assert {info.filename: info.compress_size for info in copied.infolist()} == sizes
+
+
+@pytest.mark.parametrize("level", [0, 1, 9])
+def test_compressed_entries_read_back(raw_writes: bool, level: int) -> None:
+    output = io.BytesIO()
+    with zipfile.ZipFile(output, "w") as archive:
+        for name, text in PARTS.items():
+            write_raw_entry(archive, *compress_entry(name, text.encode("utf-8"), level))
+
+    assert _read_back(output.getvalue()) == {
+        name: text.encode("utf-8") for name, text in PARTS.items()
+    }
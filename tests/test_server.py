@@ -0,0 +1,51 @@
+"""Tests for the render service's worker side, run in this process."""
+
+from __future__ import annotations
+
+import io
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from ppt_nav import server
+from ppt_nav.generator import resolve_template
+
+
+@pytest.fixture
+def worker(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(server, "_worker_templates", server.OrderedDict())
+    monkeypatch.setattr(server, "_worker_builders", {})
+    server._init_render_worker(resolve_template(None), None)
+
+
+def test_worker_keeps_only_recent_templates(worker: None, tmp_path: Path) -> None:
+    paths = []
+    for index in range(server._MAX_TEMPLATES + 2):
+        path = tmp_path / f"template-{index}.pptx"
+        path.write_bytes(b"x" * index)
+        paths.append(path)
+        server._template_bytes(path)
+    server._template_bytes(paths[2])
+    server._template_bytes(paths[-1])
+
+    kept = [key[0].name for key in server._worker_templates]
+    assert len(kept) == server._MAX_TEMPLATES
+    assert kept[-2:] == ["template-2.pptx", "template-5.pptx"]
+
+
+def test_render_job_reuses_builder(worker: None) -> None:
+    options = server.RenderOptions(compact_nav=True)
+    status, deck = server._render_job("- A\n  - A1\n- B\n", options)
+    assert status == 200
+    with zipfile.ZipFile(io.BytesIO(deck)) as package:
+        assert "ppt/slides/slide2.xml" in package.namelist()
+    builder = server._builder_for(options)
+    assert server._render_job("- A\n  - A2\n", options)[0] == 200
+    assert server._builder_for(options) is builder
+
+
+def test_render_job_reports_outline_errors(worker: None) -> None:
+    status, message = server._render_job("- A\n   - odd\n", server.RenderOptions())
+    assert status == 400
+    assert b"Line 2" in message
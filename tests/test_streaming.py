@@ -0,0 +1,43 @@
+"""The streaming engine's parallel drawing against a serial build."""
+
+from __future__ import annotations
+
+import io
+import zipfile
+from typing import List, Tuple
+
+import pytest
+
+from ppt_nav import generate_presentation_bytes, streaming
+from ppt_nav.streaming import _MIN_SLIDES_PER_WORKER
+
+WORKERS = 3
+
+
+def _entries(deck: bytes) -> List[Tuple[str, bytes]]:
+    with zipfile.ZipFile(io.BytesIO(deck)) as package:
+        return [(info.filename, package.read(info)) for info in package.infolist()]
+
+
+def test_parallel_build_matches_serial_build(monkeypatch: pytest.MonkeyPatch) -> None:
+    pools: List[int] = []
+    draw_in_workers = streaming._draw_in_workers
+
+    def spy(*args):
+        pools.append(args[-1])
+        return draw_in_workers(*args)
+
+    monkeypatch.setattr(streaming, "_draw_in_workers", spy)
+
+    # Enough slides that every worker gets a chunk of its own.
+    sections = WORKERS * _MIN_SLIDES_PER_WORKER // 4 + 1
+    outline = "".join(
+        f"- Section {section}\n" + "".join(f"  - 小節 {section}.{child}\n" for child in range(4))
+        for section in range(sections)
+    )
+
+    serial = generate_presentation_bytes(outline, engine="stream", max_workers=1)
+    parallel = generate_presentation_bytes(outline, engine="stream", max_workers=WORKERS)
+
+    assert pools == [WORKERS]
+    assert _entries(parallel) == _entries(serial)
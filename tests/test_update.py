@@ -0,0 +1,132 @@
+"""Tests for refreshing the navigation of an edited deck in place."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import List, Tuple
+
+import pytest
+from pptx import Presentation
+from pptx.util import Emu
+
+from ppt_nav.generator import generate_from_markdown, update_from_markdown
+from ppt_nav.ppt_builder import MARKER_PREFIX
+
+OUTLINE = """\
+- Intro
+  - Goals
+  - Scope
+- Method
+  - Data
+  - Model
+- Results
+- Close
+"""
+
+# (body text, navigation labels) of each slide, in deck order.
+_Slide = Tuple[str, Tuple[str, ...]]
+
+
+@pytest.fixture
+def edited_deck(tmp_path: Path) -> Path:
+    """A deck built from OUTLINE whose generated slides were then filled in.
+
+    Each generated slide's body reads ``body <n>``, numbered in deck order,
+    and the first one also has a shape drawn by hand.
+    """
+
+    outline = tmp_path / "talk.md"
+    outline.write_text(OUTLINE, encoding="utf-8")
+    generate_from_markdown(outline)
+    deck = outline.with_suffix(".pptx")
+
+    prs = Presentation(str(deck))
+    number = 0
+    for slide in prs.slides:
+        if not (slide._element.cSld.name or "").startswith(MARKER_PREFIX):
+            continue
+        number += 1
+        body = next(shape for shape in slide.shapes if shape.name.startswith("TextBox"))
+        body.text_frame.text = f"body {number}"
+        if number == 1:
+            slide.shapes.add_textbox(Emu(0), Emu(0), Emu(914400), Emu(914400)).name = "Sketch"
+    prs.save(str(deck))
+    return outline
+
+
+def _edit(outline: Path, old: str, new: str) -> None:
+    text = outline.read_text(encoding="utf-8")
+    assert old in text
+    outline.write_text(text.replace(old, new, 1), encoding="utf-8")
+
+
+def _slides(deck: Path) -> List[_Slide]:
+    slides = []
+    for slide in Presentation(str(deck)).slides:
+        body, nav = "", []
+        for shape in slide.shapes:
+            if not shape.has_text_frame or not shape.text_frame.text.strip():
+                continue
+            if shape.name.startswith(MARKER_PREFIX):
+                nav.append(shape.text_frame.text)
+            else:
+                body = shape.text_frame.text
+        slides.append((body, tuple(nav)))
+    return slides
+
+
+def test_update_keeps_slide_bodies(edited_deck: Path) -> None:
+    _edit(edited_deck, "  - Goals\n", "  - Aims\n")
+    update_from_markdown(edited_deck)
+
+    slides = _slides(edited_deck.with_suffix(".pptx"))
+    assert [body for body, _ in slides[1:]] == [f"body {number}" for number in range(1, 7)]
+    first = Presentation(str(edited_deck.with_suffix(".pptx"))).slides[1]
+    assert "Sketch" in [shape.name for shape in first.shapes]
+
+
+def test_update_matches_renamed_section_and_subsection(edited_deck: Path) -> None:
+    _edit(edited_deck, "- Method\n", "- Approach\n")
+    _edit(edited_deck, "  - Scope\n", "  - Range\n")
+    result = update_from_markdown(edited_deck)
+
+    assert (result.slides_added, result.orphaned_slides) == (0, ())
+    # Every slide shows the new main row; Intro's two show the new subsection row.
+    assert result.slides_updated == 6
+    slides = _slides(edited_deck.with_suffix(".pptx"))
+    assert slides[2] == ("body 2", ("Intro", "Approach", "Results", "Close", "Goals", "Range"))
+    assert slides[3] == ("body 3", ("Intro", "Approach", "Results", "Close", "Data", "Model"))
+
+
+def test_update_inserts_new_slide_after_its_predecessor(edited_deck: Path) -> None:
+    _edit(edited_deck, "  - Model\n", "  - Model\n  - Ablation\n")
+    result = update_from_markdown(edited_deck)
+
+    assert result.slides_added == 1
+    slides = _slides(edited_deck.with_suffix(".pptx"))
+    assert [body for body, _ in slides[1:]] == [
+        "body 1", "body 2", "body 3", "body 4", "", "body 5", "body 6"
+    ]
+    assert slides[5][1][-3:] == ("Data", "Model", "Ablation")
+
+
+def test_update_reports_orphaned_slides(edited_deck: Path) -> None:
+    _edit(edited_deck, "- Results\n", "")
+    result = update_from_markdown(edited_deck)
+
+    # The title slide comes first, so Results is the deck's sixth slide.
+    assert result.orphaned_slides == (6,)
+    slides = _slides(edited_deck.with_suffix(".pptx"))
+    assert len(slides) == 7
+    assert slides[5][0] == "body 5"
+
+
+def test_second_update_changes_nothing(edited_deck: Path) -> None:
+    _edit(edited_deck, "- Close\n", "- Wrap-up\n")
+    update_from_markdown(edited_deck)
+    deck = edited_deck.with_suffix(".pptx")
+    data = deck.read_bytes()
+
+    result = update_from_markdown(edited_deck)
+    assert (result.slides_updated, result.slides_added, result.slides_unchanged) == (0, 0, 6)
+    assert deck.read_bytes() == data